@@ -0,0 +1,19 @@
+"""
+Copyright (C) J Leadbetter <j@jleadbetter.com>
+Affero GPL v3
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models.app import AppSettings
+from .utils.cache import bump_app_settings_version
+
+
+@receiver(post_save, sender=AppSettings)
+@receiver(post_delete, sender=AppSettings)
+def invalidate_app_settings(sender, **kwargs):
+    # Other processes must not reload the settings
+    # before the change is visible to them.
+    transaction.on_commit(bump_app_settings_version)
@@ -0,0 +1,86 @@
+"""
+Copyright (C) J Leadbetter <j@jleadbetter.com>
+Affero GPL v3
+
+Versions of cached data, shared between processes
+through the Django cache framework.
+
+Processes keep their own copy of the data,
+and only read it again when its version changes.
+Use a shared cache backend (e.g., Redis or Memcached)
+when more than one process serves the app;
+the default local-memory cache only invalidates the current process.
+"""
+
+import uuid
+
+from django.core.cache import cache
+
+APP_SETTINGS_VERSION_KEY = 'app_settings_version'
+USERS_VERSION_KEY = 'users_version'
+
+
+def bump_version(key: str):
+    """
+    Mark every cached copy of the data as out of date.
+
+    :key: Version key of the data (e.g., USERS_VERSION_KEY).
+    """
+
+    # A random version can't repeat an old one,
+    # even when the cache has evicted the key in the meantime.
+    cache.set(key, uuid.uuid4().hex, timeout=None)
+
+
+def get_version(key: str) -> str:
+    """
+    Get the current version of the data.
+    Sets a first version if there isn't one yet.
+
+    :key: Version key of the data (e.g., USERS_VERSION_KEY).
+
+    :return: version
+    """
+
+    version = cache.get(key)
+    if version is None:
+        # Another process may set it first; theirs wins.
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_app_settings_version():
+    """
+    Mark every cached copy of the AppSettings as out of date.
+    """
+
+    bump_version(APP_SETTINGS_VERSION_KEY)
+
+
+def get_app_settings_version() -> str:
+    """
+    Get the current version of the AppSettings.
+
+    :return: version
+    """
+
+    return get_version(APP_SETTINGS_VERSION_KEY)
+
+
+def bump_users_version():
+    """
+    Mark every cached list of users as out of date.
+    """
+
+    bump_version(USERS_VERSION_KEY)
+
+
+def get_users_version() -> str:
+    """
+    Get the current version of the users.
+
+    :return: version
+    """
+
+    return get_version(USERS_VERSION_KEY)
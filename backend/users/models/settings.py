@@ -44,6 +44,12 @@ class UserSettings(UserBase, models.Model):
         help_text=_('Display name shown in the UI'),
     )
 
+    # UserBase hashes pydantic models.
+    # Django needs model instances to be hashable,
+    # e.g., to collect them for signals when they're deleted.
+    __eq__ = models.Model.__eq__
+    __hash__ = models.Model.__hash__
+
     @property
     def is_admin(self):
         return self.user.is_superuser
@@ -0,0 +1,28 @@
+"""
+Copyright (C) J Leadbetter <j@jleadbetter.com>
+Affero GPL v3
+"""
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from app.utils.cache import bump_users_version
+
+from .models.settings import UserSettings
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=UserSettings)
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=UserSettings)
+def invalidate_users(sender, update_fields=None, **kwargs):
+    # Logging in only updates last_login,
+    # which isn't shown anywhere users are cached.
+    if update_fields and set(update_fields) == {'last_login'}:
+        return
+
+    # Other processes must not reload the users
+    # before the change is visible to them.
+    transaction.on_commit(bump_users_version)
@@ -1,6 +1,7 @@
 from django.contrib import admin
 
 #from .models import Document
+from .models import Word
 
 
 '''
@@ -19,3 +20,10 @@ class DocumentAdmin(admin.ModelAdmin):
         for doc in obj:
             doc.delete()
 '''
+
+
+@admin.register(Word)
+class WordAdmin(admin.ModelAdmin):
+    list_display = ['base_word', 'language_code', 'grammar_type', 'frequency']
+    list_filter = ['language_code', 'grammar_type']
+    search_fields = ['base_word']
@@ -0,0 +1,58 @@
+# Generated by Django 5.1.5 on 2026-10-18 15:11
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Word',
+            fields=[
+                ('id', models.UUIDField(blank=True, default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('language_code', models.CharField(help_text='Language that the word belongs to', max_length=8)),
+                ('base_word', models.CharField(help_text='Base (non-conjugated) form of the word', max_length=255)),
+                ('frequency', models.PositiveIntegerField(blank=True, help_text='How often the word appears in the source corpus', null=True)),
+                ('grammar_type_id', models.UUIDField(default=uuid.uuid4, help_text='Id of the grammar type of the word')),
+                ('grammar_type', models.CharField(help_text='Grammar type of the word (e.g., noun)', max_length=32)),
+            ],
+            options={
+                'ordering': ['-frequency'],
+                'indexes': [models.Index(fields=['frequency'], name='words_frequency')],
+                'constraints': [models.UniqueConstraint(fields=('language_code', 'base_word'), name='unique_language_code_base_word')],
+            },
+        ),
+        migrations.CreateModel(
+            name='Translation',
+            fields=[
+                ('id', models.UUIDField(blank=True, default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('position', models.PositiveSmallIntegerField(default=0, help_text='Order of the translation within the word')),
+                ('language_code', models.CharField(help_text='Language that the translation is in', max_length=8)),
+                ('meanings', models.JSONField(default=list, help_text='Meanings of the word in the translated language')),
+                ('word', models.ForeignKey(help_text='Word that is translated', on_delete=django.db.models.deletion.CASCADE, related_name='translations', to='words.word')),
+            ],
+            options={
+                'ordering': ['position'],
+            },
+        ),
+        migrations.CreateModel(
+            name='GrammarTypeData',
+            fields=[
+                ('id', models.UUIDField(blank=True, default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('position', models.PositiveSmallIntegerField(default=0, help_text='Order of the data within the word')),
+                ('data', models.JSONField(default=dict, help_text='Language-specific fields of the grammar type data')),
+                ('word', models.ForeignKey(help_text='Word that this data belongs to', on_delete=django.db.models.deletion.CASCADE, related_name='data', to='words.word')),
+            ],
+            options={
+                'verbose_name_plural': 'Grammar Type Data',
+                'ordering': ['position'],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.5 on 2026-10-18 15:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('words', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='word',
+            index=models.Index(fields=['language_code', '-frequency', 'id'], name='words_language_frequency_id'),
+        ),
+    ]
@@ -4,3 +4,4 @@ Affero GPL v3
 """
 
 #from .documents import Document
+from .words import GrammarTypeData, Translation, Word
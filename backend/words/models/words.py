@@ -0,0 +1,135 @@
+"""
+Copyright (C) J Leadbetter <j@jleadbetter.com>
+Affero GPL v3
+"""
+
+import uuid
+
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class Word(models.Model):
+    """
+    Basic unit of the project.
+    See common.models.words.Word for the shared representation.
+    """
+
+    class Meta:
+        ordering = ['-frequency']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['language_code', 'base_word'],
+                name='unique_language_code_base_word',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['frequency'], name='words_frequency'),
+            # Matches the ordering used to page through a language's words.
+            # SQLite sorts NULL frequencies last when descending.
+            models.Index(
+                fields=['language_code', '-frequency', 'id'],
+                name='words_language_frequency_id',
+            ),
+        ]
+
+    id = models.UUIDField(
+        primary_key=True,
+        blank=True,
+        editable=False,
+        default=uuid.uuid4,
+    )
+    language_code = models.CharField(
+        max_length=8,
+        help_text=_('Language that the word belongs to'),
+    )
+    base_word = models.CharField(
+        max_length=255,
+        help_text=_('Base (non-conjugated) form of the word'),
+    )
+    frequency = models.PositiveIntegerField(
+        blank=True,
+        null=True,
+        help_text=_('How often the word appears in the source corpus'),
+    )
+    grammar_type_id = models.UUIDField(
+        default=uuid.uuid4,
+        help_text=_('Id of the grammar type of the word'),
+    )
+    grammar_type = models.CharField(
+        max_length=32,
+        help_text=_('Grammar type of the word (e.g., noun)'),
+    )
+
+    def __str__(self):
+        return self.base_word
+
+
+class GrammarTypeData(models.Model):
+    """
+    Data for the grammar type of a word (e.g., the forms of a noun).
+    Fields differ between languages and grammar types,
+    so they are stored as JSON.
+    """
+
+    class Meta:
+        ordering = ['position']
+        verbose_name_plural = 'Grammar Type Data'
+
+    id = models.UUIDField(
+        primary_key=True,
+        blank=True,
+        editable=False,
+        default=uuid.uuid4,
+    )
+    word = models.ForeignKey(
+        Word,
+        on_delete=models.CASCADE,
+        related_name='data',
+        help_text=_('Word that this data belongs to'),
+    )
+    position = models.PositiveSmallIntegerField(
+        default=0,
+        help_text=_('Order of the data within the word'),
+    )
+    data = models.JSONField(
+        default=dict,
+        help_text=_('Language-specific fields of the grammar type data'),
+    )
+
+
+class Translation(models.Model):
+    """
+    Translation of a Word.
+
+    The `language_code` should be the language that the translation is in,
+    not the code of the word being translated.
+    """
+
+    class Meta:
+        ordering = ['position']
+
+    id = models.UUIDField(
+        primary_key=True,
+        blank=True,
+        editable=False,
+        default=uuid.uuid4,
+    )
+    word = models.ForeignKey(
+        Word,
+        on_delete=models.CASCADE,
+        related_name='translations',
+        help_text=_('Word that is translated'),
+    )
+    position = models.PositiveSmallIntegerField(
+        default=0,
+        help_text=_('Order of the translation within the word'),
+    )
+    language_code = models.CharField(
+        max_length=8,
+        help_text=_('Language that the translation is in'),
+    )
+    meanings = models.JSONField(
+        default=list,
+        help_text=_('Meanings of the word in the translated language'),
+    )
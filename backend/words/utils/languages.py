@@ -3,16 +3,17 @@ Copyright (C) J Leadbetter <j@jleadbetter.com>
 Affero GPL v3
 """
 
-from django.db import models
-from langcodes.registry_parser import parse_registry
+from typing import Any
 
-from common.utils.languages import LanguageCode
+from common.utils.languages import get_languages
 
 
-# ISO 639 language codes
-language_code_choices = {
-    data['Subtag']: data['Description'][0].lower()
-    for data in parse_registry()
-    if data['Type'] == 'language' and
-    data['Subtag'] != 'mro'  # Disallowed key in Python Enum
-}
+def __getattr__(name: str) -> Any:
+    # ISO 639 language codes, only built when first used.
+    if name == 'language_code_choices':
+        globals()[name] = {
+            subtag: description.lower()
+            for subtag, description in get_languages()
+        }
+        return globals()[name]
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
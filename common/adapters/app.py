@@ -3,13 +3,34 @@ Copyright (C) J Leadbetter <j@jleadbetter.com>
 Affero GPL v3
 """
 
-from typing import Union
+from typing import Optional, Tuple, Union
+
+from django.db import connection, transaction
 
 from app.models.app import AppSettings
+from app.utils.cache import get_app_settings_version
 
 from ..models.app import AppSettingsDB
 from ..ports.app import AppSettingsPort
 
+# Settings read by this process, with the version they were read at.
+# There is only one row, so this is shared by all adapters.
+_app_settings_cache: Optional[Tuple[str, Union[AppSettingsDB, None]]] = None
+
+
+def clear_app_settings_cache():
+    """
+    Forget the settings cached by this process.
+    """
+
+    global _app_settings_cache
+    _app_settings_cache = None
+
+
+def _cache_app_settings(version: str, app_db: Union[AppSettingsDB, None]):
+    global _app_settings_cache
+    _app_settings_cache = (version, app_db)
+
 
 class AppSettingsDjangoORMAdapter(AppSettingsPort):
     """
@@ -29,19 +50,41 @@ class AppSettingsDjangoORMAdapter(AppSettingsPort):
         )
         return app_settings_db
 
+    def _read(self) -> Union[AppSettingsDB, None]:
+        app = AppSettings.objects.first()
+        if not app:
+            return None
+
+        app_db = self._django_to_pydantic(app)
+        return app_db
+
     def get(self) -> Union[AppSettingsDB, None]:
         """
         Get the settings.
         Only returns the first instance, because there should be only one.
 
+        The settings are cached by the process,
+        until they are changed by this or any other process.
+
         :return: AppSettingsDB object, or None
         """
-        app = AppSettings.objects.first()
-        if not app:
-            return None
 
-        app_db = self._django_to_pydantic(app)
-        return app_db
+        # Inside a transaction, the settings may have changed
+        # without being committed, so the cache is left alone.
+        if connection.in_atomic_block:
+            return self._read()
+
+        version = get_app_settings_version()
+        cached = _app_settings_cache
+        if cached and cached[0] == version:
+            app_db = cached[1]
+        else:
+            # The version is read first, so a change made in the meantime
+            # makes the cached settings out of date straight away.
+            app_db = self._read()
+            _cache_app_settings(version, app_db)
+
+        return app_db.model_copy() if app_db else None
 
     def create_or_update(self, settings: AppSettingsDB) -> AppSettingsDB:
         """
@@ -66,4 +109,10 @@ class AppSettingsDjangoORMAdapter(AppSettingsPort):
             )
             app_db = self._django_to_pydantic(app)
 
+        # The post_save signal changes the version when the change is committed;
+        # write the new settings through after that.
+        cached_app_db = app_db.model_copy()
+        transaction.on_commit(
+            lambda: _cache_app_settings(get_app_settings_version(), cached_app_db),
+        )
         return app_db
@@ -5,17 +5,43 @@ Affero GPL v3
 Implementations of the DatabasePort
 """
 
-import json
+import itertools
 import os
+import sqlite3
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Iterator
 
 from common.models.database import Database
 from common.ports.database import DatabaseError, DatabasePort
-from common.utils.file import DatabaseFileMixin
+from common.utils.file import DatabaseFileMixin, JSONFileMixin, SQLiteFileMixin
+from common.utils.snapshot import read_snapshot, write_snapshot
 
+# Models in a snapshot of the Django database,
+# in the order they have to be created.
+DJANGO_SNAPSHOT_MODELS = [
+    'auth.User',
+    'users.UserSettings',
+    'app.AppSettings',
+    'words.Word',
+    'words.GrammarTypeData',
+    'words.Translation',
+]
 
-class DatabaseJSONFileAdapter(DatabaseFileMixin, DatabasePort):
+# Number of objects per bulk insert when restoring a Django snapshot
+DJANGO_BATCH_SIZE = 1000
+
+
+def _remove_files(*paths: str):
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+class DatabaseJSONFileAdapter(DatabaseFileMixin, JSONFileMixin, DatabasePort):
     """
     Stores the database as a JSON file.
+    In journal mode, changes are kept in a journal file next to it.
     """
 
     def __init__(self, **kwargs):
@@ -23,10 +49,7 @@ class DatabaseJSONFileAdapter(DatabaseFileMixin, DatabasePort):
             kwargs['databasefile'],
             'json',
         )
-
-    def _write(self, database: Database):
-        with open(self.database, 'w') as output_file:
-            json.dump(database.model_dump(), output_file, indent=2)
+        self._configure_json_storage(**kwargs)
 
     def initialize_database(self):
         """
@@ -37,8 +60,13 @@ class DatabaseJSONFileAdapter(DatabaseFileMixin, DatabasePort):
         """
 
         try:
-            database = Database()
-            self._write(database)
+            # An empty database file can still have a journal
+            has_data = (
+                (os.path.exists(self.database) and os.path.getsize(self.database)) or
+                os.path.exists(self.journal)
+            )
+            if not has_data:
+                self._write_json(Database())
         except Exception as ex:
             raise DatabaseError(str(ex))
 
@@ -52,5 +80,305 @@ class DatabaseJSONFileAdapter(DatabaseFileMixin, DatabasePort):
         try:
             if os.path.exists(self.database):
                 os.remove(self.database)
+            self._remove_journal()
+        except Exception as ex:
+            raise DatabaseError(str(ex))
+
+    @contextmanager
+    def bulk_load(self) -> Iterator[None]:
+        """
+        Group many writes, like loading the default data.
+        The database is written once at the end of the block,
+        instead of on every change or journal compaction.
+        """
+
+        with self._deferred_writes():
+            yield
+
+    def create_snapshot(self, snapshot_file: str):
+        """
+        Save a compressed, checksummed image of the database.
+        The snapshot can only be restored by the same kind of adapter.
+
+        :snapshot_file: Path of the snapshot to write.
+
+        :raises: DatabaseError if something goes wrong.
+        """
+
+        try:
+            # Fold the journal into the database file first,
+            # so the file is a complete image of the database.
+            self._write_json(self._read_json())
+            write_snapshot(snapshot_file, self.database, 'json')
+        except Exception as ex:
+            raise DatabaseError(str(ex))
+
+    def restore_snapshot(self, snapshot_file: str):
+        """
+        Replace the contents of the database with a snapshot,
+        made with `create_snapshot`.
+        Nothing is changed if the snapshot is invalid.
+
+        :snapshot_file: Path of the snapshot to restore.
+
+        :raises: DatabaseError if the snapshot is invalid
+            or something else goes wrong.
+        """
+
+        image_file = f'{self.database}.restore'
+        try:
+            read_snapshot(snapshot_file, image_file, 'json')
+            self._remove_journal()
+            os.replace(image_file, self.database)
+        except Exception as ex:
+            raise DatabaseError(str(ex))
+        finally:
+            _remove_files(image_file)
+
+
+class DatabaseSQLiteAdapter(DatabaseFileMixin, SQLiteFileMixin, DatabasePort):
+    """
+    Stores the database as a SQLite file.
+    """
+
+    def __init__(self, **kwargs):
+        self.database = self._get_db_filename(
+            kwargs['databasefile'],
+            'sqlite',
+        )
+
+    def initialize_database(self):
+        """
+        Set up the expected tables in the database.
+        Ignores if tables already exist.
+
+        :raises: DatabaseError if something goes wrong.
+        """
+
+        try:
+            self._create_tables()
+        except Exception as ex:
+            raise DatabaseError(str(ex))
+
+    def teardown_database(self):
+        """
+        Drop all tables in the database.
+        Ignores if database isn't there.
+
+        :raises: DatabaseError if something goes wrong.
+        """
+
+        try:
+            self._drop_tables()
+        except Exception as ex:
+            raise DatabaseError(str(ex))
+
+    def create_snapshot(self, snapshot_file: str):
+        """
+        Save a compressed, checksummed image of the database.
+        The snapshot can only be restored by the same kind of adapter.
+
+        :snapshot_file: Path of the snapshot to write.
+
+        :raises: DatabaseError if something goes wrong.
+        """
+
+        # The backup API gives a consistent copy,
+        # even while the database is being written to.
+        image_file = f'{self.database}.snapshot'
+        try:
+            image = sqlite3.connect(image_file)
+            try:
+                self.connection.backup(image)
+            finally:
+                image.close()
+            write_snapshot(snapshot_file, image_file, 'sqlite')
+        except Exception as ex:
+            raise DatabaseError(str(ex))
+        finally:
+            _remove_files(image_file, f'{image_file}-wal', f'{image_file}-shm')
+
+    def restore_snapshot(self, snapshot_file: str):
+        """
+        Replace the contents of the database with a snapshot,
+        made with `create_snapshot`.
+        Nothing is changed if the snapshot is invalid.
+
+        :snapshot_file: Path of the snapshot to restore.
+
+        :raises: DatabaseError if the snapshot is invalid
+            or something else goes wrong.
+        """
+
+        # Copying into the open database, instead of replacing the file,
+        # means other connections to the database see the restored data.
+        image_file = f'{self.database}.restore'
+        try:
+            read_snapshot(snapshot_file, image_file, 'sqlite')
+            image = sqlite3.connect(image_file)
+            try:
+                image.backup(self.connection)
+            finally:
+                image.close()
+        except Exception as ex:
+            raise DatabaseError(str(ex))
+        finally:
+            _remove_files(image_file, f'{image_file}-wal', f'{image_file}-shm')
+
+
+class DatabaseDjangoORMAdapter(DatabasePort):
+    """
+    Manages the database through Django.
+    Tables are created and emptied with Django's migrate and flush commands.
+    """
+
+    def __init__(self, **kwargs):
+        # Ignore any kwargs configuration.
+        # This uses the django settings.
+        super().__init__()
+
+    def _snapshot_models(self):
+        from django.apps import apps
+
+        return [apps.get_model(label) for label in DJANGO_SNAPSHOT_MODELS]
+
+    def _invalidate_caches(self):
+        # Flushing and bulk creating don't send the signals
+        # that change the versions of the cached data.
+        from django.db import transaction
+
+        from app.utils.cache import bump_app_settings_version, bump_users_version
+
+        transaction.on_commit(bump_app_settings_version)
+        transaction.on_commit(bump_users_version)
+
+    def initialize_database(self):
+        """
+        Set up the expected tables in the database.
+        Ignores if tables already exist.
+
+        :raises: DatabaseError if something goes wrong.
+        """
+
+        from django.core.management import call_command
+
+        try:
+            call_command('migrate', interactive=False, verbosity=0)
+        except Exception as ex:
+            raise DatabaseError(str(ex))
+
+    def teardown_database(self):
+        """
+        Remove all data from the database.
+        The tables themselves are managed by Django migrations.
+
+        :raises: DatabaseError if something goes wrong.
+        """
+
+        from django.core.management import call_command
+
+        try:
+            call_command('flush', interactive=False, verbosity=0)
+        except Exception as ex:
+            raise DatabaseError(str(ex))
+        self._invalidate_caches()
+
+    def create_snapshot(self, snapshot_file: str):
+        """
+        Save a compressed, checksummed image of the database.
+        The snapshot can only be restored by the same kind of adapter.
+
+        :snapshot_file: Path of the snapshot to write.
+
+        :raises: DatabaseError if something goes wrong.
+        """
+
+        from django.core import serializers
+        from django.db import connection, transaction
+
+        image_file = f'{snapshot_file}.json'
+        try:
+            # Outside an existing transaction, read every table from the
+            # same point in time. PostgreSQL defaults to READ COMMITTED,
+            # where each query sees the data committed before it started.
+            repeatable_read = (
+                connection.vendor == 'postgresql' and
+                not connection.in_atomic_block
+            )
+            with transaction.atomic(), open(image_file, 'w') as image:
+                if repeatable_read:
+                    with connection.cursor() as cursor:
+                        cursor.execute(
+                            'SET TRANSACTION ISOLATION LEVEL REPEATABLE READ',
+                        )
+                serializers.serialize(
+                    'json',
+                    itertools.chain.from_iterable(
+                        Model._default_manager.order_by('pk').iterator()
+                        for Model in self._snapshot_models()
+                    ),
+                    stream=image,
+                )
+            write_snapshot(snapshot_file, image_file, 'django')
+        except Exception as ex:
+            raise DatabaseError(str(ex))
+        finally:
+            _remove_files(image_file)
+
+    def restore_snapshot(self, snapshot_file: str):
+        """
+        Replace the contents of the database with a snapshot,
+        made with `create_snapshot`.
+        Nothing is changed if the snapshot is invalid.
+
+        :snapshot_file: Path of the snapshot to restore.
+
+        :raises: DatabaseError if the snapshot is invalid
+            or something else goes wrong.
+        """
+
+        from django.core import serializers
+        from django.core.management.color import no_style
+        from django.db import connection, transaction
+
+        image_file = f'{snapshot_file}.json'
+        try:
+            read_snapshot(snapshot_file, image_file, 'django')
+
+            objects = defaultdict(list)
+            many_to_many = []
+            with open(image_file) as image:
+                for deserialized in serializers.deserialize('json', image):
+                    objects[type(deserialized.object)].append(deserialized.object)
+                    if deserialized.m2m_data:
+                        many_to_many.append(deserialized)
+
+            models = self._snapshot_models()
+            with transaction.atomic():
+                for Model in reversed(models):
+                    Model._default_manager.all().delete()
+                for Model in models:
+                    Model._default_manager.bulk_create(
+                        objects[Model],
+                        batch_size=DJANGO_BATCH_SIZE,
+                    )
+                for deserialized in many_to_many:
+                    for field_name, values in deserialized.m2m_data.items():
+                        getattr(deserialized.object, field_name).set(values)
+
+                # Objects were created with explicit primary keys,
+                # move the sequences past them like loaddata does.
+                sequence_sql = connection.ops.sequence_reset_sql(
+                    no_style(),
+                    models,
+                )
+                if sequence_sql:
+                    with connection.cursor() as cursor:
+                        for sql in sequence_sql:
+                            cursor.execute(sql)
+
+                self._invalidate_caches()
         except Exception as ex:
             raise DatabaseError(str(ex))
+        finally:
+            _remove_files(image_file)
@@ -0,0 +1,294 @@
+"""
+Copyright (C) J Leadbetter <j@jleadbetter.com>
+Affero GPL v3
+
+Implementations of the SessionPort
+"""
+
+import datetime
+import json
+import os
+import re
+import secrets
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from ...models.dev.session import Session
+from ...models.errors import ObjectNotFoundError
+from ...models.users import UserUI
+from ...ports.dev.session import SessionPort
+from ...utils.file import get_top_level_directory
+
+# Seconds a session lasts without being used; two weeks
+DEFAULT_SESSION_TTL = 14 * 24 * 60 * 60
+
+# Seconds between writing the new expiry time of a session to file.
+# Saves a write for every request made with the session.
+SESSION_REFRESH_INTERVAL = 60
+
+# Session ids made by secrets.token_urlsafe
+SESSION_ID_PATTERN = re.compile(r'[A-Za-z0-9_-]+')
+
+
+class SessionMixin:
+    """
+    Shared code for the session adapters.
+    Call `_configure_sessions` with the adapter kwargs
+    to pick up the SessionTTL setting.
+    """
+
+    ttl: datetime.timedelta = datetime.timedelta(seconds=DEFAULT_SESSION_TTL)
+
+    def _configure_sessions(self, **kwargs):
+        self.ttl = datetime.timedelta(
+            seconds=int(kwargs.get('sessionttl') or DEFAULT_SESSION_TTL),
+        )
+
+    def _expires(self) -> datetime.datetime:
+        return datetime.datetime.now(datetime.timezone.utc) + self.ttl
+
+    def _new_session(self, user: Optional[UserUI]) -> Session:
+        return Session(
+            id=secrets.token_urlsafe(32),
+            user=user,
+            expires=self._expires(),
+        )
+
+
+class SessionMemoryAdapter(SessionMixin, SessionPort):
+    """
+    Keeps sessions in the memory of the process.
+    Sessions are lost when the process ends,
+    and aren't shared with other processes.
+    """
+
+    def __init__(self, **kwargs):
+        self._configure_sessions(**kwargs)
+        # Sessions in the order they expire,
+        # because each session that is used moves to the end.
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, session_id: str) -> Session:
+        # Must be called with the lock held
+        session = self._sessions.get(session_id)
+        if not session or session.is_expired:
+            self._sessions.pop(session_id, None)
+            raise ObjectNotFoundError(f'Session {session_id} not found')
+        return session
+
+    def _store(self, session: Session) -> Session:
+        # Must be called with the lock held
+        session = session.model_copy(update={'expires': self._expires()}, deep=True)
+        self._sessions[session.id] = session
+        self._sessions.move_to_end(session.id)
+        return session.model_copy(deep=True)
+
+    def create(self, user: Optional[UserUI]=None) -> Session:
+        """
+        Start a new session.
+
+        :user: User that is logged in to the session, if any.
+
+        :return: New session, with a unique, hard-to-guess id.
+        """
+
+        with self._lock:
+            # Cleaning up here keeps memory use bounded
+            # by the number of sessions in use.
+            self._delete_expired()
+            return self._store(self._new_session(user))
+
+    def get(self, session_id: str) -> Session:
+        """
+        Get a session, and extend its expiry time.
+
+        :session_id: ID of the session.
+
+        :return: Found session.
+        :raises: ObjectNotFoundError if the session doesn't exist or has expired.
+        """
+
+        with self._lock:
+            return self._store(self._get(session_id))
+
+    def update(self, session: Session) -> Session:
+        """
+        Store changes to a session, and extend its expiry time.
+
+        :session: Session to update.
+            Must have id.
+
+        :return: Updated session.
+        :raises: ObjectNotFoundError if the session doesn't exist or has expired.
+        """
+
+        with self._lock:
+            self._get(session.id)
+            return self._store(session)
+
+    def delete(self, session_id: str):
+        """
+        End a session.
+        Should not error if the session doesn't exist.
+
+        :session_id: ID of the session.
+        """
+
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def _delete_expired(self) -> int:
+        deleted = 0
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if not session.is_expired:
+                break
+            self._sessions.popitem(last=False)
+            deleted += 1
+        return deleted
+
+    def delete_expired(self) -> int:
+        """
+        Remove all sessions that have expired.
+
+        :return: Number of sessions removed.
+        """
+
+        with self._lock:
+            return self._delete_expired()
+
+
+class SessionJSONFileAdapter(SessionMixin, SessionPort):
+    """
+    Keeps each session in a JSON file in the data directory,
+    so sessions survive restarts and are shared between processes.
+    """
+
+    def __init__(self, **kwargs):
+        self._configure_sessions(**kwargs)
+        self.session_dir = os.path.join(
+            get_top_level_directory(),
+            'data',
+            kwargs.get('sessiondir') or 'sessions',
+        )
+
+    def _get_filename(self, session_id: str) -> str:
+        # The id comes from the client, so it must not be able to
+        # point anywhere outside the session directory.
+        if not SESSION_ID_PATTERN.fullmatch(session_id):
+            raise ObjectNotFoundError(f'Session {session_id} not found')
+        return os.path.join(self.session_dir, f'{session_id}.json')
+
+    def _read(self, session_id: str) -> Session:
+        filename = self._get_filename(session_id)
+        try:
+            with open(filename, 'r') as session_file:
+                session = Session.model_validate(json.load(session_file))
+        except (OSError, ValueError):
+            raise ObjectNotFoundError(f'Session {session_id} not found')
+
+        if session.is_expired:
+            self._remove(filename)
+            raise ObjectNotFoundError(f'Session {session_id} not found')
+        return session
+
+    def _remove(self, filename: str):
+        try:
+            os.remove(filename)
+        except FileNotFoundError:
+            pass
+
+    def _write(self, session: Session) -> Session:
+        os.makedirs(self.session_dir, exist_ok=True)
+        filename = self._get_filename(session.id)
+        # Replacing the file means other processes never read half a session
+        tmp_filename = f'{filename}.{secrets.token_hex(4)}.tmp'
+        try:
+            with open(tmp_filename, 'w') as session_file:
+                session_file.write(session.model_dump_json())
+            os.replace(tmp_filename, filename)
+        finally:
+            self._remove(tmp_filename)
+        return session
+
+    def create(self, user: Optional[UserUI]=None) -> Session:
+        """
+        Start a new session.
+
+        :user: User that is logged in to the session, if any.
+
+        :return: New session, with a unique, hard-to-guess id.
+        """
+
+        return self._write(self._new_session(user))
+
+    def get(self, session_id: str) -> Session:
+        """
+        Get a session, and extend its expiry time.
+
+        :session_id: ID of the session.
+
+        :return: Found session.
+        :raises: ObjectNotFoundError if the session doesn't exist or has expired.
+        """
+
+        session = self._read(session_id)
+        expires = self._expires()
+        if (expires - session.expires).total_seconds() < SESSION_REFRESH_INTERVAL:
+            return session
+
+        session.expires = expires
+        return self._write(session)
+
+    def update(self, session: Session) -> Session:
+        """
+        Store changes to a session, and extend its expiry time.
+
+        :session: Session to update.
+            Must have id.
+
+        :return: Updated session.
+        :raises: ObjectNotFoundError if the session doesn't exist or has expired.
+        """
+
+        self._read(session.id)
+        session = session.model_copy(update={'expires': self._expires()})
+        return self._write(session)
+
+    def delete(self, session_id: str):
+        """
+        End a session.
+        Should not error if the session doesn't exist.
+
+        :session_id: ID of the session.
+        """
+
+        try:
+            self._remove(self._get_filename(session_id))
+        except ObjectNotFoundError:
+            pass
+
+    def delete_expired(self) -> int:
+        """
+        Remove all sessions that have expired.
+
+        :return: Number of sessions removed.
+        """
+
+        if not os.path.isdir(self.session_dir):
+            return 0
+
+        deleted = 0
+        for filename in os.listdir(self.session_dir):
+            session_id, extension = os.path.splitext(filename)
+            if extension != '.json':
+                continue
+            try:
+                self._read(session_id)
+            except ObjectNotFoundError:
+                # Expired sessions are removed when they're read
+                if not os.path.exists(os.path.join(self.session_dir, filename)):
+                    deleted += 1
+        return deleted
@@ -3,17 +3,26 @@ Copyright (C) J Leadbetter <j@jleadbetter.com>
 Affero GPL v3
 """
 
-from typing import List, Union
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Union
 
+from django.contrib.auth.hashers import get_hasher
 from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.db.models import Q, QuerySet
 from django.db.utils import IntegrityError
 
+from app.utils.cache import bump_users_version, get_users_version
 from users.models.settings import UserSettings
 
 from ..models.errors import ObjectExistsError, ObjectNotFoundError
 from ..models.users import UserDB, UserUI
 from ..ports.users import UserDBPort, UserUIPort
 
+# Passwords hashed per task sent to a worker process
+HASHING_CHUNK_SIZE = 16
+
 
 class UserDBDjangoORMAdapter(UserDBPort):
     """
@@ -21,9 +30,12 @@ class UserDBDjangoORMAdapter(UserDBPort):
     """
 
     def __init__(self, **kwargs):
-        # Ignore any kwargs configuration.
-        # This uses the django settings.
+        # Apart from the number of processes that hash passwords,
+        # this uses the django settings.
         super().__init__()
+        self.hashing_workers = int(
+            kwargs.get('hashingworkers') or os.cpu_count() or 1
+        )
 
     def _django_to_pydantic(self, user: UserSettings) -> UserDB:
         # We don't return the password here,
@@ -36,6 +48,41 @@ class UserDBDjangoORMAdapter(UserDBPort):
         )
         return pydantic_user
 
+    def _get_queryset(self, *fields: str) -> QuerySet:
+        # UserSettings reads its username and admin flag from the User,
+        # so the User is always fetched in the same query.
+        # Only the fields used by _django_to_pydantic are loaded,
+        # plus any extra fields that are passed in.
+        return UserSettings.objects.select_related('user').only(
+            'id',
+            'display_name',
+            'user',
+            'user__username',
+            'user__is_superuser',
+            *fields,
+        )
+
+    def _hash_passwords(self, passwords: List[str]) -> List[str]:
+        # Hashing is deliberately slow (PBKDF2 by default),
+        # so larger batches are spread over several processes.
+        # The hasher is picked here, so the workers don't need the settings.
+        hasher = get_hasher('default')
+        salts = [hasher.salt() for _ in passwords]
+        if self.hashing_workers < 2 or len(passwords) < 2:
+            return [
+                hasher.encode(password, salt)
+                for password, salt in zip(passwords, salts)
+            ]
+
+        workers = min(self.hashing_workers, len(passwords))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(
+                hasher.encode,
+                passwords,
+                salts,
+                chunksize=HASHING_CHUNK_SIZE,
+            ))
+
     def create(self, user: UserDB) -> UserDB:
         """
         Create a new user in the database.
@@ -69,6 +116,76 @@ class UserDBDjangoORMAdapter(UserDBPort):
         new_user_db = self._django_to_pydantic(new_settings)
         return new_user_db
 
+    def create_in_batch(self, users: List[UserDB]) -> List[UserDB]:
+        """
+        Batch create multiple users.
+        Ignores users that already exist.
+
+        :users: New users to add to the database.
+            User is counted as a duplicate when it has the same username.
+
+        :return: List of users that were created.
+        :raises: ObjectExistsError if a user was created by someone else
+            while the batch was being written.
+        """
+
+        existing_usernames = set(
+            User.objects.filter(
+                username__in=[user.username for user in users],
+            ).values_list('username', flat=True)
+        )
+
+        new_users = []
+        for user in users:
+            # Also catches duplicates within the batch itself
+            if user.username in existing_usernames:
+                continue
+            existing_usernames.add(user.username)
+            new_users.append(user)
+        if not new_users:
+            return []
+
+        users_with_password = [user for user in new_users if user.password]
+        hashed_passwords = dict(zip(
+            [user.username for user in users_with_password],
+            self._hash_passwords([user.password for user in users_with_password]),
+        ))
+
+        django_users = [
+            User(
+                username=user.username,
+                password=hashed_passwords.get(user.username, ''),
+                is_superuser=user.is_admin,
+            )
+            for user in new_users
+        ]
+        try:
+            with transaction.atomic():
+                django_users = User.objects.bulk_create(django_users)
+                if any(django_user.pk is None for django_user in django_users):
+                    # Not all databases return the new primary keys
+                    user_ids = dict(User.objects.filter(
+                        username__in=[user.username for user in new_users],
+                    ).values_list('username', 'id'))
+                    for django_user in django_users:
+                        django_user.pk = user_ids[django_user.username]
+
+                new_settings = UserSettings.objects.bulk_create([
+                    UserSettings(
+                        user=django_user,
+                        display_name=user.display_name,
+                    )
+                    for django_user, user in zip(django_users, new_users)
+                ])
+        except IntegrityError as exc:
+            raise ObjectExistsError(exc)
+
+        # bulk_create doesn't send the signals that change the version
+        transaction.on_commit(bump_users_version)
+
+        new_users_db = [self._django_to_pydantic(settings) for settings in new_settings]
+        return new_users_db
+
     def get(self, id: str) -> UserDB:
         """
         Get a user from the database using an ID.
@@ -80,7 +197,7 @@ class UserDBDjangoORMAdapter(UserDBPort):
         """
 
         try:
-            settings = UserSettings.objects.get(
+            settings = self._get_queryset().get(
                 id=id,
                 user__is_active=True,
             )
@@ -98,7 +215,7 @@ class UserDBDjangoORMAdapter(UserDBPort):
         :return: First user in the database; None if there are no users.
         """
 
-        user = UserSettings.objects.filter(
+        user = self._get_queryset().filter(
             user__is_active=True,
         ).first()
         userdb = self._django_to_pydantic(user) if user else None
@@ -115,7 +232,7 @@ class UserDBDjangoORMAdapter(UserDBPort):
         """
 
         try:
-            settings = UserSettings.objects.get(
+            settings = self._get_queryset().get(
                 user__username=username,
                 user__is_active=True,
             )
@@ -131,10 +248,64 @@ class UserDBDjangoORMAdapter(UserDBPort):
 
         :return: List of user objects (may be empty)
         """
-        users = UserSettings.objects.filter(user__is_active=True)
+        users = self._get_queryset().filter(user__is_active=True)
         usersdb = [self._django_to_pydantic(user) for user in users]
         return usersdb
 
+    def get_page(
+        self,
+        page: int=0,
+        page_size: int=20,
+        search: Optional[str]=None,
+    ) -> List[UserDB]:
+        """
+        Get a page of users from the database,
+        in the same order as get_all.
+
+        :page: Number of the page, starting at 0.
+        :page_size: Number of users per page.
+        :search: Only get users whose username or display name
+            contains this text, ignoring case.
+
+        :return: List of user objects; empty after the last page.
+        :raises: ValueError if page or page_size is out of range.
+        """
+
+        if page < 0:
+            raise ValueError(f'page must be 0 or more, not {page}')
+        if page_size < 1:
+            raise ValueError(f'page_size must be 1 or more, not {page_size}')
+
+        users = self._get_queryset().filter(user__is_active=True)
+        if search:
+            users = users.filter(
+                Q(user__username__icontains=search) |
+                Q(display_name__icontains=search)
+            )
+        # The id keeps the order stable for users created at the same time
+        users = users.order_by('created', 'id')
+        start = page * page_size
+        usersdb = [
+            self._django_to_pydantic(user)
+            for user in users[start:start + page_size]
+        ]
+        return usersdb
+
+    def get_version(self) -> Optional[str]:
+        """
+        Get a token that changes whenever users are
+        created, updated or removed, by any process.
+        Used to know when cached users are out of date.
+
+        :return: Current version; None if users shouldn't be cached right now.
+        """
+
+        # Inside a transaction, users may have changed
+        # without being committed.
+        if connection.in_atomic_block:
+            return None
+        return get_users_version()
+
     def update(self, user: UserDB) -> UserDB:
         """
         Update an existing user.
@@ -153,21 +324,33 @@ class UserDBDjangoORMAdapter(UserDBPort):
         :raises: ObjectNotFoundError
         """
 
-        try:
-            userdb = UserSettings.objects.get(id=user.id)
-        except Exception as exc:
-            raise ObjectNotFoundError(exc)
-
-        userdb.display_name = user.display_name
-        userdb.user.is_superuser = user.is_admin
-        if user.password:
-            userdb.user.set_password(user.password)
-
-        userdb.user.save()
-        userdb.save()
-
-        updated_user = UserSettings.objects.get(id=user.id)
-        updated_user_db = self._django_to_pydantic(updated_user)
+        with transaction.atomic():
+            try:
+                settings = self._get_queryset(
+                    'user__password',
+                ).select_for_update().get(id=user.id)
+            except Exception as exc:
+                raise ObjectNotFoundError(exc)
+
+            # Only fields that changed are written.
+            # The password is only hashed when a new one is given:
+            # it's None for users read from the database,
+            # and the stored hash if it was passed back unchanged.
+            user_fields = []
+            if settings.user.is_superuser != user.is_admin:
+                settings.user.is_superuser = user.is_admin
+                user_fields.append('is_superuser')
+            if user.password and user.password != settings.user.password:
+                settings.user.set_password(user.password)
+                user_fields.append('password')
+            if user_fields:
+                settings.user.save(update_fields=user_fields)
+
+            if settings.display_name != user.display_name:
+                settings.display_name = user.display_name
+                settings.save(update_fields=['display_name'])
+
+        updated_user_db = self._django_to_pydantic(settings)
         return updated_user_db
 
 
@@ -8,12 +8,59 @@ Implementations of WordPort for retrieving words from storage.
 import json
 import os
 import pathlib
+import sqlite3
+import uuid
+from collections import defaultdict
 from enum import Enum
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 
-from common.models.words import Word
-from common.ports.words import WordPort
-from common.utils.file import DatabaseFileMixin, JSONFileMixin
+from pydantic import BaseModel
+
+from common.models.database import Database
+from common.models.errors import ObjectExistsError, ObjectNotFoundError
+from common.models.words import Translation, Word
+from common.ports.words import WordPort, check_word_filters
+from common.utils.file import DatabaseFileMixin, JSONFileMixin, SQLiteFileMixin
+
+# Maximum number of words per statement when querying by a list of words.
+# Keeps statements below the variable limit of older SQLite versions (999).
+SQLITE_CHUNK_SIZE = 400
+
+# Number of words per bulk insert with the Django ORM
+DJANGO_BATCH_SIZE = 1000
+
+
+def _type_to_dict(word: Word) -> Dict[str, Any]:
+    # Types are pydantic models when created in code,
+    # but dicts when read back from storage.
+    if isinstance(word.type, BaseModel):
+        return word.type.model_dump(mode='json')
+    return word.type
+
+
+def _set_ids(word: Word):
+    # Word.set_id expects the type to be a model,
+    # but words read back from storage have their type as a dict.
+    if isinstance(word.type, BaseModel):
+        word.set_id()
+        return
+
+    if not word.id:
+        word.id = str(uuid.uuid4())
+    if not word.type.get('id'):
+        word.type['id'] = str(uuid.uuid4())
+    for data_item in word.type.get('data') or []:
+        if not data_item.get('id'):
+            data_item['id'] = str(uuid.uuid4())
+    for item in word.translations or []:
+        if not item.id:
+            item.id = str(uuid.uuid4())
+
+
+def _grammar_type(word: Word) -> str:
+    if isinstance(word.type, BaseModel):
+        return word.type.type
+    return word.type['type']
 
 
 class WordJSONFileAdapter(DatabaseFileMixin, JSONFileMixin, WordPort):
@@ -29,13 +76,38 @@ class WordJSONFileAdapter(DatabaseFileMixin, JSONFileMixin, WordPort):
             kwargs['databasefile'],
             'json',
         )
+        self._configure_json_storage(**kwargs)
 
-    def _is_duplicate(
-        self,
-        existing_words: List[Word],
-        new_word: List[Word],
-    ) -> bool:
-        return new_word in existing_words
+        # Maps (languageCode, baseWord) to the position of the word
+        # in `Database.words`, so lookups don't scan the whole list.
+        # Rebuilt whenever a new copy of the database is loaded.
+        self._index: Dict[Tuple[str, str], int] = {}
+        self._indexed_database: Optional[Database] = None
+        self._indexed_count = 0
+
+    def _word_key(self, word: Word) -> Tuple[str, str]:
+        return (word.languageCode, word.baseWord)
+
+    def _load_database(self) -> Database:
+        database = self._read_json()
+        if database is not self._indexed_database:
+            self._index = {}
+            self._indexed_count = 0
+            self._indexed_database = database
+
+        # The parsed database is shared with other adapters,
+        # which may have appended words since we last looked.
+        for position in range(self._indexed_count, len(database.words)):
+            self._index[self._word_key(database.words[position])] = position
+        self._indexed_count = len(database.words)
+        return database
+
+    def _add_to_index(self, database: Database, word: Word):
+        # The parsed database is cached and shared by all adapters,
+        # so it must never hold on to the caller's objects.
+        database.words.append(word.model_copy(deep=True))
+        self._indexed_count = len(database.words)
+        self._index[self._word_key(word)] = self._indexed_count - 1
 
     def create(self, word: Word) -> Word:
         """
@@ -49,15 +121,15 @@ class WordJSONFileAdapter(DatabaseFileMixin, JSONFileMixin, WordPort):
         :raises: ObjectExistsError if the object already exists.
         """
 
-        database = self._read_json()
+        database = self._load_database()
 
-        if self._is_duplicate(database.words, word):
+        if self._word_key(word) in self._index:
             raise ObjectExistsError(
                 f'Word with {word.baseWord} already exists for "{word.languageCode}"')
 
-        word.set_id()
-        database.words.append(word)
-        self._write_json(database)
+        _set_ids(word)
+        self._add_to_index(database, word)
+        self._write_changes(database, 'words', [word])
         return word
 
     def create_in_batch(self, words: List[Word]) -> List[Word]:
@@ -71,13 +143,20 @@ class WordJSONFileAdapter(DatabaseFileMixin, JSONFileMixin, WordPort):
 
         :return: List of words that were created.
         """
-        database = self._read_json()
-        non_duplicates = list(set(words).difference(set(database.words)))
+        database = self._load_database()
+
+        non_duplicates = []
+        for word in words:
+            # Also catches duplicates within the batch itself,
+            # because each new word is indexed as it is added.
+            if self._word_key(word) in self._index:
+                continue
+            _set_ids(word)
+            self._add_to_index(database, word)
+            non_duplicates.append(word)
+
         if non_duplicates:
-            for word in non_duplicates:
-                word.set_id()
-            database.words.extend(non_duplicates)
-            self._write_json(database)
+            self._write_changes(database, 'words', non_duplicates)
         return non_duplicates
 
     def create_or_update(self, word: Word) -> Word:
@@ -102,7 +181,16 @@ class WordJSONFileAdapter(DatabaseFileMixin, JSONFileMixin, WordPort):
         :return: Word object, if it exists.
         :raises: ObjectNotFoundError
         """
-        raise NotImplementedError()
+
+        database = self._load_database()
+        try:
+            position = self._index[(language_code, base_word)]
+        except KeyError:
+            raise ObjectNotFoundError(
+                f'Word {base_word} does not exist for "{language_code}"')
+
+        # Callers may change the word, which must not change the cached database
+        return database.words[position].model_copy(deep=True)
 
     def read_multiple(self, number: int=100, offset: int=0) -> List[Word]:
         """
@@ -115,6 +203,63 @@ class WordJSONFileAdapter(DatabaseFileMixin, JSONFileMixin, WordPort):
         """
         raise NotImplementedError()
 
+    def iter_words(
+        self,
+        language_code: str,
+        batch_size: int=1000,
+        filters: Optional[Dict[str, Any]]=None,
+    ) -> Iterator[Word]:
+        """
+        Iterate over all words of a language.
+        Words are read from storage in batches,
+        so even very large vocabularies can be walked in constant memory.
+
+        Words are returned most frequent first,
+        followed by words without a frequency.
+        Ties are ordered by id.
+
+        :language_code: 2-letter language code of the Words.
+        :batch_size: Number of words to read from storage at a time.
+        :filters: Optional filters:
+            * min_frequency: only words at least this frequent
+            * max_frequency: only words at most this frequent
+            * grammar_type: only words of this grammar type (e.g., 'noun')
+
+        :return: iterator of Word objects
+        :raises: ValueError if a filter isn't supported.
+        """
+
+        filters = check_word_filters(filters)
+        min_frequency = filters.get('min_frequency')
+        max_frequency = filters.get('max_frequency')
+        grammar_type = filters.get('grammar_type')
+
+        # The whole database is already in memory,
+        # so there is nothing to gain from reading in batches.
+        words = []
+        for word in self._load_database().words:
+            if word.languageCode != language_code:
+                continue
+            if min_frequency is not None and (
+                word.frequency is None or word.frequency < min_frequency
+            ):
+                continue
+            if max_frequency is not None and (
+                word.frequency is None or word.frequency > max_frequency
+            ):
+                continue
+            if grammar_type is not None and _grammar_type(word) != grammar_type:
+                continue
+            words.append(word)
+
+        words.sort(key=lambda word: (
+            word.frequency is None,
+            -(word.frequency or 0),
+            word.id or '',
+        ))
+        # Callers may change the words, which must not change the cached database
+        return (word.model_copy(deep=True) for word in words)
+
     def update(self, word: Word) -> Word:
         """
         Update an existing word in the database.
@@ -129,6 +274,37 @@ class WordJSONFileAdapter(DatabaseFileMixin, JSONFileMixin, WordPort):
         """
         raise NotImplementedError()
 
+    def update_frequencies(
+        self,
+        language_code: str,
+        frequencies: Dict[str, int],
+    ) -> int:
+        """
+        Update the frequencies of many words at once.
+        Words that aren't in the database are ignored.
+
+        :language_code: 2-letter language code of the Words.
+        :frequencies: Maps the baseWord of each Word to its new frequency.
+
+        :return: Number of words whose frequency changed.
+        """
+
+        database = self._load_database()
+
+        changed_words = []
+        for base_word, frequency in frequencies.items():
+            position = self._index.get((language_code, base_word))
+            if position is None:
+                continue
+            word = database.words[position]
+            if word.frequency != frequency:
+                word.frequency = frequency
+                changed_words.append(word)
+
+        if changed_words:
+            self._write_changes(database, 'words', changed_words)
+        return len(changed_words)
+
     def delete(self, word: Word) -> bool:
         """
         Remove an existing word in the database.
@@ -155,3 +331,969 @@ class WordJSONFileAdapter(DatabaseFileMixin, JSONFileMixin, WordPort):
         :return: New/updated Word.
         """
         raise NotImplementedError()
+
+
+class WordSQLiteAdapter(DatabaseFileMixin, SQLiteFileMixin, WordPort):
+    """
+    Stores words in a SQLite database file.
+
+    Words are unique on (language_code, base_word),
+    and are returned most frequent first.
+    """
+
+    def __init__(self, **kwargs):
+        self.database = self._get_db_filename(
+            kwargs['databasefile'],
+            'sqlite',
+        )
+
+    def _chunks(self, items: List[Any]) -> List[List[Any]]:
+        return [
+            items[start:start + SQLITE_CHUNK_SIZE]
+            for start in range(0, len(items), SQLITE_CHUNK_SIZE)
+        ]
+
+    def _insert_words(self, connection: sqlite3.Connection, words: List[Word]):
+        word_rows = []
+        data_rows = []
+        translation_rows = []
+        for word in words:
+            word_type = _type_to_dict(word)
+            word_rows.append((
+                word.id,
+                word.languageCode,
+                word.baseWord,
+                word.frequency,
+                word_type['id'],
+                word_type['type'],
+            ))
+            for position, item in enumerate(word_type['data']):
+                fields = {
+                    field: value
+                    for field, value in item.items()
+                    if field != 'id'
+                }
+                data_rows.append((
+                    item['id'],
+                    word.id,
+                    position,
+                    json.dumps(fields),
+                ))
+            for position, translation in enumerate(word.translations or []):
+                translation_rows.append((
+                    translation.id,
+                    word.id,
+                    position,
+                    translation.languageCode,
+                    json.dumps(translation.meanings),
+                ))
+
+        connection.executemany(
+            'INSERT INTO words '
+            '(id, language_code, base_word, frequency, type_id, grammar_type) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            word_rows,
+        )
+        connection.executemany(
+            'INSERT INTO grammar_type_data (id, word_id, position, data) '
+            'VALUES (?, ?, ?, ?)',
+            data_rows,
+        )
+        connection.executemany(
+            'INSERT INTO translations '
+            '(id, word_id, position, language_code, meanings) '
+            'VALUES (?, ?, ?, ?, ?)',
+            translation_rows,
+        )
+
+    def _load_words(
+        self,
+        connection: sqlite3.Connection,
+        word_rows: List[Tuple],
+    ) -> List[Word]:
+        """
+        Build Words from rows of the words table,
+        along with their grammar type data and translations.
+        """
+
+        data = defaultdict(list)
+        translations = defaultdict(list)
+        for chunk in self._chunks([row[0] for row in word_rows]):
+            placeholders = ', '.join('?' * len(chunk))
+            data_rows = connection.execute(
+                'SELECT id, word_id, data FROM grammar_type_data '
+                f'WHERE word_id IN ({placeholders}) ORDER BY position',
+                chunk,
+            )
+            for data_id, word_id, fields in data_rows:
+                data[word_id].append({'id': data_id, **json.loads(fields)})
+
+            translation_rows = connection.execute(
+                'SELECT id, word_id, language_code, meanings FROM translations '
+                f'WHERE word_id IN ({placeholders}) ORDER BY position',
+                chunk,
+            )
+            for translation_id, word_id, language_code, meanings in translation_rows:
+                translations[word_id].append(Translation(
+                    id=translation_id,
+                    word=word_id,
+                    languageCode=language_code,
+                    meanings=json.loads(meanings),
+                ))
+
+        words = [
+            Word(
+                id=word_id,
+                frequency=frequency,
+                languageCode=language_code,
+                baseWord=base_word,
+                translations=translations[word_id],
+                type={
+                    'id': type_id,
+                    'type': grammar_type,
+                    'data': data[word_id],
+                },
+            )
+            for (
+                word_id,
+                language_code,
+                base_word,
+                frequency,
+                type_id,
+                grammar_type,
+            ) in word_rows
+        ]
+        return words
+
+    def _select_word_row(
+        self,
+        connection: sqlite3.Connection,
+        language_code: str,
+        base_word: str,
+    ) -> Optional[Tuple]:
+        row = connection.execute(
+            'SELECT id, language_code, base_word, frequency, type_id, grammar_type '
+            'FROM words WHERE language_code = ? AND base_word = ?',
+            (language_code, base_word),
+        ).fetchone()
+        return row
+
+    def _existing_keys(
+        self,
+        connection: sqlite3.Connection,
+        words: List[Word],
+    ) -> Set[Tuple[str, str]]:
+        keys = list({(word.languageCode, word.baseWord) for word in words})
+        existing_keys = set()
+        for chunk in self._chunks(keys):
+            values = ', '.join(['(?, ?)'] * len(chunk))
+            parameters = [value for key in chunk for value in key]
+            rows = connection.execute(
+                'SELECT language_code, base_word FROM words '
+                f'WHERE (language_code, base_word) IN (VALUES {values})',
+                parameters,
+            )
+            existing_keys.update(rows)
+        return existing_keys
+
+    def _create(self, connection: sqlite3.Connection, word: Word) -> Word:
+        if self._select_word_row(connection, word.languageCode, word.baseWord):
+            raise ObjectExistsError(
+                f'Word with {word.baseWord} already exists for "{word.languageCode}"')
+
+        _set_ids(word)
+        self._insert_words(connection, [word])
+        return word
+
+    def _update(self, connection: sqlite3.Connection, word: Word) -> Word:
+        row = self._select_word_row(connection, word.languageCode, word.baseWord)
+        if not row:
+            raise ObjectNotFoundError(
+                f'Word {word.baseWord} does not exist for "{word.languageCode}"')
+
+        # Replace the stored word, but keep its id
+        word.id = row[0]
+        _set_ids(word)
+        connection.execute('DELETE FROM words WHERE id = ?', (word.id,))
+        self._insert_words(connection, [word])
+        return word
+
+    def create(self, word: Word) -> Word:
+        """
+        Create a new word in the database.
+
+        :word: New Word object to add to the database.
+            Word is counted as a duplicate when it has the same
+            languageCode and baseWord.
+
+        :return: Created Word object.
+        :raises: ObjectExistsError if the object already exists.
+        """
+
+        with self._transaction() as connection:
+            return self._create(connection, word)
+
+    def create_in_batch(self, words: List[Word]) -> List[Word]:
+        """
+        Batch create multiple words.
+        Ignores words that already exist.
+
+        :word: New Word object to add to the database.
+            Word is counted as a duplicate when it has the same
+            languageCode and baseWord.
+
+        :return: List of words that were created.
+        """
+
+        with self._transaction() as connection:
+            existing_keys = self._existing_keys(connection, words)
+
+            new_words = []
+            for word in words:
+                key = (word.languageCode, word.baseWord)
+                # Also catches duplicates within the batch itself
+                if key in existing_keys:
+                    continue
+                existing_keys.add(key)
+                _set_ids(word)
+                new_words.append(word)
+
+            self._insert_words(connection, new_words)
+        return new_words
+
+    def create_or_update(self, word: Word) -> Word:
+        """
+        Create a new word, or update an existing word in the database.
+
+        :word: New Word object to add to the database.
+            Word is counted as a duplicate when it has the same
+            languageCode and baseWord.
+
+        :return: Created Word object.
+        """
+
+        with self._transaction() as connection:
+            try:
+                return self._update(connection, word)
+            except ObjectNotFoundError:
+                return self._create(connection, word)
+
+    def read(self, language_code: str, base_word: str) -> Word:
+        """
+        Retrieve a word from the database.
+
+        :language_code: 2-letter language code of the Word.
+        :base_word: Base word (non-conjugated) of the Word.
+
+        :return: Word object, if it exists.
+        :raises: ObjectNotFoundError
+        """
+
+        row = self._select_word_row(self.connection, language_code, base_word)
+        if not row:
+            raise ObjectNotFoundError(
+                f'Word {base_word} does not exist for "{language_code}"')
+
+        word = self._load_words(self.connection, [row])[0]
+        return word
+
+    def read_multiple(self, number: int=100, offset: int=0) -> List[Word]:
+        """
+        Retrieve multiple words from the database.
+
+        :number: Return a specified number of entries from the database.
+        :offset: Where in the database to start the retrieval.
+
+        :return: list of Word objects
+        """
+
+        rows = self.connection.execute(
+            'SELECT id, language_code, base_word, frequency, type_id, grammar_type '
+            'FROM words ORDER BY frequency DESC, id LIMIT ? OFFSET ?',
+            (number, offset),
+        ).fetchall()
+        words = self._load_words(self.connection, rows)
+        return words
+
+    def iter_words(
+        self,
+        language_code: str,
+        batch_size: int=1000,
+        filters: Optional[Dict[str, Any]]=None,
+    ) -> Iterator[Word]:
+        """
+        Iterate over all words of a language.
+        Words are read from storage in batches,
+        so even very large vocabularies can be walked in constant memory.
+
+        Words are returned most frequent first,
+        followed by words without a frequency.
+        Ties are ordered by id.
+
+        :language_code: 2-letter language code of the Words.
+        :batch_size: Number of words to read from storage at a time.
+        :filters: Optional filters:
+            * min_frequency: only words at least this frequent
+            * max_frequency: only words at most this frequent
+            * grammar_type: only words of this grammar type (e.g., 'noun')
+
+        :return: iterator of Word objects
+        :raises: ValueError if a filter isn't supported.
+        """
+
+        filters = check_word_filters(filters)
+
+        conditions = ['language_code = ?']
+        parameters = [language_code]
+        if filters.get('min_frequency') is not None:
+            conditions.append('frequency >= ?')
+            parameters.append(filters['min_frequency'])
+        if filters.get('max_frequency') is not None:
+            conditions.append('frequency <= ?')
+            parameters.append(filters['max_frequency'])
+        if filters.get('grammar_type') is not None:
+            conditions.append('grammar_type = ?')
+            parameters.append(filters['grammar_type'])
+
+        return self._iter_words(conditions, parameters, batch_size)
+
+    def _iter_words(
+        self,
+        conditions: List[str],
+        parameters: List[Any],
+        batch_size: int,
+    ) -> Iterator[Word]:
+        # Keyset pagination: each batch starts after the last word
+        # of the previous batch, instead of using an offset,
+        # so every batch costs the same.
+        # NULL frequencies sort last, so they are paged separately, on id only;
+        # mixing them into one condition with OR stops SQLite
+        # from seeking to the cursor in the index.
+        select = (
+            'SELECT id, language_code, base_word, frequency, type_id, '
+            'grammar_type FROM words WHERE '
+        )
+
+        last_row = None
+        while True:
+            keyset_conditions = ['frequency IS NOT NULL']
+            keyset_parameters = []
+            if last_row:
+                last_id, last_frequency = last_row[0], last_row[3]
+                keyset_conditions.append('frequency <= ? AND (frequency < ? OR id > ?)')
+                keyset_parameters.extend([last_frequency, last_frequency, last_id])
+
+            where = ' AND '.join(conditions + keyset_conditions)
+            rows = self.connection.execute(
+                f'{select}{where} ORDER BY frequency DESC, id LIMIT ?',
+                [*parameters, *keyset_parameters, batch_size],
+            ).fetchall()
+
+            yield from self._load_words(self.connection, rows)
+            if len(rows) < batch_size:
+                break
+            last_row = rows[-1]
+
+        last_id = None
+        while True:
+            keyset_conditions = ['frequency IS NULL']
+            keyset_parameters = []
+            if last_id is not None:
+                keyset_conditions.append('id > ?')
+                keyset_parameters.append(last_id)
+
+            where = ' AND '.join(conditions + keyset_conditions)
+            rows = self.connection.execute(
+                f'{select}{where} ORDER BY id LIMIT ?',
+                [*parameters, *keyset_parameters, batch_size],
+            ).fetchall()
+
+            yield from self._load_words(self.connection, rows)
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1][0]
+
+    def update(self, word: Word) -> Word:
+        """
+        Update an existing word in the database.
+
+        :word: Word object to update.
+            Words are considered the same when they have the same
+            languageCode and baseWord.
+
+        :return: Updated Word object.
+        :raises: ObjectNotFoundError if Word isn't already in the database.
+            Use `create_or_update` if you're not sure the Word exists.
+        """
+
+        with self._transaction() as connection:
+            return self._update(connection, word)
+
+    def update_frequencies(
+        self,
+        language_code: str,
+        frequencies: Dict[str, int],
+    ) -> int:
+        """
+        Update the frequencies of many words at once.
+        Words that aren't in the database are ignored.
+
+        :language_code: 2-letter language code of the Words.
+        :frequencies: Maps the baseWord of each Word to its new frequency.
+
+        :return: Number of words whose frequency changed.
+        """
+
+        with self._transaction() as connection:
+            cursor = connection.executemany(
+                'UPDATE words SET frequency = ? '
+                'WHERE language_code = ? AND base_word = ? AND frequency IS NOT ?',
+                [
+                    (frequency, language_code, base_word, frequency)
+                    for base_word, frequency in frequencies.items()
+                ],
+            )
+        return cursor.rowcount
+
+    def delete(self, word: Word) -> bool:
+        """
+        Remove an existing word in the database.
+
+        :word: Word object to delete.
+            Words are considered the same when they have the same
+            languageCode and baseWord.
+
+        :return: boolean -- true if deleted, false if Word does not exist.
+            No errors should be thrown if the Word doesn't exist.
+        """
+
+        with self._transaction() as connection:
+            cursor = connection.execute(
+                'DELETE FROM words WHERE language_code = ? AND base_word = ?',
+                (word.languageCode, word.baseWord),
+            )
+        return cursor.rowcount > 0
+
+    def merge_existing(self, word: Word) -> Word:
+        """
+        Search the database for baseWords matching the text in WordData.
+        Merge those Words into the current Word and remove old words.
+        This is especially useful when fixing words that were previously
+        imported as 'unknown' type.
+
+        Frequencies of the merged Words are added to the Word,
+        and their translations are added if the Word doesn't have them yet.
+
+        :word: Word to be merged.
+            Should safely handle if Words do not exist, or if the list is empty.
+
+        :return: New/updated Word.
+        """
+
+        texts = []
+        for item in _type_to_dict(word)['data']:
+            text = item.get('text')
+            if text and text != word.baseWord and text not in texts:
+                texts.append(text)
+
+        with self._transaction() as connection:
+            rows = []
+            for chunk in self._chunks(texts):
+                placeholders = ', '.join('?' * len(chunk))
+                rows.extend(connection.execute(
+                    'SELECT id, language_code, base_word, frequency, type_id, '
+                    'grammar_type FROM words '
+                    f'WHERE language_code = ? AND base_word IN ({placeholders})',
+                    [word.languageCode, *chunk],
+                ))
+
+            translations = list(word.translations or [])
+            for old_word in self._load_words(connection, rows):
+                if old_word.frequency:
+                    word.frequency = (word.frequency or 0) + old_word.frequency
+                for translation in old_word.translations:
+                    if not any(
+                        translation.languageCode == existing.languageCode and
+                        translation.meanings == existing.meanings
+                        for existing in translations
+                    ):
+                        translations.append(Translation(
+                            languageCode=translation.languageCode,
+                            meanings=translation.meanings,
+                        ))
+                connection.execute(
+                    'DELETE FROM words WHERE id = ?',
+                    (old_word.id,),
+                )
+            word.translations = translations
+
+            try:
+                return self._update(connection, word)
+            except ObjectNotFoundError:
+                return self._create(connection, word)
+
+
+class WordDjangoORMAdapter(WordPort):
+    """
+    Uses the Django ORM to manage words.
+    """
+
+    def __init__(self, **kwargs):
+        # Ignore any kwargs configuration, except for the batch size.
+        # This uses the django settings.
+        super().__init__()
+        self.batch_size = int(kwargs.get('batchsize') or DJANGO_BATCH_SIZE)
+
+        # Imported here, so that the other adapters in this module
+        # can be used without setting up Django.
+        from django.db import transaction
+        from words import models
+
+        self._models = models
+        self._django_transaction = transaction
+
+    def _django_to_pydantic(self, word: Any) -> Word:
+        # Expects data and translations to be prefetched
+        pydantic_word = Word(
+            id=str(word.id),
+            frequency=word.frequency,
+            languageCode=word.language_code,
+            baseWord=word.base_word,
+            translations=[
+                Translation(
+                    id=str(translation.id),
+                    word=str(word.id),
+                    languageCode=translation.language_code,
+                    meanings=translation.meanings,
+                )
+                for translation in word.translations.all()
+            ],
+            type={
+                'id': str(word.grammar_type_id),
+                'type': word.grammar_type,
+                'data': [
+                    {'id': str(item.id), **item.data}
+                    for item in word.data.all()
+                ],
+            },
+        )
+        return pydantic_word
+
+    def _pydantic_to_django(self, word: Word) -> Tuple[Any, List[Any], List[Any]]:
+        word_type = _type_to_dict(word)
+        django_word = self._models.Word(
+            id=word.id,
+            language_code=word.languageCode,
+            base_word=word.baseWord,
+            frequency=word.frequency,
+            grammar_type_id=word_type['id'],
+            grammar_type=word_type['type'],
+        )
+        data = [
+            self._models.GrammarTypeData(
+                id=item['id'],
+                word_id=word.id,
+                position=position,
+                data={
+                    field: value
+                    for field, value in item.items()
+                    if field != 'id'
+                },
+            )
+            for position, item in enumerate(word_type['data'])
+        ]
+        translations = [
+            self._models.Translation(
+                id=translation.id,
+                word_id=word.id,
+                position=position,
+                language_code=translation.languageCode,
+                meanings=translation.meanings,
+            )
+            for position, translation in enumerate(word.translations or [])
+        ]
+        return django_word, data, translations
+
+    def _words_with_children(self):
+        return self._models.Word.objects.prefetch_related('data', 'translations')
+
+    def _insert_words(self, words: List[Word]) -> List[Word]:
+        """
+        Insert words and their data in bulk.
+        Words that already exist are skipped.
+
+        :return: Words that were inserted.
+        """
+
+        django_words = []
+        data = []
+        translations = []
+        for word in words:
+            django_word, word_data, word_translations = self._pydantic_to_django(word)
+            django_words.append(django_word)
+            data.extend(word_data)
+            translations.extend(word_translations)
+
+        self._models.Word.objects.bulk_create(
+            django_words,
+            batch_size=self.batch_size,
+            ignore_conflicts=True,
+        )
+
+        # Words added by someone else in the meantime are ignored.
+        # Don't add data for those, because it belongs to another word id.
+        inserted_ids = set(
+            str(word_id)
+            for word_id in self._models.Word.objects.filter(
+                id__in=[word.id for word in words],
+            ).values_list('id', flat=True)
+        )
+        self._models.GrammarTypeData.objects.bulk_create(
+            [item for item in data if str(item.word_id) in inserted_ids],
+            batch_size=self.batch_size,
+        )
+        self._models.Translation.objects.bulk_create(
+            [item for item in translations if str(item.word_id) in inserted_ids],
+            batch_size=self.batch_size,
+        )
+        return [word for word in words if word.id in inserted_ids]
+
+    def _create(self, word: Word) -> Word:
+        exists = self._models.Word.objects.filter(
+            language_code=word.languageCode,
+            base_word=word.baseWord,
+        ).exists()
+        if exists:
+            raise ObjectExistsError(
+                f'Word with {word.baseWord} already exists for "{word.languageCode}"')
+
+        _set_ids(word)
+        self._insert_words([word])
+        return word
+
+    def _update(self, word: Word) -> Word:
+        try:
+            existing_word = self._models.Word.objects.get(
+                language_code=word.languageCode,
+                base_word=word.baseWord,
+            )
+        except self._models.Word.DoesNotExist as exc:
+            raise ObjectNotFoundError(exc)
+
+        # Replace the stored word, but keep its id
+        word.id = str(existing_word.id)
+        _set_ids(word)
+        existing_word.delete()
+        self._insert_words([word])
+        return word
+
+    def create(self, word: Word) -> Word:
+        """
+        Create a new word in the database.
+
+        :word: New Word object to add to the database.
+            Word is counted as a duplicate when it has the same
+            languageCode and baseWord.
+
+        :return: Created Word object.
+        :raises: ObjectExistsError if the object already exists.
+        """
+
+        with self._django_transaction.atomic():
+            return self._create(word)
+
+    def create_in_batch(self, words: List[Word]) -> List[Word]:
+        """
+        Batch create multiple words.
+        Ignores words that already exist.
+
+        :word: New Word object to add to the database.
+            Word is counted as a duplicate when it has the same
+            languageCode and baseWord.
+
+        :return: List of words that were created.
+        """
+
+        created_words = []
+        seen_keys = set()
+        for start in range(0, len(words), self.batch_size):
+            chunk = words[start:start + self.batch_size]
+
+            # Usually all words in a batch share a language,
+            # so this only returns words that are in the chunk.
+            existing_keys = set(
+                self._models.Word.objects.filter(
+                    language_code__in={word.languageCode for word in chunk},
+                    base_word__in={word.baseWord for word in chunk},
+                ).values_list('language_code', 'base_word')
+            )
+
+            new_words = []
+            for word in chunk:
+                key = (word.languageCode, word.baseWord)
+                # Also catches duplicates within the batch itself
+                if key in existing_keys or key in seen_keys:
+                    continue
+                seen_keys.add(key)
+                _set_ids(word)
+                new_words.append(word)
+
+            with self._django_transaction.atomic():
+                created_words.extend(self._insert_words(new_words))
+
+        return created_words
+
+    def create_or_update(self, word: Word) -> Word:
+        """
+        Create a new word, or update an existing word in the database.
+
+        :word: New Word object to add to the database.
+            Word is counted as a duplicate when it has the same
+            languageCode and baseWord.
+
+        :return: Created Word object.
+        """
+
+        with self._django_transaction.atomic():
+            try:
+                return self._update(word)
+            except ObjectNotFoundError:
+                return self._create(word)
+
+    def read(self, language_code: str, base_word: str) -> Word:
+        """
+        Retrieve a word from the database.
+
+        :language_code: 2-letter language code of the Word.
+        :base_word: Base word (non-conjugated) of the Word.
+
+        :return: Word object, if it exists.
+        :raises: ObjectNotFoundError
+        """
+
+        try:
+            word = self._words_with_children().get(
+                language_code=language_code,
+                base_word=base_word,
+            )
+        except self._models.Word.DoesNotExist as exc:
+            raise ObjectNotFoundError(exc)
+
+        return self._django_to_pydantic(word)
+
+    def read_multiple(self, number: int=100, offset: int=0) -> List[Word]:
+        """
+        Retrieve multiple words from the database.
+
+        :number: Return a specified number of entries from the database.
+        :offset: Where in the database to start the retrieval.
+
+        :return: list of Word objects
+        """
+
+        from django.db.models import F
+
+        words = self._words_with_children().order_by(
+            F('frequency').desc(nulls_last=True),
+            'id',
+        )[offset:offset + number]
+        return [self._django_to_pydantic(word) for word in words]
+
+    def iter_words(
+        self,
+        language_code: str,
+        batch_size: int=1000,
+        filters: Optional[Dict[str, Any]]=None,
+    ) -> Iterator[Word]:
+        """
+        Iterate over all words of a language.
+        Words are read from storage in batches,
+        so even very large vocabularies can be walked in constant memory.
+
+        Words are returned most frequent first,
+        followed by words without a frequency.
+        Ties are ordered by id.
+
+        :language_code: 2-letter language code of the Words.
+        :batch_size: Number of words to read from storage at a time.
+        :filters: Optional filters:
+            * min_frequency: only words at least this frequent
+            * max_frequency: only words at most this frequent
+            * grammar_type: only words of this grammar type (e.g., 'noun')
+
+        :return: iterator of Word objects
+        :raises: ValueError if a filter isn't supported.
+        """
+
+        filters = check_word_filters(filters)
+
+        words = self._words_with_children().filter(language_code=language_code)
+        if filters.get('min_frequency') is not None:
+            words = words.filter(frequency__gte=filters['min_frequency'])
+        if filters.get('max_frequency') is not None:
+            words = words.filter(frequency__lte=filters['max_frequency'])
+        if filters.get('grammar_type') is not None:
+            words = words.filter(grammar_type=filters['grammar_type'])
+
+        return self._iter_words(words, batch_size)
+
+    def _iter_words(self, words: Any, batch_size: int) -> Iterator[Word]:
+        from django.db.models import Q
+
+        # Keyset pagination: each batch starts after the last word
+        # of the previous batch, instead of using an offset,
+        # so every batch costs the same.
+        # NULL frequencies sort last, so they are paged separately, on id only;
+        # mixing them into one condition with OR stops the database
+        # from seeking to the cursor in the index.
+        with_frequency = words.filter(frequency__isnull=False).order_by('-frequency', 'id')
+        last_word = None
+        while True:
+            batch = with_frequency
+            if last_word:
+                batch = batch.filter(
+                    Q(frequency__lt=last_word.frequency) |
+                    Q(id__gt=last_word.id),
+                    frequency__lte=last_word.frequency,
+                )
+            batch = list(batch[:batch_size])
+
+            for word in batch:
+                yield self._django_to_pydantic(word)
+            if len(batch) < batch_size:
+                break
+            last_word = batch[-1]
+
+        without_frequency = words.filter(frequency__isnull=True).order_by('id')
+        last_word = None
+        while True:
+            batch = without_frequency
+            if last_word:
+                batch = batch.filter(id__gt=last_word.id)
+            batch = list(batch[:batch_size])
+
+            for word in batch:
+                yield self._django_to_pydantic(word)
+            if len(batch) < batch_size:
+                return
+            last_word = batch[-1]
+
+    def update(self, word: Word) -> Word:
+        """
+        Update an existing word in the database.
+
+        :word: Word object to update.
+            Words are considered the same when they have the same
+            languageCode and baseWord.
+
+        :return: Updated Word object.
+        :raises: ObjectNotFoundError if Word isn't already in the database.
+            Use `create_or_update` if you're not sure the Word exists.
+        """
+
+        with self._django_transaction.atomic():
+            return self._update(word)
+
+    def update_frequencies(
+        self,
+        language_code: str,
+        frequencies: Dict[str, int],
+    ) -> int:
+        """
+        Update the frequencies of many words at once.
+        Words that aren't in the database are ignored.
+
+        :language_code: 2-letter language code of the Words.
+        :frequencies: Maps the baseWord of each Word to its new frequency.
+
+        :return: Number of words whose frequency changed.
+        """
+
+        items = list(frequencies.items())
+        changed_words = []
+        for start in range(0, len(items), self.batch_size):
+            chunk = dict(items[start:start + self.batch_size])
+            words = self._models.Word.objects.filter(
+                language_code=language_code,
+                base_word__in=chunk,
+            ).only('id', 'base_word', 'frequency')
+            for word in words:
+                if word.frequency != chunk[word.base_word]:
+                    word.frequency = chunk[word.base_word]
+                    changed_words.append(word)
+
+        with self._django_transaction.atomic():
+            self._models.Word.objects.bulk_update(
+                changed_words,
+                ['frequency'],
+                batch_size=self.batch_size,
+            )
+        return len(changed_words)
+
+    def delete(self, word: Word) -> bool:
+        """
+        Remove an existing word in the database.
+
+        :word: Word object to delete.
+            Words are considered the same when they have the same
+            languageCode and baseWord.
+
+        :return: boolean -- true if deleted, false if Word does not exist.
+            No errors should be thrown if the Word doesn't exist.
+        """
+
+        deleted, _ = self._models.Word.objects.filter(
+            language_code=word.languageCode,
+            base_word=word.baseWord,
+        ).delete()
+        return deleted > 0
+
+    def merge_existing(self, word: Word) -> Word:
+        """
+        Search the database for baseWords matching the text in WordData.
+        Merge those Words into the current Word and remove old words.
+        This is especially useful when fixing words that were previously
+        imported as 'unknown' type.
+
+        Frequencies of the merged Words are added to the Word,
+        and their translations are added if the Word doesn't have them yet.
+
+        :word: Word to be merged.
+            Should safely handle if Words do not exist, or if the list is empty.
+
+        :return: New/updated Word.
+        """
+
+        texts = []
+        for item in _type_to_dict(word)['data']:
+            text = item.get('text')
+            if text and text != word.baseWord and text not in texts:
+                texts.append(text)
+
+        with self._django_transaction.atomic():
+            old_words = self._words_with_children().filter(
+                language_code=word.languageCode,
+                base_word__in=texts,
+            )
+
+            translations = list(word.translations or [])
+            for old_word in old_words:
+                if old_word.frequency:
+                    word.frequency = (word.frequency or 0) + old_word.frequency
+                for translation in old_word.translations.all():
+                    if not any(
+                        translation.language_code == existing.languageCode and
+                        translation.meanings == existing.meanings
+                        for existing in translations
+                    ):
+                        translations.append(Translation(
+                            languageCode=translation.language_code,
+                            meanings=translation.meanings,
+                        ))
+            old_words.delete()
+            word.translations = translations
+
+            try:
+                return self._update(word)
+            except ObjectNotFoundError:
+                return self._create(word)
@@ -8,7 +8,7 @@ from typing import List, Optional
 from pydantic import BaseModel
 
 #from common.models.session import UserSession
-from common.models.users import User
+from common.models.users import UserDB
 from common.models.words import Word
 
 
@@ -19,5 +19,5 @@ class Database(BaseModel):
     DO NOT USE IN PRODUCTION.
     """
 
-    users: Optional[List[User]] = []
+    users: Optional[List[UserDB]] = []
     words: Optional[List[Word]] = []
@@ -0,0 +1,29 @@
+"""
+Copyright (C) J Leadbetter <j@jleadbetter.com>
+Affero GPL v3
+"""
+
+import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+from ..base import HashableMixin
+from ..users import UserUI
+
+
+class Session(HashableMixin, BaseModel):
+    """
+    Auth state of one client, e.g., one browser.
+    """
+
+    id: str
+    user: Optional[UserUI] = None
+
+    # When the session runs out, unless it is used again before then.
+    # Always timezone-aware (UTC).
+    expires: datetime.datetime
+
+    @property
+    def is_expired(self) -> bool:
+        return self.expires <= datetime.datetime.now(datetime.timezone.utc)
@@ -12,7 +12,7 @@ import sys
 import uuid
 from enum import Enum
 from functools import partial
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple, Type
 
 from pydantic import BaseModel, create_model
 
@@ -218,6 +218,39 @@ class Word(BaseModel):
                     item.id = str(uuid.uuid4())
 
 
+# Grammar models already built by `make_grammar_model`,
+# keyed by language code, model name and instantiated classes.
+# Models that aren't in the config are stored as None.
+_grammar_models: Dict[Tuple[str, str, Tuple], Optional[Type[BaseModel]]] = {}
+
+# Configs per language code.
+# Languages without a config are stored with the DEFAULT_CONFIG.
+_language_configs: Dict[str, Dict[str, Any]] = {}
+
+
+def _get_language_config(language_code: str) -> Dict[str, Any]:
+    if language_code not in _language_configs:
+        try:
+            config_func = importlib.import_module(
+                f'common.models.config.{language_code}',
+            )
+            config = config_func.get_config()
+        except ImportError:
+            config = DEFAULT_CONFIG
+        _language_configs[language_code] = config
+    return _language_configs[language_code]
+
+
+def clear_grammar_models():
+    """
+    Forget all grammar models and language configs built so far.
+    Mainly useful for tests, or after changing a language config.
+    """
+
+    _grammar_models.clear()
+    _language_configs.clear()
+
+
 def make_grammar_model(
     language_code: str,
     grammar_model_name: str,
@@ -228,6 +261,9 @@ def make_grammar_model(
     Looks for a config matching the language code.
     If no configuration exists, falls back to a DEFAULT.
 
+    Each model is only built once;
+    later calls with the same arguments return the same class.
+
     Example:
         NounEN = make_grammar_model('Noun', 'en')
 
@@ -237,16 +273,18 @@ def make_grammar_model(
         listed below this function
     """
 
-    try:
-        config_func = importlib.import_module(
-            f'common.models.config.{language_code}',
-        )
-        config = config_func.get_config()
-    except ImportError:
-        config = DEFAULT_CONFIG
+    key = (
+        language_code,
+        grammar_model_name,
+        tuple(sorted((instantiated_classes or {}).items())),
+    )
+    if key in _grammar_models:
+        return _grammar_models[key]
 
+    config = _get_language_config(language_code)
     grammar_model_config = config.get(grammar_model_name)
     if not grammar_model_config:
+        _grammar_models[key] = None
         return None
 
     model_kwargs = {}
@@ -260,10 +298,12 @@ def make_grammar_model(
             field = field_type
         model_kwargs[field_name] = (field, default)
 
-    return create_model(
+    grammar_model = create_model(
         f'{grammar_model_name}{language_code.upper()}',
         **model_kwargs,
     )
+    _grammar_models[key] = grammar_model
+    return grammar_model
 
 
 # When importing from a file where the type isn't specified
@@ -6,6 +6,8 @@ Port for managing the database.
 """
 
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Iterator
 
 
 class DatabaseError(Exception):
@@ -29,6 +31,15 @@ class DatabasePort(ABC):
         """
         pass
 
+    @contextmanager
+    def bulk_load(self) -> Iterator[None]:
+        """
+        Group many writes, like loading the default data.
+        Adapters that write every change to disk
+        can keep the changes in memory until the end of the block.
+        """
+        yield
+
     @abstractmethod
     def teardown_database(self):
         """
@@ -38,3 +49,29 @@ class DatabasePort(ABC):
         :raises: DatabaseError if something goes wrong.
         """
         pass
+
+    @abstractmethod
+    def create_snapshot(self, snapshot_file: str):
+        """
+        Save a compressed, checksummed image of the database.
+        The snapshot can only be restored by the same kind of adapter.
+
+        :snapshot_file: Path of the snapshot to write.
+
+        :raises: DatabaseError if something goes wrong.
+        """
+        pass
+
+    @abstractmethod
+    def restore_snapshot(self, snapshot_file: str):
+        """
+        Replace the contents of the database with a snapshot,
+        made with `create_snapshot`.
+        Nothing is changed if the snapshot is invalid.
+
+        :snapshot_file: Path of the snapshot to restore.
+
+        :raises: DatabaseError if the snapshot is invalid
+            or something else goes wrong.
+        """
+        pass
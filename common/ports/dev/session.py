@@ -0,0 +1,72 @@
+"""
+Copyright (C) J Leadbetter <j@jleadbetter.com>
+Affero GPL v3
+"""
+
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from ...models.dev.session import Session
+from ...models.users import UserUI
+
+
+class SessionPort(ABC):
+    """
+    Keeps track of sessions, so several users can be logged in at once.
+    Sessions expire when they haven't been used for a while.
+    """
+
+    @abstractmethod
+    def create(self, user: Optional[UserUI]=None) -> Session:
+        """
+        Start a new session.
+
+        :user: User that is logged in to the session, if any.
+
+        :return: New session, with a unique, hard-to-guess id.
+        """
+        pass
+
+    @abstractmethod
+    def get(self, session_id: str) -> Session:
+        """
+        Get a session, and extend its expiry time.
+
+        :session_id: ID of the session.
+
+        :return: Found session.
+        :raises: ObjectNotFoundError if the session doesn't exist or has expired.
+        """
+        pass
+
+    @abstractmethod
+    def update(self, session: Session) -> Session:
+        """
+        Store changes to a session, and extend its expiry time.
+
+        :session: Session to update.
+            Must have id.
+
+        :return: Updated session.
+        :raises: ObjectNotFoundError if the session doesn't exist or has expired.
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, session_id: str):
+        """
+        End a session.
+        Should not error if the session doesn't exist.
+
+        :session_id: ID of the session.
+        """
+        pass
+
+    @abstractmethod
+    def delete_expired(self) -> int:
+        """
+        Remove all sessions that have expired.
+
+        :return: Number of sessions removed.
+        """
+        pass
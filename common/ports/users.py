@@ -4,7 +4,7 @@ Affero GPL v3
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Union
+from typing import List, Optional, Union
 
 from common.models.users import UserDB, UserUI
 
@@ -26,6 +26,19 @@ class UserDBPort(ABC):
         """
         pass
 
+    @abstractmethod
+    def create_in_batch(self, users: List[UserDB]) -> List[UserDB]:
+        """
+        Batch create multiple users.
+        Ignores users that already exist.
+
+        :users: New users to add to the database.
+            User is counted as a duplicate when it has the same username.
+
+        :return: List of users that were created.
+        """
+        pass
+
     @abstractmethod
     def get(self, id: str) -> UserDB:
         """
@@ -69,6 +82,38 @@ class UserDBPort(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_page(
+        self,
+        page: int=0,
+        page_size: int=20,
+        search: Optional[str]=None,
+    ) -> List[UserDB]:
+        """
+        Get a page of users from the database,
+        in the same order as get_all.
+
+        :page: Number of the page, starting at 0.
+        :page_size: Number of users per page.
+        :search: Only get users whose username or display name
+            contains this text, ignoring case.
+
+        :return: List of user objects; empty after the last page.
+        :raises: ValueError if page or page_size is out of range.
+        """
+        pass
+
+    @abstractmethod
+    def get_version(self) -> Optional[str]:
+        """
+        Get a token that changes whenever users are
+        created, updated or removed, by any process.
+        Used to know when cached users are out of date.
+
+        :return: Current version; None if users shouldn't be cached right now.
+        """
+        pass
+
 
 class UserUIPort(ABC):
     """
@@ -6,10 +6,33 @@ Interface for retrieving words from storage.
 """
 
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Any, Dict, Iterator, List, Optional
 
 from common.models.words import Word
 
+# Filters supported by WordPort.iter_words
+WORD_FILTERS = ['min_frequency', 'max_frequency', 'grammar_type']
+
+
+def check_word_filters(filters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Make sure only supported filters are used.
+
+    :filters: Filters passed to WordPort.iter_words.
+
+    :return: The filters, or an empty dict if there are none.
+    :raises: ValueError if a filter isn't supported.
+    """
+
+    filters = filters or {}
+    unknown_filters = set(filters).difference(WORD_FILTERS)
+    if unknown_filters:
+        raise ValueError(
+            f'Unknown word filters: {", ".join(sorted(unknown_filters))}. '
+            f'Expected any of: {", ".join(WORD_FILTERS)}'
+        )
+    return filters
+
 
 class WordPort(ABC):
     """
@@ -82,6 +105,34 @@ class WordPort(ABC):
         """
         pass
 
+    @abstractmethod
+    def iter_words(
+        self,
+        language_code: str,
+        batch_size: int=1000,
+        filters: Optional[Dict[str, Any]]=None,
+    ) -> Iterator[Word]:
+        """
+        Iterate over all words of a language.
+        Words are read from storage in batches,
+        so even very large vocabularies can be walked in constant memory.
+
+        Words are returned most frequent first,
+        followed by words without a frequency.
+        Ties are ordered by id.
+
+        :language_code: 2-letter language code of the Words.
+        :batch_size: Number of words to read from storage at a time.
+        :filters: Optional filters:
+            * min_frequency: only words at least this frequent
+            * max_frequency: only words at most this frequent
+            * grammar_type: only words of this grammar type (e.g., 'noun')
+
+        :return: iterator of Word objects
+        :raises: ValueError if a filter isn't supported.
+        """
+        pass
+
     @abstractmethod
     def update(self, word: Word) -> Word:
         """
@@ -97,6 +148,23 @@ class WordPort(ABC):
         """
         pass
 
+    @abstractmethod
+    def update_frequencies(
+        self,
+        language_code: str,
+        frequencies: Dict[str, int],
+    ) -> int:
+        """
+        Update the frequencies of many words at once.
+        Words that aren't in the database are ignored.
+
+        :language_code: 2-letter language code of the Words.
+        :frequencies: Maps the baseWord of each Word to its new frequency.
+
+        :return: Number of words whose frequency changed.
+        """
+        pass
+
     @abstractmethod
     def delete(self, word: Word) -> bool:
         """
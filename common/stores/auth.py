@@ -3,19 +3,156 @@ Copyright (C) J Leadbetter <j@jleadbetter.com>
 Affero GPL v3
 """
 
-from typing import Any, Optional, Union
+from collections import OrderedDict
+from typing import Any, Iterator, List, Optional, Union
 
 from ..ports.auth import AuthInvalidError
+from ..models.dev.session import Session
 from ..models.errors import ObjectNotFoundError
 from ..models.users import UserUI
 from ..ports.auth import AuthInvalidError
+from ..ports.users import UserDBPort, UserUIPort
 from ..stores.adapter import AdapterStore
 from ..utils.singleton import Singleton
 
+DEFAULT_USER_SELECT_PAGE_SIZE = 20
+MAX_CACHED_USER_SELECT_PAGES = 50
+
+
+class UserSelectOptions:
+    """
+    Users to choose from on the login screen.
+
+    Users are loaded a page at a time, only when they're asked for,
+    and can be searched.
+    Pages are cached until the users change.
+    Only the most recently used pages are kept.
+
+    The options can also be a fixed list of users,
+    which are paged and searched the same way.
+
+    This isn't a list: iterate over it, or use `get_page` and `has_users`.
+    """
+
+    def __init__(
+        self,
+        user_db_adapter: UserDBPort,
+        user_ui_adapter: UserUIPort,
+        page_size: int=DEFAULT_USER_SELECT_PAGE_SIZE,
+        max_cached_pages: int=MAX_CACHED_USER_SELECT_PAGES,
+        users: Optional[List[UserUI]]=None,
+    ):
+        """
+        :user_db_adapter: Adapter to load the users with.
+        :user_ui_adapter: Adapter to convert the users for the UI with.
+        :page_size: Number of users per page.
+        :max_cached_pages: Number of pages to keep in memory.
+        :users: Users to choose from, instead of all users in the database.
+        """
+
+        self.page_size = page_size
+        self.max_cached_pages = max_cached_pages
+        self._user_db_adapter = user_db_adapter
+        self._user_ui_adapter = user_ui_adapter
+        self._users = list(users) if users is not None else None
+        self._pages = OrderedDict()
+        self._version = None
+
+    def __iter__(self) -> Iterator[UserUI]:
+        page = 0
+        while True:
+            usersui = self.get_page(page)
+            yield from usersui
+            if len(usersui) < self.page_size:
+                return
+            page += 1
+
+    def _load_page(self, page: int, search: Optional[str]) -> List[UserUI]:
+        if self._users is not None:
+            return self._search_users(search)[
+                page * self.page_size:(page + 1) * self.page_size
+            ]
+
+        usersdb = self._user_db_adapter.get_page(
+            page=page,
+            page_size=self.page_size,
+            search=search,
+        )
+        return self._user_ui_adapter.get_all(usersdb)
+
+    def _search_users(self, search: Optional[str]) -> List[UserUI]:
+        if not search:
+            return self._users
+
+        search = search.casefold()
+        return [
+            userui for userui in self._users
+            if search in userui.username.casefold()
+            or search in (userui.displayName or '').casefold()
+        ]
+
+    def clear(self):
+        """
+        Forget all cached pages.
+        """
+
+        self._pages.clear()
+        self._version = None
+
+    def has_users(self) -> bool:
+        """
+        Check if there are any users to choose from.
+        Loads the first page, if it isn't cached.
+
+        :return: True if there is at least one user
+        """
+
+        return bool(self.get_page())
+
+    def get_page(self, page: int=0, search: Optional[str]=None) -> List[UserUI]:
+        """
+        Get a page of users.
+
+        :page: Number of the page, starting at 0.
+        :search: Only get users whose username or display name
+            contains this text, ignoring case.
+
+        :return: List of users; empty after the last page.
+        :raises: ValueError if page is out of range.
+        """
+
+        if page < 0:
+            raise ValueError(f'page must be 0 or more, not {page}')
+
+        search = search.strip() if search else None
+        if self._users is not None:
+            return self._load_page(page, search)
+
+        version = self._user_db_adapter.get_version()
+        if version is None:
+            return self._load_page(page, search)
+        if version != self._version:
+            self.clear()
+            self._version = version
+
+        key = (search, page)
+        if key in self._pages:
+            self._pages.move_to_end(key)
+        else:
+            self._pages[key] = self._load_page(page, search)
+            if len(self._pages) > self.max_cached_pages:
+                self._pages.popitem(last=False)
+        return list(self._pages[key])
+
 
 class AuthStore(metaclass=Singleton):
     """
     Tracks auth settings and current authenticated user
+
+    The logged in user of the store itself is shared by the whole process,
+    which is what the desktop app needs.
+    To serve several users from one process,
+    use `session` to get the auth state of each client instead.
     """
 
     LOGGED_IN_USER = 'logged_in_user'
@@ -71,11 +208,19 @@ class AuthStore(metaclass=Singleton):
         self._authn_adapter = adapter_store.get('AuthPort')
         self._user_db_adapter = adapter_store.get('UserDBPort')
         self._user_ui_adapter = adapter_store.get('UserUIPort')
+        self._session_adapter = adapter_store.get('SessionPort')
+
+        # User that new sessions are logged in as
+        self._default_user = None
 
         self._settings = {
             self.LOGGED_IN_USER: None,
             self.IS_CONFIGURED: False,
-            self.USER_SELECT_OPTIONS: [],
+            self.USER_SELECT_OPTIONS: UserSelectOptions(
+                self._user_db_adapter,
+                self._user_ui_adapter,
+                users=[],
+            ),
             self.SHOW_REGISTRATION: False,
             self.SHOW_PASSWORD_FIELD: False,
             self.SHOW_USER_SELECT: False,
@@ -103,16 +248,23 @@ class AuthStore(metaclass=Singleton):
                     # We're going to log the user in automatically
                     if settings.passwordless_login:
                         self._settings[self.LOGGED_IN_USER] = userui
+                        self._default_user = userui
                         # No need to show this
                         self._settings[self.SHOW_USER_SELECT] = False
 
                     elif settings.show_users_on_login_screen:
-                        self._settings[self.USER_SELECT_OPTIONS] = [userui]
+                        self._settings[self.USER_SELECT_OPTIONS] = UserSelectOptions(
+                            self._user_db_adapter,
+                            self._user_ui_adapter,
+                            users=[userui],
+                        )
 
             elif self._settings[self.SHOW_USER_SELECT]:
-                usersdb = self._user_db_adapter.get_all()
-                usersui = self._user_ui_adapter.get_all(usersdb)
-                self._settings[self.USER_SELECT_OPTIONS] = usersui
+                # Nothing is loaded until the options are asked for
+                self._settings[self.USER_SELECT_OPTIONS] = UserSelectOptions(
+                    self._user_db_adapter,
+                    self._user_ui_adapter,
+                )
 
     def get(self, setting: str) -> Union[Any, None]:
         """
@@ -135,15 +287,15 @@ class AuthStore(metaclass=Singleton):
         setting = self._settings[setting]
         return setting
 
-    def login(self, username: str, password: Optional[str]=None) -> UserUI:
+    def authenticate(self, username: str, password: Optional[str]=None) -> UserUI:
         """
-        Log in the user.
-        Sets the LOGGED_IN_USER key in the settings.
+        Check the user's credentials, without logging them in.
 
         :username: User's username
         :password: User's password.
             Not required if passwordless login is enabled
 
+        :return: UserUI object of the user
         :raises: AuthInvalidError if username/password don't work
         """
 
@@ -168,6 +320,21 @@ class AuthStore(metaclass=Singleton):
             # Raises AuthInvalidError if not successful
             userui = self._authn_adapter.login(username, password)
 
+        return userui
+
+    def login(self, username: str, password: Optional[str]=None) -> UserUI:
+        """
+        Log in the user.
+        Sets the LOGGED_IN_USER key in the settings.
+
+        :username: User's username
+        :password: User's password.
+            Not required if passwordless login is enabled
+
+        :raises: AuthInvalidError if username/password don't work
+        """
+
+        userui = self.authenticate(username, password)
         self._settings[self.LOGGED_IN_USER] = userui
         return userui
 
@@ -178,5 +345,128 @@ class AuthStore(metaclass=Singleton):
 
         user = self.get(self.LOGGED_IN_USER)
         if user:
-            self._authn_adapter.logout(user)
+            self.logout_user(user)
             self._settings[self.LOGGED_IN_USER] = None
+
+    def logout_user(self, user: UserUI):
+        """
+        Log a user out with the auth adapter,
+        without changing who is logged in to the store.
+
+        :user: User to log out.
+        """
+
+        self._authn_adapter.logout(user)
+
+    def update_session(self, session_id: str, user: Union[UserUI, None]) -> Session:
+        """
+        Change the logged in user of a session.
+
+        :session_id: ID of the session.
+        :user: User to log in; None to log out.
+
+        :return: Updated Session object.
+        :raises: ObjectNotFoundError if the session doesn't exist
+            or has expired.
+        """
+
+        session = self._session_adapter.get(session_id)
+        session.user = user
+        return self._session_adapter.update(session)
+
+    def session(self, session_id: Optional[str]=None) -> 'AuthSession':
+        """
+        Get the auth state of one client.
+
+        If the session doesn't exist or has expired,
+        a new one is started;
+        check `session_id` of the result to see which one you got.
+
+        :session_id: ID of the session; None to start a new one.
+
+        :return: AuthSession for the session.
+        """
+
+        if session_id:
+            try:
+                return AuthSession(self, self._session_adapter.get(session_id))
+            except ObjectNotFoundError:
+                pass
+
+        session = self._session_adapter.create(self._default_user)
+        return AuthSession(self, session)
+
+
+class AuthSession:
+    """
+    Auth state of one client, such as a browser.
+
+    Works like the AuthStore, but only the logged in user is kept per session.
+    All other settings are shared with the AuthStore.
+    Get one with `AuthStore().session(session_id)`.
+    """
+
+    def __init__(self, auth_store: AuthStore, session: Session):
+        """
+        :auth_store: Store with the shared settings.
+        :session: Session this is the auth state of.
+        """
+
+        self._auth_store = auth_store
+        self.session_id = session.id
+        self._user = session.user
+
+    @property
+    def logged_in_user(self):
+        return self._user
+
+    def get(self, setting: str) -> Union[Any, None]:
+        """
+        Get specified setting.
+        See AuthStore.get for the available settings.
+
+        :setting: One of the available settings
+
+        :return: Specified setting, if exists; otherwise None
+        """
+
+        if setting == AuthStore.LOGGED_IN_USER:
+            return self._user
+        return self._auth_store.get(setting)
+
+    def login(self, username: str, password: Optional[str]=None) -> UserUI:
+        """
+        Log the user in to this session.
+
+        :username: User's username
+        :password: User's password.
+            Not required if passwordless login is enabled
+
+        :raises: AuthInvalidError if username/password don't work,
+            or the session has expired.
+        """
+
+        userui = self._auth_store.authenticate(username, password)
+        try:
+            self._update(userui)
+        except ObjectNotFoundError:
+            # This message is only for internal logging.
+            raise AuthInvalidError(f'Session {self.session_id} has expired')
+        return userui
+
+    def logout(self):
+        """
+        Log the user of this session out.
+        Does nothing if the session has already expired.
+        """
+
+        if self._user:
+            self._auth_store.logout_user(self._user)
+        try:
+            self._update(None)
+        except ObjectNotFoundError:
+            self._user = None
+
+    def _update(self, user: Union[UserUI, None]):
+        self._auth_store.update_session(self.session_id, user)
+        self._user = user
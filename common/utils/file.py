@@ -6,10 +6,56 @@ Affero GPL v3
 import json
 import os
 import pathlib
+import sqlite3
 import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 
 from pydantic import BaseModel
 
+# How JSONFileMixin persists changes.
+# snapshot: rewrite the whole database file on every change.
+# journal: append changes to a JSONL log next to the database file,
+#   and periodically compact the log back into the database file.
+JSON_STORAGE_SNAPSHOT = 'snapshot'
+JSON_STORAGE_JOURNAL = 'journal'
+JSON_STORAGE_MODES = [JSON_STORAGE_SNAPSHOT, JSON_STORAGE_JOURNAL]
+
+DEFAULT_JOURNAL_COMPACT_THRESHOLD = 1000
+
+# Fields that identify a record in each table of the Database.
+# Journal entries are replayed as upserts on these keys.
+JOURNAL_TABLE_KEYS = {
+    'users': ('username',),
+    'words': ('languageCode', 'baseWord'),
+}
+
+# Process-wide cache of parsed databases, shared by all JSON adapters.
+# Maps the path of the database file to
+# (file stamps, parsed Database, number of journal entries).
+# An entry is only used while the file stamps still match the files on disk.
+_json_cache: Dict[str, Tuple[Tuple, 'Database', int]] = {}
+
+# Paths of the databases whose changes are kept in the cache only,
+# until the end of `JSONFileMixin._deferred_writes`.
+_deferred_writes: Set[str] = set()
+
+
+def _file_stamp(path: str) -> Optional[Tuple[int, int, int]]:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+def clear_json_cache():
+    """
+    Forget all parsed JSON databases.
+    The next read of each database will parse the file again.
+    """
+    _json_cache.clear()
+
 
 def get_top_level_directory() -> str:
     """
@@ -56,27 +102,341 @@ class JSONFileMixin:
 
     Must define `self.database`, 
     which is a string for the filename to be read from/written to.
+
+    Call `_configure_json_storage` with the adapter kwargs
+    to pick up the StorageMode and JournalCompactThreshold settings.
     """
 
+    storage_mode: str = JSON_STORAGE_SNAPSHOT
+    journal_compact_threshold: int = DEFAULT_JOURNAL_COMPACT_THRESHOLD
+    _journal_entries: int = 0
+
+    @property
+    def journal(self) -> str:
+        """
+        Path to the journal file that belongs to `self.database`
+        """
+        return f'{os.path.splitext(self.database)[0]}.journal.jsonl'
+
+    def _configure_json_storage(self, **kwargs):
+        storage_mode = kwargs.get('storagemode') or JSON_STORAGE_SNAPSHOT
+        if storage_mode not in JSON_STORAGE_MODES:
+            raise ValueError(
+                f'Unknown StorageMode "{storage_mode}". '
+                f'Expected one of: {", ".join(JSON_STORAGE_MODES)}'
+            )
+        self.storage_mode = storage_mode
+        self.journal_compact_threshold = int(
+            kwargs.get('journalcompactthreshold') or
+            DEFAULT_JOURNAL_COMPACT_THRESHOLD
+        )
+        self._journal_entries = 0
+
+    @contextmanager
+    def _deferred_writes(self) -> Iterator[None]:
+        """
+        Keep the changes made by all adapters of this database in memory,
+        and write the whole database once at the end.
+        Used for bulk loads, which would otherwise rewrite the database
+        every time the journal is compacted, or on every change.
+
+        Nothing is written if an exception is raised inside the block.
+        """
+
+        if self.database in _deferred_writes:
+            yield
+            return
+
+        _deferred_writes.add(self.database)
+        try:
+            yield
+        except Exception:
+            # The cached database has changes that never made it to disk
+            _json_cache.pop(self.database, None)
+            raise
+        finally:
+            _deferred_writes.discard(self.database)
+
+        cached = _json_cache.get(self.database)
+        if cached:
+            self._write_json(cached[1])
+
+    def _fsync_file(self, output_file):
+        output_file.flush()
+        os.fsync(output_file.fileno())
+
+    def _replay_journal(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        self._journal_entries = 0
+        if not os.path.exists(self.journal):
+            return data
+
+        indexes: Dict[str, Dict[Tuple, int]] = {}
+        with open(self.journal, 'r') as journal_file:
+            for line in journal_file:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Only the last line can be partially written,
+                    # if the process died in the middle of an append.
+                    break
+
+                table = entry['table']
+                key_fields = JOURNAL_TABLE_KEYS[table]
+                records = data.setdefault(table, [])
+                if table not in indexes:
+                    indexes[table] = {
+                        tuple(record[field] for field in key_fields): position
+                        for position, record in enumerate(records)
+                    }
+                index = indexes[table]
+
+                record = entry['data']
+                key = tuple(record[field] for field in key_fields)
+                if key in index:
+                    records[index[key]] = record
+                else:
+                    index[key] = len(records)
+                    records.append(record)
+                self._journal_entries += 1
+
+        return data
+
+    def _json_stamps(self) -> Tuple:
+        return (_file_stamp(self.database), _file_stamp(self.journal))
+
+    def _cache_json(self, data: 'Database'):
+        _json_cache[self.database] = (
+            self._json_stamps(),
+            data,
+            self._journal_entries,
+        )
+
     def _read_json(self) -> 'Database':
+        """
+        Read the database, replaying the journal if there is one.
+
+        Returns the already-parsed Database
+        if neither file has changed since the last read or write.
+        Adapters share that object, so changes made to it
+        must be written with `_write_json` or `_write_changes`.
+        """
+
         # Import here to avoid recursive import
         from common.models.database import Database
 
-        # Safety precaution: make sure file exists
-        pathlib.Path(self.database).touch()
+        # Safety precaution: make sure file exists.
+        # Don't touch existing files, because that invalidates the cache.
+        if not os.path.exists(self.database):
+            pathlib.Path(self.database).touch()
+
+        cached = _json_cache.get(self.database)
+        if cached:
+            stamps, database, journal_entries = cached
+            if stamps == self._json_stamps():
+                self._journal_entries = journal_entries
+                return database
 
         try:
             with open(self.database, 'r') as input_file:
-                data = json.load(input_file) or data
+                data = json.load(input_file) or {}
         except json.JSONDecodeError:
             # File is empty; ignore
-            return Database()
+            data = {}
+
+        # Replay even in snapshot mode,
+        # in case the StorageMode setting was changed.
+        data = self._replay_journal(data)
 
-        return Database.model_validate(data)
+        database = Database.model_validate(data)
+        self._cache_json(database)
+        return database
 
     def _write_json(self, data: 'Database'):
-        # Import here to avoid recursive import
-        from common.models.database import Database
+        """
+        Write the whole database to file.
+        This also compacts the journal, if there is one.
+        """
+
+        try:
+            # Write to a temporary file first,
+            # so a crash never leaves a half-written database behind.
+            # Replacing the file also gives it a new inode for the cache.
+            tmp_database = f'{self.database}.tmp'
+            with open(tmp_database, 'w') as output_file:
+                json.dump(data.model_dump(mode='json'), output_file, indent=2)
+                # The journal is removed after this,
+                # so the new database must be on disk first.
+                self._fsync_file(output_file)
+            os.replace(tmp_database, self.database)
+            self._remove_journal()
+        except Exception:
+            # `data` may hold changes that never made it to disk
+            _json_cache.pop(self.database, None)
+            raise
+
+        self._cache_json(data)
+
+    def _remove_journal(self):
+        if os.path.exists(self.journal):
+            os.remove(self.journal)
+        self._journal_entries = 0
+
+    def _write_changes(
+        self,
+        data: 'Database',
+        table: str,
+        records: List[BaseModel],
+    ):
+        """
+        Persist records that were added to or updated in the database.
+
+        Inside `_deferred_writes`, only keeps the changes in memory.
+        In snapshot mode, rewrites the whole database.
+        In journal mode, appends the records to the journal
+        as one group with a single fsync,
+        and compacts once the journal grows past the threshold.
+
+        :data: The database, with the changes already applied.
+        :table: Name of the table that changed (e.g., 'words').
+        :records: Records that were added or updated.
+        """
+
+        if self.database in _deferred_writes:
+            self._cache_json(data)
+            return
+
+        if self.storage_mode != JSON_STORAGE_JOURNAL:
+            self._write_json(data)
+            return
+
+        if self._journal_entries + len(records) > self.journal_compact_threshold:
+            self._write_json(data)
+            return
+
+        lines = [
+            json.dumps({
+                'table': table,
+                'data': record.model_dump(mode='json'),
+            }) + '\n'
+            for record in records
+        ]
+        try:
+            with open(self.journal, 'a') as journal_file:
+                journal_file.writelines(lines)
+                self._fsync_file(journal_file)
+        except Exception:
+            # `data` may hold changes that never made it to disk
+            _json_cache.pop(self.database, None)
+            raise
+
+        self._journal_entries += len(records)
+        self._cache_json(data)
+
+
+class SQLiteFileMixin:
+    """
+    Methods for connecting to a SQLite database file.
+    Used with adapter classes.
+
+    Must define `self.database`,
+    which is a string for the filename of the database.
+    """
+
+    # Grammar type data and translations belong to a word,
+    # and are removed along with it.
+    # Language-specific fields of the grammar type data
+    # are stored as JSON, because they differ between languages.
+    SCHEMA = [
+        '''
+        CREATE TABLE IF NOT EXISTS words (
+            id TEXT PRIMARY KEY,
+            language_code TEXT NOT NULL,
+            base_word TEXT NOT NULL,
+            frequency INTEGER,
+            type_id TEXT NOT NULL,
+            grammar_type TEXT NOT NULL
+        )
+        ''',
+        '''
+        CREATE UNIQUE INDEX IF NOT EXISTS words_language_code_base_word
+        ON words (language_code, base_word)
+        ''',
+        '''
+        CREATE INDEX IF NOT EXISTS words_frequency
+        ON words (frequency)
+        ''',
+        '''
+        CREATE INDEX IF NOT EXISTS words_language_frequency_id
+        ON words (language_code, frequency DESC, id)
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS grammar_type_data (
+            id TEXT PRIMARY KEY,
+            word_id TEXT NOT NULL REFERENCES words (id) ON DELETE CASCADE,
+            position INTEGER NOT NULL,
+            data TEXT NOT NULL
+        )
+        ''',
+        '''
+        CREATE INDEX IF NOT EXISTS grammar_type_data_word_id
+        ON grammar_type_data (word_id)
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS translations (
+            id TEXT PRIMARY KEY,
+            word_id TEXT NOT NULL REFERENCES words (id) ON DELETE CASCADE,
+            position INTEGER NOT NULL,
+            language_code TEXT NOT NULL,
+            meanings TEXT NOT NULL
+        )
+        ''',
+        '''
+        CREATE INDEX IF NOT EXISTS translations_word_id
+        ON translations (word_id)
+        ''',
+    ]
+    TABLES = ['translations', 'grammar_type_data', 'words']
+
+    _connection: Optional[sqlite3.Connection] = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """
+        Connection to the database.
+        Opened on first use, and creates the tables if they don't exist.
+        """
+
+        if self._connection is None:
+            # Transactions are handled explicitly with `_transaction`
+            connection = sqlite3.connect(
+                self.database,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            connection.execute('PRAGMA journal_mode = WAL')
+            connection.execute('PRAGMA synchronous = NORMAL')
+            connection.execute('PRAGMA foreign_keys = ON')
+            self._connection = connection
+            self._create_tables()
+        return self._connection
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        connection = self.connection
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield connection
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+
+    def _create_tables(self):
+        with self._transaction() as connection:
+            for statement in self.SCHEMA:
+                connection.execute(statement)
 
-        with open(self.database, 'w') as output_file:
-            json.dump(data.model_dump(), output_file, indent=2)
+    def _drop_tables(self):
+        with self._transaction() as connection:
+            for table in self.TABLES:
+                connection.execute(f'DROP TABLE IF EXISTS {table}')
@@ -0,0 +1,268 @@
+"""
+Copyright (C) J Leadbetter <j@jleadbetter.com>
+Affero GPL v3
+
+Word frequency tables, as created by scripts/parse_data.py.
+
+Frequency tables are stored either as tab-separated text
+(one `word<TAB>count` per line, most frequent first)
+or in a compact binary format that can be memory-mapped,
+so that a table can be used without reading it into Python objects first.
+
+The binary format (all integers are unsigned 32-bit little-endian):
+
+* header: magic (b'DWFT'), version, number of words, size of the strings
+* counts: one per word, in rank order (most frequent first)
+* offsets: number of words + 1 offsets into the strings, in rank order
+* index: ranks of the words, sorted by their UTF-8 encoding
+* strings: UTF-8 encoded words, in rank order
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from typing import Iterable, Iterator, Optional, Sequence, Tuple
+
+BINARY_EXTENSION = '.bin'
+MAGIC = b'DWFT'
+VERSION = 1
+HEADER = struct.Struct('<4sIII')
+ENCODING = 'utf-8'
+
+
+def _to_little_endian(values: array) -> bytes:
+    if sys.byteorder != 'little':
+        values = array('I', values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def is_binary_frequency_file(path: str) -> bool:
+    """
+    Whether a frequency file uses the binary format.
+
+    :path: Path of the frequency file.
+
+    :return: True if the file has the binary extension.
+    """
+
+    return path.endswith(BINARY_EXTENSION)
+
+
+def iter_frequencies(path: str) -> Iterator[Tuple[str, int]]:
+    """
+    Read the words of a frequency file in either format,
+    most frequent first.
+
+    :path: Path of the frequency file.
+
+    :return: iterator of (word, count)
+    """
+
+    if is_binary_frequency_file(path):
+        with FrequencyTable(path) as table:
+            yield from table
+        return
+
+    with open(path, encoding=ENCODING) as wordfile:
+        for line in wordfile:
+            word, count = line.split('\t')
+            yield word.strip(), int(count)
+
+
+def write_frequency_table(path: str, words: Iterable[Tuple[str, int]]):
+    """
+    Write words to a binary frequency table.
+
+    :path: Path of the file to write.
+    :words: (word, count) tuples, most frequent first.
+    """
+
+    counts = array('I')
+    offsets = array('I', [0])
+    strings = bytearray()
+    encoded_words = []
+    for word, count in words:
+        encoded_word = word.encode(ENCODING)
+        encoded_words.append(encoded_word)
+        counts.append(count)
+        strings += encoded_word
+        offsets.append(len(strings))
+
+    index = array('I', sorted(
+        range(len(encoded_words)),
+        key=encoded_words.__getitem__,
+    ))
+
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as table_file:
+        table_file.write(HEADER.pack(MAGIC, VERSION, len(counts), len(strings)))
+        table_file.write(_to_little_endian(counts))
+        table_file.write(_to_little_endian(offsets))
+        table_file.write(_to_little_endian(index))
+        table_file.write(strings)
+    os.replace(tmp_path, path)
+
+
+class FrequencyTable:
+    """
+    Read-only, memory-mapped binary frequency table.
+
+    Words are looked up by rank in constant time
+    and by word with a binary search over the sorted index.
+    Nothing is decoded until it is asked for.
+
+    Example:
+        with FrequencyTable('parsed_words.bin') as table:
+            most_frequent_word, count = table[0]
+            count = table.get('huis', 0)
+    """
+
+    def __init__(self, path: str):
+        """
+        :path: Path of the binary frequency table.
+
+        :raises: ValueError if the file isn't a frequency table
+            or has an unsupported version.
+        """
+
+        self.path = path
+        with open(path, 'rb') as table_file:
+            size = os.fstat(table_file.fileno()).st_size
+            if size < HEADER.size:
+                raise ValueError(f'{path} is not a frequency table')
+            self._mmap = mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, number_of_words, strings_size = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            self._mmap.close()
+            raise ValueError(f'{path} is not a frequency table')
+        if version != VERSION:
+            self._mmap.close()
+            raise ValueError(
+                f'{path} has version {version}; only version {VERSION} is supported',
+            )
+
+        self._length = number_of_words
+        start = HEADER.size
+        self._counts = self._integers(start, number_of_words)
+        start += number_of_words * 4
+        self._offsets = self._integers(start, number_of_words + 1)
+        start += (number_of_words + 1) * 4
+        self._index = self._integers(start, number_of_words)
+        self._strings_start = start + number_of_words * 4
+
+        if self._strings_start + strings_size != size:
+            self.close()
+            raise ValueError(f'{path} is truncated or corrupt')
+
+    def __contains__(self, word: str) -> bool:
+        return self.rank(word) is not None
+
+    def __enter__(self) -> 'FrequencyTable':
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __getitem__(self, rank: int) -> Tuple[str, int]:
+        return self.word(rank), self.count(rank)
+
+    def __iter__(self) -> Iterator[Tuple[str, int]]:
+        for rank in range(self._length):
+            yield self[rank]
+
+    def __len__(self) -> int:
+        return self._length
+
+    def _encoded_word(self, rank: int) -> bytes:
+        return self._mmap[
+            self._strings_start + self._offsets[rank]:
+            self._strings_start + self._offsets[rank + 1]
+        ]
+
+    def _integers(self, start: int, length: int) -> Sequence[int]:
+        if sys.byteorder == 'little':
+            return memoryview(self._mmap)[start:start + length * 4].cast('I')
+
+        values = array('I', self._mmap[start:start + length * 4])
+        values.byteswap()
+        return values
+
+    def close(self):
+        """
+        Release the memory map.
+        """
+
+        # Views on the map have to be released before it can be closed.
+        for values in [self._counts, self._offsets, self._index]:
+            if isinstance(values, memoryview):
+                values.release()
+        self._mmap.close()
+
+    def count(self, rank: int) -> int:
+        """
+        Get the count of the word at a rank.
+
+        :rank: 0 for the most frequent word.
+
+        :return: number of times the word occurs
+        :raises: IndexError if the rank is out of range.
+        """
+
+        return self._counts[rank]
+
+    def get(self, word: str, default: Optional[int]=None) -> Optional[int]:
+        """
+        Get the count of a word.
+
+        :word: Word to look up.
+        :default: Returned when the word isn't in the table.
+
+        :return: number of times the word occurs, or the default
+        """
+
+        rank = self.rank(word)
+        if rank is None:
+            return default
+        return self._counts[rank]
+
+    def rank(self, word: str) -> Optional[int]:
+        """
+        Get the rank of a word.
+
+        :word: Word to look up.
+
+        :return: 0 for the most frequent word, or None if it isn't in the table
+        """
+
+        encoded_word = word.encode(ENCODING)
+        position = bisect_left(
+            self._index,
+            encoded_word,
+            key=self._encoded_word,
+        )
+        if position < self._length:
+            rank = self._index[position]
+            if self._encoded_word(rank) == encoded_word:
+                return rank
+        return None
+
+    def word(self, rank: int) -> str:
+        """
+        Get the word at a rank.
+
+        :rank: 0 for the most frequent word.
+
+        :return: the word
+        :raises: IndexError if the rank is out of range.
+        """
+
+        if not -self._length <= rank < self._length:
+            raise IndexError('frequency table index out of range')
+        if rank < 0:
+            rank += self._length
+        return self._encoded_word(rank).decode(ENCODING)
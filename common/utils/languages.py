@@ -1,15 +1,45 @@
+"""
+Copyright (C) J Leadbetter <j@jleadbetter.com>
+Affero GPL v3
+
+ISO 639 language codes.
+
+The language table is generated ahead of time
+by scripts/generate_languages.py, and only read when first needed.
+The LanguageCode enum has thousands of members and is slow to build,
+so it is also only created the first time it is used.
+"""
+
+import os
 from enum import StrEnum
+from functools import cache
+from typing import Any, Tuple
+
+LANGUAGES_FILE = os.path.join(os.path.dirname(__file__), 'languages.tsv')
+
+
+@cache
+def get_languages() -> Tuple[Tuple[str, str], ...]:
+    """
+    Get all ISO 639 languages.
+
+    :return: tuple of (subtag, description) for each language
+    """
 
-from langcodes.registry_parser import parse_registry
+    with open(LANGUAGES_FILE, encoding='utf-8') as languages_file:
+        return tuple(
+            tuple(line.split('\t', 1))
+            for line in languages_file.read().splitlines()
+        )
 
 
-# ISO 639 language codes
-LanguageCode = StrEnum(
-    'LanguageCode',
-    {
-        data['Subtag']: data['Subtag'].lower()
-        for data in parse_registry()
-        if data['Type'] == 'language' and
-        data['Subtag'] != 'mro'  # Disallowed key in Python Enum
-    },
-)
+def __getattr__(name: str) -> Any:
+    if name == 'LanguageCode':
+        # Cache on the module, so __getattr__ isn't called again.
+        globals()[name] = StrEnum(
+            'LanguageCode',
+            {subtag: subtag.lower() for subtag, _description in get_languages()},
+            module=__name__,
+        )
+        return globals()[name]
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
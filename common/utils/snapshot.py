@@ -0,0 +1,122 @@
+"""
+Copyright (C) J Leadbetter <j@jleadbetter.com>
+Affero GPL v3
+
+Database snapshots: a compressed image of a database
+that can be restored without re-importing the data.
+
+A snapshot is a gzip file containing a single JSON header line,
+followed by the database image as dumped by the adapter.
+The header records the format version, the kind of adapter that made it,
+and the size and sha256 checksum of the image,
+which are checked before anything is restored.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+from typing import Any, Dict
+
+SNAPSHOT_FORMAT = 'dutch-words-snapshot'
+SNAPSHOT_VERSION = 1
+
+# Size of the blocks copied between files
+BLOCK_SIZE = 1024 * 1024
+
+
+class SnapshotError(Exception):
+    """
+    Thrown when a snapshot can't be read, or doesn't match the database.
+    """
+    pass
+
+
+def _checksum(path: str) -> str:
+    with open(path, 'rb') as image_file:
+        return hashlib.file_digest(image_file, 'sha256').hexdigest()
+
+
+def write_snapshot(snapshot_file: str, image_file: str, kind: str):
+    """
+    Compress a database image into a snapshot.
+
+    :snapshot_file: Path of the snapshot to write.
+    :image_file: Path of the database image, as dumped by the adapter.
+    :kind: Kind of database the image is for (e.g., 'sqlite').
+    """
+
+    header = {
+        'format': SNAPSHOT_FORMAT,
+        'version': SNAPSHOT_VERSION,
+        'kind': kind,
+        'size': os.path.getsize(image_file),
+        'sha256': _checksum(image_file),
+    }
+
+    tmp_file = f'{snapshot_file}.tmp'
+    try:
+        with gzip.open(tmp_file, 'wb') as snapshot:
+            snapshot.write(json.dumps(header).encode() + b'\n')
+            with open(image_file, 'rb') as image:
+                shutil.copyfileobj(image, snapshot, BLOCK_SIZE)
+        os.replace(tmp_file, snapshot_file)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+
+def read_snapshot(snapshot_file: str, image_file: str, kind: str) -> Dict[str, Any]:
+    """
+    Decompress a snapshot into a database image, and verify it.
+
+    :snapshot_file: Path of the snapshot to read.
+    :image_file: Path to write the database image to.
+        Only written if the snapshot is valid.
+    :kind: Kind of database the snapshot should be for.
+
+    :return: header of the snapshot
+    :raises: SnapshotError if the snapshot is invalid, corrupt,
+        or made for another kind of database.
+    """
+
+    tmp_file = f'{image_file}.tmp'
+    try:
+        with gzip.open(snapshot_file, 'rb') as snapshot:
+            try:
+                header = json.loads(snapshot.readline())
+            except ValueError:
+                raise SnapshotError(f'{snapshot_file} is not a snapshot')
+            if not isinstance(header, dict) or header.get('format') != SNAPSHOT_FORMAT:
+                raise SnapshotError(f'{snapshot_file} is not a snapshot')
+            if header.get('version') != SNAPSHOT_VERSION:
+                raise SnapshotError(
+                    f'{snapshot_file} has version {header.get("version")}; '
+                    f'only version {SNAPSHOT_VERSION} is supported',
+                )
+            if header.get('kind') != kind:
+                raise SnapshotError(
+                    f'{snapshot_file} is a snapshot of a {header.get("kind")} '
+                    f'database, not {kind}',
+                )
+
+            with open(tmp_file, 'wb') as image:
+                shutil.copyfileobj(snapshot, image, BLOCK_SIZE)
+    except (OSError, EOFError) as exc:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise SnapshotError(f'{snapshot_file} can not be read: {exc}')
+
+    try:
+        if (
+            os.path.getsize(tmp_file) != header.get('size') or
+            _checksum(tmp_file) != header.get('sha256')
+        ):
+            raise SnapshotError(f'{snapshot_file} is corrupt: checksum mismatch')
+        os.replace(tmp_file, image_file)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+    return header
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+
+"""
+Copyright (C) J Leadbetter <j@jleadbetter.com>
+Affero GPL v3
+
+Benchmarks the ways of turning a JSON database file into a Database:
+
+* parse: json.load only, the floor for any approach
+* validate: json.load + Database.model_validate (what JSONFileMixin does)
+* construct: json.load + model_construct for each Word and Translation,
+  i.e., a "trusted" read that skips validation
+* validate_json: a cached TypeAdapter validating the raw JSON in one step
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+TOP_LEVEL_FOLDER = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..', '..'),
+)
+if TOP_LEVEL_FOLDER not in sys.path:
+    sys.path.append(TOP_LEVEL_FOLDER)
+
+from pydantic import TypeAdapter
+
+from common.models.database import Database
+from common.models.users import UserDB
+from common.models.words import Translation, UnknownBase, UnknownDataBase, Word
+from common.utils.file import DatabaseFileMixin, JSONFileMixin
+
+DEFAULT_NUMBER_OF_WORDS = 100000
+DEFAULT_REPEAT = 3
+DATABASE_FILE = 'benchmark_json_read'
+
+
+class BenchmarkJSONAdapter(DatabaseFileMixin, JSONFileMixin):
+    def __init__(self):
+        self.database = self._get_db_filename(DATABASE_FILE, 'json')
+
+
+def make_database(number_of_words: int) -> Database:
+    UnknownData = UnknownDataBase('nl')
+    Unknown = UnknownBase('nl')
+
+    words = []
+    for i in range(number_of_words):
+        base_word = f'woord{i}'
+        word = Word(
+            frequency=number_of_words - i,
+            languageCode='nl',
+            baseWord=base_word,
+            translations=[
+                Translation(languageCode='en', meanings=[f'word{i}']),
+            ],
+            type=Unknown(data=[UnknownData(text=base_word)]),
+        )
+        word.set_id()
+        words.append(word)
+    return Database(words=words)
+
+
+def parse(filename: str) -> dict:
+    with open(filename) as input_file:
+        return json.load(input_file)
+
+
+def validate(filename: str) -> Database:
+    return Database.model_validate(parse(filename))
+
+
+def construct(filename: str) -> Database:
+    data = parse(filename)
+    words = []
+    for word in data['words']:
+        word['translations'] = [
+            Translation.model_construct(**translation)
+            for translation in word['translations'] or []
+        ]
+        words.append(Word.model_construct(**word))
+    users = [UserDB.model_validate(user) for user in data['users']]
+    return Database.model_construct(users=users, words=words)
+
+
+DATABASE_ADAPTER = TypeAdapter(Database)
+
+
+def validate_json(filename: str) -> Database:
+    with open(filename, 'rb') as input_file:
+        return DATABASE_ADAPTER.validate_json(input_file.read())
+
+
+def run(number_of_words: int, repeat: int):
+    adapter = BenchmarkJSONAdapter()
+
+    print(f'Writing {number_of_words} words...')
+    adapter._write_json(make_database(number_of_words))
+    size = os.path.getsize(adapter.database) / 1024 / 1024
+
+    try:
+        print(f'Reading {size:.1f} MB, best of {repeat}...')
+        for read in [parse, validate, construct, validate_json]:
+            seconds = min(timeit.repeat(
+                lambda: read(adapter.database),
+                number=1,
+                repeat=repeat,
+            ))
+            print(f'{read.__name__:>15}: {seconds:.3f}s')
+    finally:
+        os.remove(adapter.database)
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(
+        prog='BenchmarkJSONRead',
+        description='Compares ways of reading a JSON database file',
+    )
+    arg_parser.add_argument(
+        '-n',
+        '--number-of-words',
+        type=int,
+        default=DEFAULT_NUMBER_OF_WORDS,
+        help=f'Number of words in the database; defaults to {DEFAULT_NUMBER_OF_WORDS}',
+    )
+    arg_parser.add_argument(
+        '-r',
+        '--repeat',
+        type=int,
+        default=DEFAULT_REPEAT,
+        help=f'Number of reads to time for each approach; defaults to {DEFAULT_REPEAT}',
+    )
+    args = arg_parser.parse_args()
+    run(args.number_of_words, args.repeat)
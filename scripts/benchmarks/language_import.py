@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+"""
+Copyright (C) J Leadbetter <j@jleadbetter.com>
+Affero GPL v3
+
+Benchmarks the startup cost of the ISO 639 language codes,
+each in a fresh interpreter:
+
+* registry: parsing the langcodes registry and building the enum,
+  what every import used to do
+* import: importing common.utils.languages
+* table: reading the pregenerated language table
+* enum: building LanguageCode from the pregenerated table
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+TOP_LEVEL_FOLDER = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..', '..'),
+)
+
+DEFAULT_REPEAT = 5
+
+TIMER = '''
+import time
+start = time.perf_counter()
+{code}
+print(time.perf_counter() - start)
+'''
+
+APPROACHES = {
+    'registry': '''
+from enum import StrEnum
+from langcodes.registry_parser import parse_registry
+StrEnum('LanguageCode', {
+    data['Subtag']: data['Subtag'].lower()
+    for data in parse_registry()
+    if data['Type'] == 'language' and data['Subtag'] != 'mro'
+})
+''',
+    'import': '''
+import common.utils.languages
+''',
+    'table': '''
+from common.utils.languages import get_languages
+get_languages()
+''',
+    'enum': '''
+from common.utils.languages import LanguageCode
+''',
+}
+
+
+def time_in_new_interpreter(code: str) -> float:
+    output = subprocess.run(
+        [sys.executable, '-c', TIMER.format(code=code)],
+        cwd=TOP_LEVEL_FOLDER,
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return float(output.stdout)
+
+
+def run(repeat: int):
+    print(f'Best of {repeat}, each in a new interpreter...')
+    for name, code in APPROACHES.items():
+        seconds = min(
+            time_in_new_interpreter(code) for i in range(repeat)
+        )
+        print(f'{name:>10}: {seconds * 1000:.1f}ms')
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(
+        prog='BenchmarkLanguageImport',
+        description='Compares the startup cost of loading language codes',
+    )
+    arg_parser.add_argument(
+        '-r',
+        '--repeat',
+        type=int,
+        default=DEFAULT_REPEAT,
+        help=f'Number of runs to time for each approach; defaults to {DEFAULT_REPEAT}',
+    )
+    args = arg_parser.parse_args()
+    run(args.repeat)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+
+"""
+Copyright (C) J Leadbetter <j@jleadbetter.com>
+Affero GPL v3
+
+Benchmarks cleaning the lines of a Leipzig word list:
+
+* strip_chain: the previous cleaning, stripping and lowercasing
+  every word, then lowercasing again when counting
+* regex: a single precompiled regex per word
+* cleaner: scripts.parse_data.WordCleaner without inner characters
+* cleaner_nl: WordCleaner with the Dutch configuration
+"""
+
+import argparse
+import itertools
+import os
+import random
+import re
+import string
+import sys
+import time
+from typing import Callable, Iterator
+
+TOP_LEVEL_FOLDER = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..', '..'),
+)
+if TOP_LEVEL_FOLDER not in sys.path:
+    sys.path.append(TOP_LEVEL_FOLDER)
+
+from scripts.parse_data import INNER_CHARACTERS, WordCleaner
+
+DEFAULT_NUMBER_OF_LINES = 10000000
+DISTINCT_LINES = 100000
+
+
+def make_lines(number_of_lines: int) -> Iterator[str]:
+    """
+    Lines in the format of the Leipzig word lists,
+    with roughly one in five words needing cleaning.
+    """
+
+    random.seed(0)
+    lines = []
+    for i in range(DISTINCT_LINES):
+        word = ''.join(
+            random.choice(string.ascii_lowercase + 'éëï')
+            for j in range(random.randint(1, 10))
+        )
+        dirty = random.random()
+        if dirty < 0.1:
+            word = f'"{word.capitalize()},'
+        elif dirty < 0.15:
+            word = f'{random.randint(1, 99)}{word}'
+        elif dirty < 0.2:
+            word = f"{word}'s"
+        lines.append(f'{i}\t{word}\t{random.randint(1, 1000)}\n')
+    return itertools.islice(itertools.cycle(lines), number_of_lines)
+
+
+def strip_chain(word: str) -> str:
+    word = word.strip().strip(string.punctuation).strip(string.digits)
+    if not word.isalpha() or len(word) < 2:
+        word = ''
+    return word.lower().lower()
+
+
+PATTERN = re.compile(
+    rf'\s*[{re.escape(string.punctuation)}]*[{string.digits}]*'
+    rf'(.*?)[{string.digits}]*[{re.escape(string.punctuation)}]*\s*',
+    re.DOTALL,
+)
+
+
+def regex(word: str) -> str:
+    word = PATTERN.fullmatch(word).group(1)
+    if len(word) < 2 or not word.isalpha():
+        return ''
+    return word.lower()
+
+
+def time_cleaning(clean: Callable[[str], str], number_of_lines: int) -> float:
+    start = time.perf_counter()
+    for line in make_lines(number_of_lines):
+        tmp_word, tmp_count = line.split('\t')[1:3]
+        clean(tmp_word), int(tmp_count)
+    return time.perf_counter() - start
+
+
+def run(number_of_lines: int):
+    print(f'Cleaning {number_of_lines} lines...')
+    approaches = {
+        'strip_chain': strip_chain,
+        'regex': regex,
+        'cleaner': WordCleaner().clean,
+        'cleaner_nl': WordCleaner(INNER_CHARACTERS['nl']).clean,
+    }
+    for name, clean in approaches.items():
+        seconds = time_cleaning(clean, number_of_lines)
+        print(f'{name:>12}: {seconds:.3f}s')
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(
+        prog='BenchmarkWordCleaning',
+        description='Compares ways of cleaning the words of a word list',
+    )
+    arg_parser.add_argument(
+        '-n',
+        '--number-of-lines',
+        type=int,
+        default=DEFAULT_NUMBER_OF_LINES,
+        help=f'Number of lines to clean; defaults to {DEFAULT_NUMBER_OF_LINES}',
+    )
+    args = arg_parser.parse_args()
+    run(args.number_of_lines)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+"""
+Copyright (C) J Leadbetter <j@jleadbetter.com>
+Affero GPL v3
+
+Generates common/utils/languages.tsv from the IANA language subtag
+registry shipped with langcodes.
+
+Parsing the registry takes a noticeable amount of time,
+so it is done once here instead of on every import.
+Rerun this script after upgrading langcodes.
+"""
+
+import argparse
+import os
+
+from langcodes.registry_parser import parse_registry
+
+TOP_LEVEL_FOLDER = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..'),
+)
+DEFAULT_OUTPUT_FILE = os.path.join(
+    TOP_LEVEL_FOLDER,
+    'common',
+    'utils',
+    'languages.tsv',
+)
+
+
+def generate(output_file: str=DEFAULT_OUTPUT_FILE) -> int:
+    """
+    Write the language table to a tab-separated file,
+    one language per line: subtag, description.
+
+    :output_file: Path of the file to write.
+
+    :return: Number of languages written.
+    """
+
+    languages = [
+        (data['Subtag'], data['Description'][0])
+        for data in parse_registry()
+        if data['Type'] == 'language' and
+        data['Subtag'] != 'mro'  # Disallowed key in Python Enum
+    ]
+
+    with open(output_file, 'w', encoding='utf-8') as output:
+        for subtag, description in languages:
+            output.write(f'{subtag}\t{description}\n')
+
+    return len(languages)
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(
+        prog='GenerateLanguages',
+        description='Generates the language table from the langcodes registry',
+    )
+    arg_parser.add_argument(
+        '-o',
+        '--output-file',
+        default=DEFAULT_OUTPUT_FILE,
+        help=f'File to write; defaults to {DEFAULT_OUTPUT_FILE}',
+    )
+    args = arg_parser.parse_args()
+    number_of_languages = generate(args.output_file)
+    print(f'Wrote {number_of_languages} languages to {args.output_file}')
@@ -5,26 +5,153 @@ Copyright (C) J Leadbetter <j@jleadbetter.com>
 Affero GPL v3
 
 This script creates a basic json dump that can be used as test data.
+
+Words are read, built and written in chunks,
+so memory use doesn't grow with the size of the frequency file.
+A background thread builds the next chunk while the current one is written.
+With --workers, the words are built and validated in a process pool,
+which sends them back as plain dicts.
+
+With --incremental, the existing database is kept:
+only words and users that aren't stored yet are added,
+and changed frequencies are updated in bulk.
 """
 
 import argparse
 import csv
+import itertools
 import os
-import pprint
+import queue
 import sys
-from typing import List, Optional, Tuple
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import closing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 TOP_LEVEL_FOLDER = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 if TOP_LEVEL_FOLDER not in sys.path:
     sys.path.append(TOP_LEVEL_FOLDER)
 
-from common.models.users import User
+from common.models.users import UserDB
 from common.models.words import UnknownBase, UnknownDataBase, Word
 from common.stores.adapter import AdapterStore
+from common.utils.frequencies import is_binary_frequency_file, iter_frequencies
 
 DEFAULT_LANGUAGE_CODE = 'nl'
 DEFAULT_FREQUENCIES_FILE = 'parsed_words.txt'
 DEFAULT_USERS_FILE = 'users.csv'
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_WORKERS = 1
+
+# Number of built chunks waiting to be written
+CHUNKS_AHEAD = 2
+
+# Seconds between checks whether the writer has stopped,
+# while a built chunk waits for room in the queue
+CHUNK_PUT_TIMEOUT = 0.1
+
+# Seconds between progress reports
+PROGRESS_INTERVAL = 5
+
+
+def build_words(
+    language_code: str,
+    word_tuples: List[Tuple[str, int]],
+) -> List[Word]:
+    """
+    Build words of unknown type, with their ids set.
+
+    :language_code: 2-letter language code of the words.
+    :word_tuples: (base word, frequency) tuples.
+
+    :return: list of Word objects
+    """
+
+    UnknownData = UnknownDataBase(language_code)
+    Unknown = UnknownBase(
+        language_code,
+        instantiated_classes={'UnknownData': UnknownData},
+    )
+
+    # Setting the ids on creation is much cheaper
+    # than setting them afterwards with Word.set_id.
+    return [
+        Word(
+            id=str(uuid.uuid4()),
+            frequency=frequency,
+            languageCode=language_code,
+            baseWord=base_word,
+            translations=[],
+            type=Unknown(
+                id=str(uuid.uuid4()),
+                data=[
+                    UnknownData(
+                        id=str(uuid.uuid4()),
+                        text=base_word,
+                    ),
+                ],
+            ),
+        )
+        for base_word, frequency in word_tuples
+    ]
+
+
+def build_word_dicts(
+    language_code: str,
+    word_tuples: List[Tuple[str, int]],
+) -> List[Dict[str, Any]]:
+    """
+    Build words in a worker process.
+    Pydantic models of the grammar types are created at runtime
+    and can't be pickled, so the validated words are sent back as dicts.
+
+    :language_code: 2-letter language code of the words.
+    :word_tuples: (base word, frequency) tuples.
+
+    :return: list of dumped Word objects
+    """
+
+    return [word.model_dump() for word in build_words(language_code, word_tuples)]
+
+
+class Progress:
+    """
+    Reports how many words were written, and how fast.
+    """
+
+    def __init__(self, interval: float=PROGRESS_INTERVAL):
+        self.interval = interval
+        self.words = 0
+        self.bytes = 0
+        self.start = time.perf_counter()
+        self._last_report = self.start
+
+    def _report(self, now: float):
+        seconds = max(now - self.start, 1e-9)
+        megabytes = self.bytes / 1024 / 1024
+        print(
+            f'{self.words} words ({megabytes:.1f} MB) in {seconds:.1f}s: '
+            f'{self.words / seconds:.0f} words/s, {megabytes / seconds:.2f} MB/s'
+        )
+
+    def done(self):
+        self._report(time.perf_counter())
+
+    def update(self, words: int, size: int):
+        """
+        :words: Number of words written since the last update.
+        :size: Size of those words in the frequency file, in bytes.
+        """
+
+        self.words += words
+        self.bytes += size
+        now = time.perf_counter()
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            self._report(now)
 
 
 class DatabaseCreator:
@@ -34,8 +161,14 @@ class DatabaseCreator:
         word_frequencies_file: str=DEFAULT_FREQUENCIES_FILE,
         users_file: str=DEFAULT_USERS_FILE,
         add_default_data: Optional[bool]=False,
+        chunk_size: int=DEFAULT_CHUNK_SIZE,
+        workers: int=DEFAULT_WORKERS,
+        incremental: Optional[bool]=False,
     ):
         self.language_code = language_code
+        self.incremental = incremental
+        self.chunk_size = chunk_size
+        self.workers = max(workers, 1)
         self.frequencies_file = os.path.join(
             TOP_LEVEL_FOLDER,
             'data',
@@ -52,40 +185,24 @@ class DatabaseCreator:
         self.adapter_store = AdapterStore()
         self.adapter_store.initialize()
         self.database_port = self.adapter_store.get('DatabasePort')
-        self.user_port = self.adapter_store.get('UserPort')
+        self.user_port = self.adapter_store.get('UserDBPort')
         self.word_port = self.adapter_store.get('WordPort')
 
-        self.UnknownData = UnknownDataBase(language_code)
-        self.Unknown = UnknownBase(
-            language_code,
-            instantiated_classes=[self.UnknownData],
-        )
-
     def _create_words(self, word_tuples: List[Tuple[str, int]]) -> List[Word]:
-        words: List[Word] = []
-        for base_word, frequency in word_tuples:
-            word = Word(
-                frequency=frequency,
-                languageCode=self.language_code,
-                baseWord=base_word,
-                translations=[],
-                type=self.Unknown(
-                    data=[
-                        self.UnknownData(
-                            text=base_word,
-                        ),
-                    ],
-                ),
-            )
-            words.append(word)
-        return words
+        return build_words(self.language_code, word_tuples)
+
+    def _create_words_from_dicts(self, word_dicts: List[Dict[str, Any]]) -> List[Word]:
+        # The words were already validated by the worker,
+        # so they are put back together without validating them again.
+        # Their types stay dicts, like those of words read from storage.
+        return [Word.model_construct(**word_dict) for word_dict in word_dicts]
 
-    def _import_users(self) -> List[User]:
+    def _import_users(self) -> List[UserDB]:
         with open(self.users_file) as input_file:
             user_data = [row for row in csv.reader(input_file, delimiter=',')][1:]
 
         users = [
-            User(
+            UserDB(
                 username=user[0],
                 display_name=user[1],
                 password=user[2],
@@ -94,39 +211,209 @@ class DatabaseCreator:
         ]
         return users
 
-    def _import_words(self) -> List[Word]:
-        word_data: List[Tuple[str, int]] = []
-        with open(self.frequencies_file) as wordfile:
-            wordlines = wordfile.readlines()
-            for line in wordlines:
-                word, frequency = line.split('\t')
-                word_data.append((word.strip(), int(frequency.strip())))
+    def _import_words(self) -> Iterator[Tuple[List[Word], int]]:
+        """
+        Read and build the words in chunks.
+
+        :return: iterator of (words, size of the words in the frequency file)
+        """
+
+        if self.workers == 1:
+            for word_tuples, size in self._read_chunks():
+                yield self._create_words(word_tuples), size
+            return
+
+        # Only a few chunks per worker are submitted ahead,
+        # so the frequency file is never held in memory as a whole.
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            pending = deque()
+            chunks = self._read_chunks()
+            while True:
+                chunk = next(chunks, None)
+                if chunk:
+                    word_tuples, size = chunk
+                    pending.append((
+                        executor.submit(
+                            build_word_dicts,
+                            self.language_code,
+                            word_tuples,
+                        ),
+                        size,
+                    ))
+                if pending and (not chunk or len(pending) >= self.workers * 2):
+                    word_dicts, size = pending.popleft()
+                    yield self._create_words_from_dicts(word_dicts.result()), size
+                elif not chunk:
+                    return
+
+    def _read_chunks(self) -> Iterator[Tuple[List[Tuple[str, int]], int]]:
+        """
+        Read the frequency file in chunks.
+
+        :return: iterator of ((word, count) tuples, size of the chunk in bytes)
+        """
+
+        # Each word takes three integers and its text in a binary table,
+        # and a tab, the count and a newline in a text file.
+        binary = is_binary_frequency_file(self.frequencies_file)
+        frequencies = iter_frequencies(self.frequencies_file)
+        while True:
+            word_tuples = list(itertools.islice(frequencies, self.chunk_size))
+            if not word_tuples:
+                return
+
+            size = sum(
+                len(word.encode()) + (12 if binary else len(str(count)) + 2)
+                for word, count in word_tuples
+            )
+            yield word_tuples, size
+
+    def _import_words_in_background(self) -> Iterator[Tuple[List[Word], int]]:
+        """
+        Same as _import_words,
+        but builds the next chunks in a thread while the caller writes.
+        The thread stops when the caller stops reading,
+        for example because writing a chunk failed.
+        """
+
+        chunks = queue.Queue(maxsize=CHUNKS_AHEAD)
+        done = object()
+        stop = threading.Event()
+
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    chunks.put(item, timeout=CHUNK_PUT_TIMEOUT)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce():
+            try:
+                with closing(self._import_words()) as words:
+                    for chunk in words:
+                        if not put(chunk):
+                            return
+            except Exception as exc:
+                put(exc)
+            else:
+                put(done)
+
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+        try:
+            while True:
+                chunk = chunks.get()
+                if chunk is done:
+                    break
+                if isinstance(chunk, Exception):
+                    raise chunk
+                yield chunk
+        finally:
+            stop.set()
+            producer.join()
+
+    def _sync_words(self) -> Tuple[int, int, int]:
+        """
+        Add the words that aren't stored yet,
+        and update the frequencies of the ones that changed.
+        Existing words keep their ids and data.
+
+        :return: number of (new, updated, unchanged) words
+        """
+
+        # Only the frequencies of the existing words are kept in memory,
+        # not the words themselves.
+        existing_frequencies = {
+            word.baseWord: word.frequency
+            for word in self.word_port.iter_words(
+                self.language_code,
+                batch_size=self.chunk_size,
+            )
+        }
+
+        new = updated = unchanged = 0
+        progress = Progress()
+        for word_tuples, size in self._read_chunks():
+            new_word_tuples = []
+            changed_frequencies = {}
+            for word, count in word_tuples:
+                if word not in existing_frequencies:
+                    new_word_tuples.append((word, count))
+                elif existing_frequencies[word] != count:
+                    changed_frequencies[word] = count
+                else:
+                    unchanged += 1
 
-        words = self._create_words(word_data)
-        return words
+            if new_word_tuples:
+                self.word_port.create_in_batch(self._create_words(new_word_tuples))
+                new += len(new_word_tuples)
+            if changed_frequencies:
+                self.word_port.update_frequencies(
+                    self.language_code,
+                    changed_frequencies,
+                )
+                updated += len(changed_frequencies)
+            progress.update(len(word_tuples), size)
 
-    def _write_to_file(self, words: List[Word], users: List[User]):
-        self.word_port.create_in_batch(words)
-        self.user_port.create_in_batch(users)
+        progress.done()
+        return new, updated, unchanged
+
+    def _write_users(self, users: List[UserDB]) -> int:
+        """
+        Create the users that aren't stored yet.
+        Existing users are left alone.
+
+        :return: number of users created
+        """
+
+        return len(self.user_port.create_in_batch(users))
+
+    def _write_words(self) -> Progress:
+        progress = Progress()
+        for words, size in self._import_words_in_background():
+            self.word_port.create_in_batch(words)
+            progress.update(len(words), size)
+        progress.done()
+        return progress
 
     def run(self):
+        if self.incremental:
+            self.run_incremental()
+            return
+
         print('Tearing down and rebuilding database...')
         self.database_port.teardown_database()
         self.database_port.initialize_database()
 
         if self.add_default_data:
-            print('Generating default data...')
-            words = self._import_words()
-            users = self._import_users()
-
-            print('Writing to database...')
-            self._write_to_file(
-                words=words,
-                users=users,
-            )
+            with self.database_port.bulk_load():
+                print(f'Writing words in chunks of {self.chunk_size}...')
+                self._write_words()
+
+                print('Writing users...')
+                self._write_users(self._import_users())
         else:
             print('Skipping default data.')
 
+        print('Done!')
+
+    def run_incremental(self):
+        print('Updating database...')
+        self.database_port.initialize_database()
+
+        if self.add_default_data:
+            with self.database_port.bulk_load():
+                print(f'Syncing words in chunks of {self.chunk_size}...')
+                new, updated, unchanged = self._sync_words()
+                print(f'{new} new words, {updated} updated, {unchanged} unchanged.')
+
+                print('Syncing users...')
+                created = self._write_users(self._import_users())
+                print(f'{created} new users.')
+        else:
+            print('Skipping default data.')
 
         print('Done!')
 
@@ -151,6 +438,7 @@ if __name__ == '__main__':
             'The file must be located in the "data" directory, '
             'in a folder named after the language code '
             '(e.g., "data/nl"). '
+            'Can be tab-separated text or a binary .bin table. '
             'Ignored if --add-default-data is False.'
         ),
     )
@@ -170,6 +458,38 @@ if __name__ == '__main__':
         action='store_true',
         default=False,
     )
+    arg_parser.add_argument(
+        '-c',
+        '--chunk-size',
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help=(
+            'Number of words that are built and written at a time; '
+            f'defaults to {DEFAULT_CHUNK_SIZE}. '
+            'Ignored if --add-default-data is False.'
+        ),
+    )
+    arg_parser.add_argument(
+        '-p',
+        '--workers',
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=(
+            'Number of processes that prepare words; '
+            f'defaults to {DEFAULT_WORKERS}. '
+            'Ignored if --add-default-data is False.'
+        ),
+    )
+    arg_parser.add_argument(
+        '-i',
+        '--incremental',
+        default=False,
+        action='store_true',
+        help=(
+            'Keep the existing database; '
+            'only add new words and users, and update changed frequencies.'
+        ),
+    )
     arg_parser.add_argument(
         '--force',
         default=False,
@@ -178,7 +498,7 @@ if __name__ == '__main__':
     )
     args = arg_parser.parse_args()
 
-    if not args.force:
+    if not args.force and not args.incremental:
         print('WARNING: This will destroy the existing database, if it exists!!!')
         while True:
             confirm_database_teardown = input('Are you sure you want to do this? (yes/no) ')
@@ -197,4 +517,7 @@ if __name__ == '__main__':
         word_frequencies_file=args.word_frequencies_file,
         users_file=args.users_file,
         add_default_data=args.add_default_data,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        incremental=args.incremental,
     ).run()
@@ -6,18 +6,127 @@ Affero GPL v3
 
 This script parses the data from the Universität Leipzig Corpora Collections.
 The data has a separate copyright from this script (CC-BY-NC).
+
+The input file can be plain text, compressed with gzip, bzip2 or xz,
+or a (compressed) tar archive as downloaded from the Corpora Collections.
+Compressed files are decompressed while parsing, without extracting them.
+
+With --merge, the counts of a new corpus are added to an existing output file
+instead of replacing it. A manifest next to the output file records
+which corpora have been counted, so merging the same corpus twice does nothing,
+whether it is compressed or not. Corpora are recognised by the name of the
+word list and a checksum of its decompressed contents.
+Only merged corpora are recorded: to merge into the output of a first corpus
+later, parse that corpus with --merge as well.
+
+Output files ending with .bin are written as binary frequency tables
+(see common.utils.frequencies) instead of tab-separated text.
 """
 
 import argparse
+import bz2
+import gzip
+import hashlib
+import heapq
+import itertools
+import json
+import lzma
 import os
 import string
-from typing import Dict, List, Tuple
+import sys
+import tarfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 TOP_LEVEL_FOLDER = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if TOP_LEVEL_FOLDER not in sys.path:
+    sys.path.append(TOP_LEVEL_FOLDER)
+
+from common.utils.frequencies import (
+    is_binary_frequency_file,
+    iter_frequencies,
+    write_frequency_table,
+)
+
 DEFAULT_MINIMUM_FREQUENCY = 8
 DEFAULT_LANGUAGE_CODE = 'nl'
 DEFAULT_INPUT_FILE = 'corpora_collection.txt'
 DEFAULT_OUTPUT_FILE = 'parsed_words.txt'
+DEFAULT_WORKERS = 1
+ENCODING = 'utf-8'
+
+COMPRESSED_FILE_OPENERS = {
+    '.gz': gzip.open,
+    '.bz2': bz2.open,
+    '.xz': lzma.open,
+}
+TAR_EXTENSIONS = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+
+# The Corpora Collections archives contain several files;
+# the word list is the one ending with this.
+DEFAULT_TAR_MEMBER = '-words.txt'
+
+# Number of lines per task when compressed input is parsed by several workers
+LINES_PER_CHUNK = 100000
+
+# Appended to the output file name for the manifest of counted corpora
+MANIFEST_SUFFIX = '.manifest.json'
+
+# Appended to the output file and manifest names while they are written
+TMP_SUFFIX = '.tmp'
+
+# Number of bytes read at once when calculating checksums
+CHECKSUM_BLOCK_SIZE = 1024 * 1024
+
+# Characters that may appear inside a word, per language code.
+# Dutch uses an apostrophe for some plurals (e.g., "foto's").
+INNER_CHARACTERS = {
+    'nl': "'",
+}
+
+
+class WordCleaner:
+    """
+    Cleans words from a word list:
+    whitespace, punctuation and then digits are removed from the ends,
+    and anything that isn't a word of at least two letters is dropped.
+
+    Most words need no cleaning at all,
+    so they are only checked once before being lowercased.
+    """
+
+    def __init__(self, inner_characters: str=''):
+        """
+        :inner_characters: Characters that are allowed inside a word,
+            besides letters.
+        """
+
+        self._inner_characters = (
+            str.maketrans('', '', inner_characters)
+            if inner_characters else None
+        )
+
+    def clean(self, word: str) -> str:
+        """
+        Clean a single word.
+
+        :word: Word as found in the word list.
+
+        :return: the lowercased word, or an empty string if it isn't a word
+        """
+
+        if not word.isalpha():
+            word = word.strip().strip(string.punctuation).strip(string.digits)
+            letters = (
+                word.translate(self._inner_characters)
+                if self._inner_characters else word
+            )
+            if not letters.isalpha():
+                return ''
+        if len(word) < 2:
+            return ''
+        return word.lower()
 
 
 class Parser:
@@ -25,10 +134,19 @@ class Parser:
         self,
         minimum_frequency: int=DEFAULT_MINIMUM_FREQUENCY,
         language_code: str=DEFAULT_LANGUAGE_CODE,
-        input_file: str=DEFAULT_OUTPUT_FILE,
-        output_file: str=DEFAULT_INPUT_FILE,
+        input_file: str=DEFAULT_INPUT_FILE,
+        output_file: str=DEFAULT_OUTPUT_FILE,
+        top_k: Optional[int]=None,
+        workers: int=DEFAULT_WORKERS,
+        tar_member: str=DEFAULT_TAR_MEMBER,
+        merge: bool=False,
     ):
         self.minimum_frequency = minimum_frequency
+        self.top_k = top_k
+        self.workers = max(workers, 1)
+        self.tar_member = tar_member
+        self.merge = merge
+        self.cleaner = WordCleaner(INNER_CHARACTERS.get(language_code, ''))
         self.input_file = os.path.join(
             TOP_LEVEL_FOLDER,
             'data',
@@ -41,65 +159,289 @@ class Parser:
             language_code,
             output_file,
         )
+        self.manifest_file = f'{self.output_file}{MANIFEST_SUFFIX}'
+
+        # Name of the word list that was parsed,
+        # without the compression extension or the folders in an archive.
+        self.source_name = os.path.basename(self.input_file)
+        for extension in COMPRESSED_FILE_OPENERS:
+            if self.source_name.endswith(extension):
+                self.source_name = self.source_name[:-len(extension)]
 
-    def _clean_word(self, word_line: List[str]) -> Tuple[str, int]:
+    def _checksum_file(self, path: str, checksum: Any):
+        with open(path, 'rb') as checked_file:
+            for block in iter(lambda: checked_file.read(CHECKSUM_BLOCK_SIZE), b''):
+                checksum.update(block)
+
+    def _clean_word(self, word_line: str) -> Tuple[str, int]:
         tmp_word, tmp_count = word_line.split('\t')[1:3]
+        return self.cleaner.clean(tmp_word), int(tmp_count)
 
-        no_whitespace = tmp_word.strip()
-        # We're only removing punctuation on the ends,
-        # because Dutch uses an apostrophe for some plurals,
-        # which should be kept.
-        no_punctuation = no_whitespace.strip(string.punctuation)
-        no_digits = no_punctuation.strip(string.digits)
-        no_symbols = self._remove_symbols(no_digits)
-        word = no_symbols.lower()
-
-        count = int(tmp_count.strip())
-        return word, count
-
-    def _import_words(self) -> List[str]:
-        imported_words = self._read_file()
-        tmp_words = [(key, value) for key, value in imported_words.items()]
-        sorted_words = sorted(
-            tmp_words,
-            key=lambda x: x[1],
-            reverse=True,
-        )
+    def _merge_existing(self, new_words: Dict[str, int]) -> Dict[str, int]:
+        """
+        Add the counts of the existing output file to the new counts.
+        The existing words keep their order, followed by the new words,
+        so ties are sorted the same as before.
+        """
+
+        if not os.path.exists(self.output_file):
+            return new_words
+
+        words = {}
+        for word, count in iter_frequencies(self.output_file):
+            words[word] = count + new_words.pop(word, 0)
+        words.update(new_words)
+        return words
+
+    def _output_checksum(self) -> str:
+        checksum = hashlib.sha256()
+        self._checksum_file(self.output_file, checksum)
+        return checksum.hexdigest()
+
+    def _read_manifest(self) -> Dict[str, Any]:
+        """
+        Read the corpora that were counted in the existing output file.
+
+        :raises: ValueError if the manifest doesn't belong to the output file,
+            for example when an earlier run was interrupted.
+        """
+
+        if not all(map(os.path.exists, [self.output_file, self.manifest_file])):
+            return {'sources': []}
+        with open(self.manifest_file, encoding=ENCODING) as manifest_file:
+            manifest = json.load(manifest_file)
+        if manifest.get('output_sha256') != self._output_checksum():
+            raise ValueError(
+                f'{self.manifest_file} does not match {self.output_file}; '
+                'parse the corpora again without --merge',
+            )
+        return manifest
+
+    def _select_words(self, imported_words: Dict[str, int]) -> List[Tuple[str, int]]:
+        # Filter while iterating, so only the words we keep get sorted.
         if self.minimum_frequency > 0:
-            words = list(
-                filter(lambda x: x[1] >= self.minimum_frequency, sorted_words),
+            words = (
+                (word, count) for word, count in imported_words.items()
+                if count >= self.minimum_frequency
             )
         else:
-            words = sorted_words
+            words = imported_words.items()
+
+        # nlargest keeps at most top_k words in a heap
+        # and returns the same order as a full sort.
+        if self.top_k is not None:
+            return heapq.nlargest(self.top_k, words, key=lambda x: x[1])
+        return sorted(words, key=lambda x: x[1], reverse=True)
+
+    def _count_chunks(self, lines: Iterator[str]) -> Iterator[Dict[str, int]]:
+        """
+        Count chunks of lines in a process pool, in the order they were read.
+        Only a few chunks per worker are read ahead,
+        so the input is never held in memory as a whole.
+        """
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            pending = deque()
+            while True:
+                chunk = list(itertools.islice(lines, LINES_PER_CHUNK))
+                if chunk:
+                    pending.append(executor.submit(self._count_lines, chunk))
+                if pending and (not chunk or len(pending) >= self.workers * 2):
+                    yield pending.popleft().result()
+                elif not chunk:
+                    return
+
+    def _count_lines(self, lines: Iterable[str]) -> Dict[str, int]:
+        # Only the counts of the cleaned words are kept in memory,
+        # not the lines of the file.
+        words = {}
+        for line in lines:
+            word, count = self._clean_word(line)
+            if word:
+                words[word] = words.get(word, 0) + count
         return words
 
-    def _read_file(self) -> Dict[str, int]:
-        with open(self.input_file) as wordfile:
-            raw_word_data = wordfile.readlines()
-            words = {}
-            for line in raw_word_data:
-                tmp_word, count = self._clean_word(line)
-                if tmp_word:
-                    word = tmp_word.lower()
-                    if word in words:
-                        words[word] = words[word] + count
-                    else:
-                        words[word] = count
+    def _count_shard(self, shard: Tuple[int, int]) -> Dict[str, int]:
+        return self._count_lines(self._read_lines(*shard))
+
+    def _is_compressed(self) -> bool:
+        return self.input_file.endswith(
+            TAR_EXTENSIONS + tuple(COMPRESSED_FILE_OPENERS),
+        )
+
+    def _decode_lines(
+        self,
+        lines: Iterable[bytes],
+        checksum: Optional[Any],
+    ) -> Iterator[str]:
+        for line in lines:
+            if checksum is not None:
+                checksum.update(line)
+            yield line.decode(ENCODING)
+
+    def _read_compressed_lines(self, checksum: Optional[Any]=None) -> Iterator[str]:
+        """
+        Read the lines of a compressed input file.
+
+        :checksum: hashlib object that is updated with the decompressed lines,
+            so it is the same as the checksum of the uncompressed file.
+        """
+
+        if not self.input_file.endswith(TAR_EXTENSIONS):
+            extension = os.path.splitext(self.input_file)[1]
+            open_file = COMPRESSED_FILE_OPENERS[extension]
+            with open_file(self.input_file, 'rb') as wordfile:
+                yield from self._decode_lines(wordfile, checksum)
+            return
+
+        # 'r|*' reads the archive as a stream, in any compression
+        with tarfile.open(self.input_file, mode='r|*') as archive:
+            for member in archive:
+                if member.isfile() and member.name.endswith(self.tar_member):
+                    self.source_name = os.path.basename(member.name)
+                    yield from self._decode_lines(
+                        archive.extractfile(member),
+                        checksum,
+                    )
+                    return
+        raise FileNotFoundError(
+            f'No file ending with "{self.tar_member}" in {self.input_file}',
+        )
+
+    def _read_file(self, checksum: Optional[Any]=None) -> Dict[str, int]:
+        """
+        Count the words in the input file.
+
+        :checksum: hashlib object to update with the decompressed input.
+            Compressed input is only read once, for both.
+        """
+
+        if self._is_compressed():
+            lines = self._read_compressed_lines(checksum)
+            if self.workers == 1:
+                return self._count_lines(lines)
+            return self._merge_counts(self._count_chunks(lines))
+
+        if checksum is not None:
+            self._checksum_file(self.input_file, checksum)
+        shards = self._shards()
+        if len(shards) == 1:
+            return self._count_shard(shards[0])
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            return self._merge_counts(executor.map(self._count_shard, shards))
+
+    def _merge_counts(self, counts: Iterable[Dict[str, int]]) -> Dict[str, int]:
+        # Merging the counts in file order keeps the words
+        # in the order they were first seen,
+        # so ties are sorted the same as in a single process.
+        words = {}
+        for partial_words in counts:
+            for word, count in partial_words.items():
+                words[word] = words.get(word, 0) + count
         return words
 
-    def _remove_symbols(self, word: str) -> str:
-        if not word.isalpha() or len(word) < 2:
-            return ''
-        return word
+    def _read_lines(self, start: int, end: int) -> Iterator[str]:
+        with open(self.input_file, 'rb') as wordfile:
+            wordfile.seek(start)
+            position = start
+            while position < end:
+                line = wordfile.readline()
+                if not line:
+                    return
+                position += len(line)
+                yield line.decode(ENCODING)
+
+    def _shards(self) -> List[Tuple[int, int]]:
+        """
+        Split the input file into byte ranges, one per worker.
+        Each range starts at the beginning of a line.
+        """
+
+        size = os.path.getsize(self.input_file)
+        boundaries = [0]
+        with open(self.input_file, 'rb') as wordfile:
+            for i in range(1, self.workers):
+                wordfile.seek(max(size * i // self.workers, boundaries[-1]))
+                if wordfile.tell() > 0:
+                    wordfile.seek(wordfile.tell() - 1)
+                    wordfile.readline()  # Move to the start of the next line
+                boundaries.append(min(wordfile.tell(), size))
+        boundaries.append(size)
+
+        shards = [
+            (start, end)
+            for start, end in zip(boundaries, boundaries[1:])
+            if start < end
+        ]
+        return shards or [(0, size)]
+
+    def _write_to_file(
+        self,
+        words: Iterable[Tuple[str, int]],
+        manifest: Optional[Dict[str, Any]]=None,
+    ):
+        """
+        Write the output file, and its manifest when merging.
+
+        Both are written to temporary files first:
+        when merging, the output file is also the input.
+        The manifest records the checksum of the output file it belongs to,
+        so a run that is interrupted between replacing the two files
+        is noticed by the next merge, instead of counting a corpus twice.
+        """
+
+        tmp_file = f'{self.output_file}{TMP_SUFFIX}'
+        if is_binary_frequency_file(self.output_file):
+            write_frequency_table(tmp_file, words)
+        else:
+            wordlines = (f'{word}\t{count}\n' for word, count in words)
+            with open(tmp_file, 'w', encoding=ENCODING) as wordfile:
+                wordfile.writelines(wordlines)
+
+        if manifest is None:
+            # The output no longer contains the counted corpora
+            if os.path.exists(self.manifest_file):
+                os.remove(self.manifest_file)
+            os.replace(tmp_file, self.output_file)
+            return
 
-    def _write_to_file(self, words: List[Tuple[str, int]]):
-        wordlines = [f'{word}\t{count}\n' for word, count in words]
-        with open(self.output_file, 'w') as wordfile:
-            wordfile.writelines(wordlines)
+        checksum = hashlib.sha256()
+        self._checksum_file(tmp_file, checksum)
+        manifest['output_sha256'] = checksum.hexdigest()
+        tmp_manifest_file = f'{self.manifest_file}{TMP_SUFFIX}'
+        with open(tmp_manifest_file, 'w', encoding=ENCODING) as manifest_file:
+            json.dump(manifest, manifest_file, indent=2)
 
-    def run(self):
-        words = self._import_words()
-        self._write_to_file(words)
+        os.replace(tmp_file, self.output_file)
+        os.replace(tmp_manifest_file, self.manifest_file)
+
+    def run(self) -> bool:
+        """
+        Parse the input file and write the words to the output file.
+
+        :return: False if the input file was already merged, True otherwise.
+        :raises: ValueError if the manifest doesn't belong to the output file.
+        """
+
+        if not self.merge:
+            self._write_to_file(self._select_words(self._read_file()))
+            return True
+
+        # Fail before parsing if the manifest can't be trusted
+        manifest = self._read_manifest()
+        checksum = hashlib.sha256()
+        words = self._read_file(checksum)
+        source = {'file': self.source_name, 'sha256': checksum.hexdigest()}
+        if source in manifest['sources']:
+            return False
+
+        manifest['sources'].append(source)
+        self._write_to_file(
+            self._select_words(self._merge_existing(words)),
+            manifest,
+        )
+        return True
 
 
 if __name__ == '__main__':
@@ -129,7 +471,8 @@ if __name__ == '__main__':
         help=(
             'Name of the file that will be parsed by the script. '
             'The file must be located in the data folder, '
-            'in a folder named after the language code.'
+            'in a folder named after the language code. '
+            'Can be compressed (.gz, .bz2, .xz) or a tar archive.'
         ),
     )
     arg_parser.add_argument(
@@ -137,15 +480,58 @@ if __name__ == '__main__':
         '--output-file',
         default=DEFAULT_OUTPUT_FILE,
         help=(
-            'Name of the file that will store the parsed output. ',
+            'Name of the file that will store the parsed output. '
             'The file will be located in the data folder, '
-            'in a folder named after the language code.'
+            'in a folder named after the language code. '
+            'Files ending with .bin are written in the binary format.'
+        ),
+    )
+    arg_parser.add_argument(
+        '-k',
+        '--top-k',
+        type=int,
+        default=None,
+        help='Only keep the most frequent words; defaults to keeping all',
+    )
+    arg_parser.add_argument(
+        '-w',
+        '--workers',
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=(
+            'Number of processes that parse the input file in parallel; '
+            f'defaults to {DEFAULT_WORKERS}'
+        ),
+    )
+    arg_parser.add_argument(
+        '--merge',
+        action='store_true',
+        help=(
+            'Add the counts to the existing output file instead of replacing it. '
+            'Corpora that were already counted are skipped. '
+            'Words dropped by the minimum frequency earlier are not recovered.'
+        ),
+    )
+    arg_parser.add_argument(
+        '-t',
+        '--tar-member',
+        default=DEFAULT_TAR_MEMBER,
+        help=(
+            'When the input file is a tar archive, '
+            'parse the file in it whose name ends with this; '
+            f'defaults to "{DEFAULT_TAR_MEMBER}"'
         ),
     )
     args = arg_parser.parse_args()
-    Parser(
+    parsed = Parser(
         minimum_frequency=args.minimum_frequency,
         language_code=args.language_code,
         input_file=args.input_file,
         output_file=args.output_file,
+        top_k=args.top_k,
+        workers=args.workers,
+        tar_member=args.tar_member,
+        merge=args.merge,
     ).run()
+    if not parsed:
+        print(f'{args.input_file} was already merged; nothing to do')
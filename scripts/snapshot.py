@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+"""
+Copyright (C) J Leadbetter <j@jleadbetter.com>
+Affero GPL v3
+
+This script creates and restores snapshots of the database.
+A snapshot is much faster to restore than rebuilding the database
+with initialize_database.py, e.g., for CI or new workers.
+
+Snapshots can only be restored with the same kind of DatabasePort adapter
+that created them.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+TOP_LEVEL_FOLDER = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if TOP_LEVEL_FOLDER not in sys.path:
+    sys.path.append(TOP_LEVEL_FOLDER)
+
+from common.stores.adapter import AdapterStore
+
+DEFAULT_SNAPSHOT_FILE = 'database.snapshot.gz'
+
+
+def get_snapshot_file(snapshot_file: str) -> str:
+    # Relative paths are in the data folder, like the other scripts.
+    return os.path.join(TOP_LEVEL_FOLDER, 'data', snapshot_file)
+
+
+def create(snapshot_file: str, subsection: str=None):
+    database_port = AdapterStore(subsection=subsection).get('DatabasePort')
+
+    start = time.perf_counter()
+    database_port.create_snapshot(snapshot_file)
+    seconds = time.perf_counter() - start
+
+    size = os.path.getsize(snapshot_file) / 1024 / 1024
+    print(f'Created {snapshot_file} ({size:.1f} MB) in {seconds:.1f}s')
+
+
+def restore(snapshot_file: str, subsection: str=None):
+    database_port = AdapterStore(subsection=subsection).get('DatabasePort')
+
+    start = time.perf_counter()
+    database_port.initialize_database()
+    database_port.restore_snapshot(snapshot_file)
+    seconds = time.perf_counter() - start
+
+    print(f'Restored {snapshot_file} in {seconds:.1f}s')
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(
+        prog='Snapshot',
+        description='Creates or restores a snapshot of the database',
+    )
+    arg_parser.add_argument(
+        'command',
+        choices=['create', 'restore'],
+    )
+    arg_parser.add_argument(
+        '-f',
+        '--snapshot-file',
+        default=DEFAULT_SNAPSHOT_FILE,
+        help=(
+            'Name of the snapshot file. '
+            'Relative paths are in the "data" directory; '
+            f'defaults to "{DEFAULT_SNAPSHOT_FILE}"'
+        ),
+    )
+    arg_parser.add_argument(
+        '-c',
+        '--config-section',
+        default=None,
+        help=(
+            'Section of setup.cfg with the adapters to use (e.g., "dev.sqlite"); '
+            'defaults to the DefaultConfig in setup.cfg'
+        ),
+    )
+    args = arg_parser.parse_args()
+
+    snapshot_file = get_snapshot_file(args.snapshot_file)
+    if args.command == 'create':
+        create(snapshot_file, args.config_section)
+    else:
+        restore(snapshot_file, args.config_section)
@@ -0,0 +1,181 @@
+"""
+Copyright (C) J Leadbetter <j@jleadbetter.com>
+Affero GPL v3
+"""
+
+import datetime
+import os
+import shutil
+from unittest import TestCase
+
+from common.adapters.dev.session import (
+    SessionJSONFileAdapter,
+    SessionMemoryAdapter,
+)
+from common.models.errors import ObjectNotFoundError
+
+from ....utils_for_tests.random_data import random_string
+from ....utils_for_tests.users import make_user_ui
+
+
+class SessionTestsMixin:
+    """
+    Tests shared by the SessionPort adapters.
+    Expects `self.make_adapter` to be set up by the test class,
+    which creates an adapter from the given kwargs.
+    """
+
+    def setUp(self):
+        self.adapter = self.make_adapter()
+
+    def test_create(self):
+        user = make_user_ui()
+        session = self.adapter.create(user)
+        self.assertTrue(session.id)
+        self.assertEqual(user, session.user)
+        self.assertFalse(session.is_expired)
+
+        returned = self.adapter.get(session.id)
+        self.assertEqual(user, returned.user)
+
+    def test_create_without_user(self):
+        session = self.adapter.create()
+        self.assertIsNone(self.adapter.get(session.id).user)
+
+    def test_create_unique_ids(self):
+        session1 = self.adapter.create()
+        session2 = self.adapter.create()
+        self.assertNotEqual(session1.id, session2.id)
+
+    def test_get_does_not_exist(self):
+        with self.assertRaises(ObjectNotFoundError):
+            self.adapter.get(random_string())
+
+    def test_get_invalid_id(self):
+        with self.assertRaises(ObjectNotFoundError):
+            self.adapter.get('../../setup')
+
+    def test_get_expired(self):
+        adapter = self.make_adapter()
+        adapter.ttl = datetime.timedelta(0)
+        session = adapter.create()
+
+        with self.assertRaises(ObjectNotFoundError):
+            adapter.get(session.id)
+
+    def test_get_extends_expiry(self):
+        session = self.adapter.create()
+        session.expires -= datetime.timedelta(hours=1)
+        self.adapter.update(session)
+
+        returned = self.adapter.get(session.id)
+        self.assertGreater(returned.expires, session.expires)
+
+    def test_update(self):
+        session = self.adapter.create()
+        session.user = make_user_ui()
+
+        returned = self.adapter.update(session)
+        self.assertEqual(session.user, returned.user)
+        self.assertEqual(session.user, self.adapter.get(session.id).user)
+
+    def test_update_does_not_exist(self):
+        session = self.adapter.create()
+        self.adapter.delete(session.id)
+
+        with self.assertRaises(ObjectNotFoundError):
+            self.adapter.update(session)
+
+    def test_delete(self):
+        session = self.adapter.create()
+        self.adapter.delete(session.id)
+
+        with self.assertRaises(ObjectNotFoundError):
+            self.adapter.get(session.id)
+
+    def test_delete_does_not_exist(self):
+        # We shouldn't get any errors
+        self.adapter.delete(random_string())
+
+    def test_delete_expired(self):
+        self.adapter.ttl = datetime.timedelta(0)
+        self.adapter.create()
+        self.adapter.create()
+        self.adapter.ttl = datetime.timedelta(hours=1)
+        session = self.adapter.create()
+
+        # Creating a session may already clean up
+        self.adapter.delete_expired()
+        self.assertEqual(0, self.adapter.delete_expired())
+        self.assertEqual(session.id, self.adapter.get(session.id).id)
+
+    def test_session_ttl(self):
+        adapter = self.make_adapter(sessionttl='60')
+        self.assertEqual(datetime.timedelta(seconds=60), adapter.ttl)
+
+
+class TestSessionMemoryAdapter(SessionTestsMixin, TestCase):
+    """
+    Tests for common.adapters.dev.session.SessionMemoryAdapter
+    """
+
+    def make_adapter(self, **kwargs):
+        return SessionMemoryAdapter(**kwargs)
+
+    def test_get_returns_copy(self):
+        session = self.adapter.create()
+        self.adapter.get(session.id).user = make_user_ui()
+
+        self.assertIsNone(self.adapter.get(session.id).user)
+
+    def test_delete_expired_on_create(self):
+        self.adapter.ttl = datetime.timedelta(0)
+        self.adapter.create()
+        self.adapter.ttl = datetime.timedelta(hours=1)
+        self.adapter.create()
+
+        self.assertEqual(1, len(self.adapter._sessions))
+
+
+class TestSessionJSONFileAdapter(SessionTestsMixin, TestCase):
+    """
+    Tests for common.adapters.dev.session.SessionJSONFileAdapter
+    """
+
+    def setUp(self):
+        self.session_dir = f'test_sessions_{random_string()}'
+        super().setUp()
+
+    def tearDown(self):
+        shutil.rmtree(self.adapter.session_dir, ignore_errors=True)
+
+    def make_adapter(self, **kwargs):
+        return SessionJSONFileAdapter(sessiondir=self.session_dir, **kwargs)
+
+    def test_shared_between_adapters(self):
+        user = make_user_ui()
+        session = self.adapter.create(user)
+
+        expected = user
+        returned = self.make_adapter().get(session.id).user
+        self.assertEqual(expected, returned)
+
+    def test_get_corrupt_file(self):
+        session = self.adapter.create()
+        filename = os.path.join(self.adapter.session_dir, f'{session.id}.json')
+        with open(filename, 'w') as session_file:
+            session_file.write('{')
+
+        with self.assertRaises(ObjectNotFoundError):
+            self.adapter.get(session.id)
+
+    def test_delete_expired_counts_removed_files(self):
+        self.adapter.ttl = datetime.timedelta(0)
+        self.adapter.create()
+        self.adapter.create()
+
+        self.assertEqual(2, self.adapter.delete_expired())
+        self.assertEqual([], os.listdir(self.adapter.session_dir))
+
+    def test_delete_expired_no_directory(self):
+        self.assertEqual(0, self.adapter.delete_expired())
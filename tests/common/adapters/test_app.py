@@ -3,10 +3,13 @@ Copyright (C) J Leadbetter <j@jleadbetter.com>
 Affero GPL v3
 """
 
-from django.test import TestCase
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase
 
 from app.models.app import AppSettings
-from common.adapters.app import AppSettingsDjangoORMAdapter
+from app.utils.cache import bump_app_settings_version
+from common.adapters.app import AppSettingsDjangoORMAdapter, clear_app_settings_cache
 from common.models.app import AppSettingsDB
 from common.stores.adapter import AdapterStore
 
@@ -89,3 +92,99 @@ class TestAppSettingsDjangoORMAdapter(TestCase):
         returned = self.adapter.create_or_update(app_db2)
         self.assertEqual(expected, returned)
         self.assertEqual(1, AppSettings.objects.count())
+
+
+class TestAppSettingsDjangoORMAdapterCache(TransactionTestCase):
+    """
+    Tests for the cache of common.adapters.app.AppSettingsDjangoORMAdapter.
+    The cache is skipped inside transactions,
+    so these tests don't run in one.
+    """
+
+    def setUp(self):
+        cache.clear()
+        clear_app_settings_cache()
+        self.adapter = AppSettingsDjangoORMAdapter()
+
+    def tearDown(self):
+        cache.clear()
+        clear_app_settings_cache()
+
+    def test_get_is_cached(self):
+        app_db = AppSettingsDB(
+            multiuser_mode=True,
+            passwordless_login=False,
+            show_users_on_login_screen=True,
+        )
+        AppSettings.objects.create(**app_db.model_dump())
+        self.adapter.get()
+
+        with self.assertNumQueries(0):
+            returned = self.adapter.get()
+        self.assertEqual(app_db, returned)
+
+    def test_get_does_not_exist_is_cached(self):
+        self.assertIsNone(self.adapter.get())
+
+        with self.assertNumQueries(0):
+            self.assertIsNone(self.adapter.get())
+
+    def test_get_returns_copy(self):
+        AppSettings.objects.create(multiuser_mode=False)
+        self.adapter.get().multiuser_mode = True
+
+        self.assertFalse(self.adapter.get().multiuser_mode)
+
+    def test_create_or_update_writes_through(self):
+        self.adapter.get()
+        app_db = AppSettingsDB(
+            multiuser_mode=True,
+            passwordless_login=True,
+            show_users_on_login_screen=False,
+        )
+        self.adapter.create_or_update(app_db)
+
+        with self.assertNumQueries(0):
+            returned = self.adapter.get()
+        self.assertEqual(app_db, returned)
+
+    def test_get_after_changed_elsewhere(self):
+        app = AppSettings.objects.create(multiuser_mode=False)
+        self.assertFalse(self.adapter.get().multiuser_mode)
+
+        # Saving through the ORM changes the version, like another process would
+        app.multiuser_mode = True
+        app.save()
+        self.assertTrue(self.adapter.get().multiuser_mode)
+
+        AppSettings.objects.all().delete()
+        self.assertIsNone(self.adapter.get())
+
+    def test_get_after_version_changed(self):
+        AppSettings.objects.create(multiuser_mode=False)
+        self.adapter.get()
+        AppSettings.objects.update(multiuser_mode=True)  # No signals
+        self.assertFalse(self.adapter.get().multiuser_mode)
+
+        bump_app_settings_version()
+        self.assertTrue(self.adapter.get().multiuser_mode)
+
+    def test_get_in_transaction(self):
+        AppSettings.objects.create(multiuser_mode=False)
+        self.adapter.get()
+
+        with transaction.atomic():
+            AppSettings.objects.update(multiuser_mode=True)
+            self.assertTrue(self.adapter.get().multiuser_mode)
+            transaction.set_rollback(True)
+
+        self.assertFalse(self.adapter.get().multiuser_mode)
+
+    def test_create_or_update_rolled_back(self):
+        self.adapter.create_or_update(AppSettingsDB(multiuser_mode=False))
+
+        with transaction.atomic():
+            self.adapter.create_or_update(AppSettingsDB(multiuser_mode=True))
+            transaction.set_rollback(True)
+
+        self.assertFalse(self.adapter.get().multiuser_mode)
@@ -0,0 +1,311 @@
+"""
+Copyright (C) J Leadbetter <j@jleadbetter.com>
+Affero GPL v3
+"""
+
+import os
+from unittest import TestCase
+
+from django.core.cache import cache
+from django.test import TestCase as DjangoTestCase, TransactionTestCase
+
+from app.utils.cache import get_users_version
+from common.adapters.app import clear_app_settings_cache
+from common.adapters.database import (
+    DatabaseJSONFileAdapter,
+    DatabaseSQLiteAdapter,
+)
+from common.adapters.words import WordJSONFileAdapter, WordSQLiteAdapter
+from common.models.app import AppSettingsDB
+from common.models.errors import ObjectNotFoundError
+from common.models.users import UserDB
+from common.ports.database import DatabaseError
+from common.stores.adapter import AdapterStore
+from common.utils.file import clear_json_cache
+
+from ...utils_for_tests.random_data import random_string
+from ...utils_for_tests.words import make_word
+
+
+class DatabaseSnapshotTestsMixin:
+    """
+    Tests shared by the DatabasePort adapters for snapshots.
+    Expects `self.adapter`, `self.word_adapter`
+    and `self.snapshot_file` to be set up by the test class.
+    """
+
+    def test_snapshot(self):
+        self.adapter.initialize_database()
+        word = self.word_adapter.create(make_word())
+        self.adapter.create_snapshot(self.snapshot_file)
+
+        other_word = self.word_adapter.create(make_word())
+        self.adapter.restore_snapshot(self.snapshot_file)
+
+        returned = self.word_adapter.read(word.languageCode, word.baseWord)
+        self.assertEqual(word.id, returned.id)
+        with self.assertRaises(ObjectNotFoundError):
+            self.word_adapter.read(other_word.languageCode, other_word.baseWord)
+
+    def test_restore_snapshot_corrupt(self):
+        self.adapter.initialize_database()
+        self.adapter.create_snapshot(self.snapshot_file)
+        word = self.word_adapter.create(make_word())
+
+        with open(self.snapshot_file, 'r+b') as snapshot:
+            snapshot.seek(-12, os.SEEK_END)
+            snapshot.write(b'corrupted!!!')
+
+        with self.assertRaises(DatabaseError):
+            self.adapter.restore_snapshot(self.snapshot_file)
+
+        returned = self.word_adapter.read(word.languageCode, word.baseWord)
+        self.assertEqual(word.id, returned.id)
+
+    def test_restore_snapshot_does_not_exist(self):
+        with self.assertRaises(DatabaseError):
+            self.adapter.restore_snapshot(self.snapshot_file)
+
+
+class TestDatabaseJSONFileAdapter(DatabaseSnapshotTestsMixin, TestCase):
+    """
+    Tests for common.adapters.database.DatabaseJSONFileAdapter
+    """
+
+    def setUp(self):
+        options = {
+            'databasefile': f'test_database_{random_string()}',
+            'storagemode': 'journal',
+        }
+        self.adapter = DatabaseJSONFileAdapter(**options)
+        self.word_adapter = WordJSONFileAdapter(**options)
+        self.snapshot_file = f'{self.adapter.database}.snapshot.gz'
+
+    def tearDown(self):
+        self.adapter.teardown_database()
+        if os.path.exists(self.snapshot_file):
+            os.remove(self.snapshot_file)
+
+    def test_initialize_database(self):
+        self.adapter.initialize_database()
+        self.assertTrue(os.path.exists(self.adapter.database))
+
+        expected = []
+        returned = self.word_adapter._read_json().words
+        self.assertEqual(expected, returned)
+
+    def test_initialize_database_keeps_existing_data(self):
+        self.adapter.initialize_database()
+        word = self.word_adapter.create(make_word())
+        self.assertTrue(os.path.exists(self.adapter.journal))
+
+        self.adapter.initialize_database()
+        returned = self.word_adapter.read(word.languageCode, word.baseWord)
+        self.assertEqual(word.id, returned.id)
+
+    def test_teardown_database(self):
+        self.word_adapter.create(make_word())
+        self.adapter.teardown_database()
+
+        self.assertFalse(os.path.exists(self.adapter.database))
+        self.assertFalse(os.path.exists(self.adapter.journal))
+
+    def test_teardown_database_does_not_exist(self):
+        # We shouldn't get any errors
+        self.adapter.teardown_database()
+
+    def test_restore_snapshot_clears_journal(self):
+        self.adapter.initialize_database()
+        self.adapter.create_snapshot(self.snapshot_file)
+        self.word_adapter.create(make_word())
+        self.assertTrue(os.path.exists(self.adapter.journal))
+
+        self.adapter.restore_snapshot(self.snapshot_file)
+        self.assertFalse(os.path.exists(self.adapter.journal))
+        self.assertEqual([], self.word_adapter._read_json().words)
+
+    def test_bulk_load(self):
+        self.adapter.initialize_database()
+        stamps = self.adapter._json_stamps()
+
+        with self.adapter.bulk_load():
+            words = [
+                self.word_adapter.create(make_word()) for i in range(3)
+            ]
+            # Nothing is written until the end,
+            # but the changes can already be read.
+            self.assertEqual(stamps, self.adapter._json_stamps())
+            self.assertEqual(
+                words[0].id,
+                self.word_adapter.read(words[0].languageCode, words[0].baseWord).id,
+            )
+
+        self.assertFalse(os.path.exists(self.adapter.journal))
+        clear_json_cache()
+        self.assertEqual(3, len(self.word_adapter._read_json().words))
+
+    def test_bulk_load_error(self):
+        self.adapter.initialize_database()
+
+        with self.assertRaises(ValueError):
+            with self.adapter.bulk_load():
+                self.word_adapter.create(make_word())
+                raise ValueError()
+
+        self.assertEqual([], self.word_adapter._read_json().words)
+
+    def test_restore_snapshot_of_other_adapter(self):
+        sqlite_adapter = DatabaseSQLiteAdapter(databasefile=random_string())
+        try:
+            sqlite_adapter.create_snapshot(self.snapshot_file)
+        finally:
+            sqlite_adapter.connection.close()
+            for suffix in ['', '-wal', '-shm']:
+                filename = f'{sqlite_adapter.database}{suffix}'
+                if os.path.exists(filename):
+                    os.remove(filename)
+
+        with self.assertRaises(DatabaseError):
+            self.adapter.restore_snapshot(self.snapshot_file)
+
+
+class TestDatabaseSQLiteAdapter(DatabaseSnapshotTestsMixin, TestCase):
+    """
+    Tests for common.adapters.database.DatabaseSQLiteAdapter
+    """
+
+    def setUp(self):
+        databasefile = f'test_database_{random_string()}'
+        self.adapter = DatabaseSQLiteAdapter(databasefile=databasefile)
+        self.word_adapter = WordSQLiteAdapter(databasefile=databasefile)
+        self.snapshot_file = f'{self.adapter.database}.snapshot.gz'
+
+    def tearDown(self):
+        self.adapter.connection.close()
+        self.word_adapter.connection.close()
+        for suffix in ['', '-wal', '-shm', '.snapshot.gz']:
+            filename = f'{self.adapter.database}{suffix}'
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def test_initialize_database(self):
+        self.adapter.initialize_database()
+
+        tables = {
+            row[0]
+            for row in self.adapter.connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'",
+            )
+        }
+        self.assertEqual(set(self.adapter.TABLES), tables)
+
+    def test_initialize_database_already_exists(self):
+        word = self.word_adapter.create(make_word())
+        self.adapter.initialize_database()
+
+        returned = self.word_adapter.read(word.languageCode, word.baseWord)
+        self.assertEqual(word.id, returned.id)
+
+    def test_teardown_and_initialize_database(self):
+        word = self.word_adapter.create(make_word())
+        self.adapter.teardown_database()
+        self.adapter.initialize_database()
+
+        with self.assertRaises(ObjectNotFoundError):
+            self.word_adapter.read(word.languageCode, word.baseWord)
+
+
+class TestDatabaseDjangoORMAdapter(DatabaseSnapshotTestsMixin, DjangoTestCase):
+    """
+    Tests for common.adapters.database.DatabaseDjangoORMAdapter
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.adapter_store = AdapterStore(subsection='dev.django')
+
+    def setUp(self):
+        self.adapter = self.adapter_store.get('DatabasePort')
+        self.word_adapter = self.adapter_store.get('WordPort')
+        self.user_adapter = self.adapter_store.get('UserDBPort')
+        self.snapshot_file = f'test_database_{random_string()}.snapshot.gz'
+
+    def tearDown(self):
+        if os.path.exists(self.snapshot_file):
+            os.remove(self.snapshot_file)
+
+    def test_snapshot_users(self):
+        user = self.user_adapter.create(UserDB(username=random_string()))
+        self.adapter.create_snapshot(self.snapshot_file)
+
+        other_user = self.user_adapter.create(UserDB(username=random_string()))
+        self.adapter.restore_snapshot(self.snapshot_file)
+
+        returned = self.user_adapter.get_by_username(user.username)
+        self.assertEqual(user.id, returned.id)
+        with self.assertRaises(ObjectNotFoundError):
+            self.user_adapter.get_by_username(other_user.username)
+
+    def test_create_user_after_restore_snapshot(self):
+        users = [
+            self.user_adapter.create(UserDB(username=random_string()))
+            for i in range(3)
+        ]
+        self.adapter.create_snapshot(self.snapshot_file)
+        self.adapter.restore_snapshot(self.snapshot_file)
+
+        user = self.user_adapter.create(UserDB(username=random_string()))
+        self.assertNotIn(user.id, [existing.id for existing in users])
+
+
+class TestDatabaseDjangoORMAdapterCache(TransactionTestCase):
+    """
+    Tests for the cached data after common.adapters.database.DatabaseDjangoORMAdapter
+    changes the database.
+    Data is only cached outside of transactions,
+    so these tests don't run in one.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.adapter_store = AdapterStore(subsection='dev.django')
+
+    def setUp(self):
+        cache.clear()
+        clear_app_settings_cache()
+        self.adapter = self.adapter_store.get('DatabasePort')
+        self.app_adapter = self.adapter_store.get('AppSettingsPort')
+        self.user_adapter = self.adapter_store.get('UserDBPort')
+        self.snapshot_file = f'test_database_{random_string()}.snapshot.gz'
+
+    def tearDown(self):
+        cache.clear()
+        clear_app_settings_cache()
+        if os.path.exists(self.snapshot_file):
+            os.remove(self.snapshot_file)
+
+    def test_app_settings_after_restore_snapshot(self):
+        self.app_adapter.create_or_update(AppSettingsDB(multiuser_mode=True))
+        self.adapter.create_snapshot(self.snapshot_file)
+
+        self.adapter.teardown_database()
+        self.assertIsNone(self.app_adapter.get())
+
+        self.adapter.restore_snapshot(self.snapshot_file)
+        self.assertTrue(self.app_adapter.get().multiuser_mode)
+
+    def test_users_version_after_restore_snapshot(self):
+        self.user_adapter.create(UserDB(username=random_string()))
+        self.adapter.create_snapshot(self.snapshot_file)
+
+        version = get_users_version()
+        self.adapter.teardown_database()
+        self.assertNotEqual(version, get_users_version())
+
+        # Nothing is deleted from the empty database,
+        # so no signals change the version.
+        version = get_users_version()
+        self.adapter.restore_snapshot(self.snapshot_file)
+        self.assertNotEqual(version, get_users_version())
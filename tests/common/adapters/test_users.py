@@ -5,8 +5,12 @@ Affero GPL v3
 
 import uuid
 
+from django.contrib.auth.models import update_last_login
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
+from app.utils.cache import get_users_version
 from common.adapters.users import (
     UserDBDjangoORMAdapter,
     UserUIDjangoORMAdapter,
@@ -17,6 +21,9 @@ from common.stores.adapter import AdapterStore
 
 from users.models.settings import UserSettings
 
+from ...utils_for_tests.queries import assert_constant_queries
+from ...utils_for_tests.random_data import random_string
+
 
 class TestUserDBDjangoORMAdapter(TestCase):
     """
@@ -29,6 +36,12 @@ class TestUserDBDjangoORMAdapter(TestCase):
         cls.adapter = adapters.get('UserDBPort')
         super().setUpClass()
 
+    def _add_users(self, number_of_users: int):
+        self.adapter.create_in_batch([
+            UserDB(username=random_string(), display_name='Test User')
+            for _ in range(number_of_users)
+        ])
+
     def test_create(self):
         user = UserDB(
             username='test_create_user',
@@ -92,6 +105,71 @@ class TestUserDBDjangoORMAdapter(TestCase):
         with self.assertRaises(ObjectExistsError):
             self.adapter.create(user)
 
+    def test_create_in_batch(self):
+        users = [
+            UserDB(
+                username=f'test_create_in_batch{i}',
+                password=f'1234567{i}',
+                display_name=f'Test User {i}',
+                is_admin=(i == 0),
+            )
+            for i in range(3)
+        ]
+
+        new_users = self.adapter.create_in_batch(users)
+        self.assertEqual(3, len(new_users))
+        for user, new_user in zip(users, new_users):
+            self.assertIsNotNone(new_user.id)
+            self.assertFalse(new_user.password)  # We don't return passwords
+            self.assertEqual(user.username, new_user.username)
+            self.assertEqual(user.display_name, new_user.display_name)
+            self.assertEqual(user.is_admin, new_user.is_admin)
+
+            new_db_user = UserSettings.objects.get(id=new_user.id)
+            self.assertEqual(new_user.username, new_db_user.username)
+            self.assertTrue(new_db_user.user.check_password(user.password))
+
+    def test_create_in_batch_in_worker_processes(self):
+        adapter = UserDBDjangoORMAdapter(hashingworkers='2')
+        users = [
+            UserDB(
+                username=f'test_create_in_batch_workers{i}',
+                password=f'1234567{i}',
+            )
+            for i in range(3)
+        ]
+
+        new_users = adapter.create_in_batch(users)
+        for user, new_user in zip(users, new_users):
+            new_db_user = UserSettings.objects.get(id=new_user.id)
+            self.assertTrue(new_db_user.user.check_password(user.password))
+
+    def test_create_in_batch_without_password(self):
+        user = UserDB(username='test_create_in_batch_no_password')
+
+        new_user = self.adapter.create_in_batch([user])[0]
+        new_db_user = UserSettings.objects.get(id=new_user.id)
+        self.assertFalse(new_db_user.password)  # empty string
+
+    def test_create_in_batch_ignores_duplicates(self):
+        existing_user = self.adapter.create(UserDB(
+            username='test_create_in_batch_existing',
+            password='1234567',
+            display_name='Existing User',
+        ))
+        users = [
+            UserDB(username=existing_user.username, display_name='Changed'),
+            UserDB(username='test_create_in_batch_new'),
+            UserDB(username='test_create_in_batch_new'),
+        ]
+
+        new_users = self.adapter.create_in_batch(users)
+        self.assertEqual(['test_create_in_batch_new'], [user.username for user in new_users])
+        self.assertEqual(existing_user, self.adapter.get(existing_user.id))
+
+    def test_create_in_batch_empty(self):
+        self.assertEqual([], self.adapter.create_in_batch([]))
+
     def test_get(self):
         user = UserDB(
             username='test_get',
@@ -103,6 +181,15 @@ class TestUserDBDjangoORMAdapter(TestCase):
         new_user_db = self.adapter.get(new_user.id)
         self.assertEqual(new_user, new_user_db)
 
+    def test_get_num_queries(self):
+        user = self.adapter.create(UserDB(username='test_get_num_queries'))
+        assert_constant_queries(
+            self,
+            1,
+            lambda: self.adapter.get(user.id),
+            self._add_users,
+        )
+
     def test_get_user_settings_does_not_exist(self):
         user_id = uuid.uuid4()
 
@@ -135,6 +222,9 @@ class TestUserDBDjangoORMAdapter(TestCase):
         returned = self.adapter.get_first()
         self.assertEqual(expected, returned)
 
+    def test_get_first_num_queries(self):
+        assert_constant_queries(self, 1, self.adapter.get_first, self._add_users)
+
     def test_get_first_database_empty(self):
         self.assertIsNone(self.adapter.get_first())
 
@@ -187,6 +277,15 @@ class TestUserDBDjangoORMAdapter(TestCase):
         new_user_db = self.adapter.get_by_username(username)
         self.assertEqual(new_user, new_user_db)
 
+    def test_get_by_username_num_queries(self):
+        user = self.adapter.create(UserDB(username='test_get_by_username_num_queries'))
+        assert_constant_queries(
+            self,
+            1,
+            lambda: self.adapter.get_by_username(user.username),
+            self._add_users,
+        )
+
     def test_get_by_username_settings_does_not_exist(self):
         username = 'nonexistent_username'
 
@@ -238,11 +337,88 @@ class TestUserDBDjangoORMAdapter(TestCase):
         returned = self.adapter.get_all()
         self.assertEqual(expected, returned)
 
+    def test_get_all_num_queries(self):
+        assert_constant_queries(self, 1, self.adapter.get_all, self._add_users)
+
     def test_get_all_table_empty(self):
         expected = []
         returned = self.adapter.get_all()
         self.assertEqual(expected, returned)
 
+    def test_get_page(self):
+        usersdb = self.adapter.create_in_batch([
+            UserDB(username=f'test_get_page{i}') for i in range(5)
+        ])
+
+        self.assertEqual(usersdb[:2], self.adapter.get_page(0, 2))
+        self.assertEqual(usersdb[2:4], self.adapter.get_page(1, 2))
+        self.assertEqual(usersdb[4:], self.adapter.get_page(2, 2))
+        self.assertEqual([], self.adapter.get_page(3, 2))
+
+    def test_get_page_search(self):
+        user1 = self.adapter.create(UserDB(username='test_get_page_Alice'))
+        self.adapter.create(UserDB(username='test_get_page_bob'))
+        user3 = self.adapter.create(UserDB(
+            username='test_get_page_carol',
+            display_name='Carol, friend of alice',
+        ))
+
+        expected = [user1, user3]
+        returned = self.adapter.get_page(search='ALICE')
+        self.assertEqual(expected, returned)
+
+    def test_get_page_user_inactive(self):
+        userdb = self.adapter.create(UserDB(username='test_get_page_inactive'))
+        settings = UserSettings.objects.get(id=userdb.id)
+        settings.user.is_active = False
+        settings.user.save()
+
+        self.assertEqual([], self.adapter.get_page())
+
+    def test_get_page_out_of_range(self):
+        with self.assertRaises(ValueError):
+            self.adapter.get_page(page=-1)
+        with self.assertRaises(ValueError):
+            self.adapter.get_page(page_size=0)
+
+    def test_get_page_num_queries(self):
+        assert_constant_queries(
+            self,
+            1,
+            lambda: self.adapter.get_page(page_size=10),
+            self._add_users,
+        )
+
+    def test_get_version_in_transaction(self):
+        # Tests run in a transaction
+        self.assertIsNone(self.adapter.get_version())
+
+    def test_users_version_changes(self):
+        version = get_users_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            userdb = self.adapter.create(UserDB(username='test_users_version'))
+        self.assertNotEqual(version, get_users_version())
+
+        version = get_users_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.adapter.create_in_batch([UserDB(username='test_users_version2')])
+        self.assertNotEqual(version, get_users_version())
+
+        version = get_users_version()
+        userdb.display_name = 'New Test User'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.adapter.update(userdb)
+        self.assertNotEqual(version, get_users_version())
+
+    def test_users_version_same_after_login(self):
+        userdb = self.adapter.create(UserDB(username='test_users_version_login'))
+        user = UserSettings.objects.get(id=userdb.id).user
+
+        version = get_users_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            update_last_login(None, user)
+        self.assertEqual(version, get_users_version())
+
     def test_update(self):
         userdb = UserDB(
             username='test_update',
@@ -264,6 +440,56 @@ class TestUserDBDjangoORMAdapter(TestCase):
         self.assertEqual(userdb.username, final_userdb.username)
         self.assertTrue(final_userdb.is_admin)
 
+    def test_update_without_password(self):
+        userdb = self.adapter.create(UserDB(
+            username='test_update_without_password',
+            password='1234567',
+        ))
+        old_password = UserSettings.objects.get(id=userdb.id).password
+
+        userdb.display_name = 'New Test User'
+        final_userdb = self.adapter.update(userdb)
+        new_password = UserSettings.objects.get(id=userdb.id).password
+        self.assertEqual(old_password, new_password)
+        self.assertEqual(userdb.display_name, final_userdb.display_name)
+
+    def test_update_same_password_hash(self):
+        userdb = self.adapter.create(UserDB(
+            username='test_update_same_password_hash',
+            password='1234567',
+        ))
+        old_password = UserSettings.objects.get(id=userdb.id).password
+
+        userdb.password = old_password
+        self.adapter.update(userdb)
+        settings = UserSettings.objects.get(id=userdb.id)
+        self.assertEqual(old_password, settings.password)
+        self.assertTrue(settings.user.check_password('1234567'))
+
+    def test_update_only_changed_fields(self):
+        userdb = self.adapter.create(UserDB(
+            username='test_update_only_changed_fields',
+            display_name='Test User',
+        ))
+
+        with CaptureQueriesContext(connection) as queries:
+            self.adapter.update(userdb)
+        self.assertFalse([
+            query for query in queries
+            if query['sql'].startswith('UPDATE')
+        ])
+
+        userdb.display_name = 'New Test User'
+        with CaptureQueriesContext(connection) as queries:
+            final_userdb = self.adapter.update(userdb)
+        updates = [
+            query['sql'] for query in queries
+            if query['sql'].startswith('UPDATE')
+        ]
+        self.assertEqual(1, len(updates))
+        self.assertIn('"users_usersettings"', updates[0])
+        self.assertEqual(userdb, final_userdb)
+
     def test_update_does_not_exist(self):
         userdb = UserDB(
             id=uuid.uuid4(),
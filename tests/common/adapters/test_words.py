@@ -0,0 +1,625 @@
+"""
+Copyright (C) J Leadbetter <j@jleadbetter.com>
+Affero GPL v3
+"""
+
+import os
+from unittest import TestCase
+
+from django.test import TestCase as DjangoTestCase
+
+from common.adapters.words import (
+    DJANGO_BATCH_SIZE,
+    WordJSONFileAdapter,
+    WordSQLiteAdapter,
+)
+from common.models.errors import ObjectExistsError, ObjectNotFoundError
+from common.models.words import Translation, UnknownDataBase
+from common.stores.adapter import AdapterStore
+from common.utils.file import clear_json_cache
+
+from words.models import GrammarTypeData
+from words.models import Translation as TranslationModel
+from words.models import Word as WordModel
+
+from ...utils_for_tests.random_data import random_string
+from ...utils_for_tests.words import make_word
+
+
+class TestWordJSONFileAdapter(TestCase):
+    """
+    Tests for common.adapters.words.WordJSONFileAdapter
+    """
+
+    def setUp(self):
+        self.databasefile = f'test_words_{random_string()}'
+        self.adapter = WordJSONFileAdapter(databasefile=self.databasefile)
+
+    def tearDown(self):
+        if os.path.exists(self.adapter.database):
+            os.remove(self.adapter.database)
+
+    def test_create(self):
+        word = make_word()
+
+        new_word = self.adapter.create(word)
+        self.assertIsNotNone(new_word.id)
+        self.assertIsNotNone(new_word.type.id)
+
+        expected = new_word
+        returned = self.adapter.read(word.languageCode, word.baseWord)
+        self.assertEqual(expected, returned)
+        self.assertEqual(new_word.id, returned.id)
+
+    def test_create_duplicate(self):
+        word = make_word()
+        self.adapter.create(word)
+
+        with self.assertRaises(ObjectExistsError):
+            self.adapter.create(make_word(baseWord=word.baseWord))
+
+    def test_cache_does_not_share_objects(self):
+        word = self.adapter.create(make_word(baseWord='huis'))
+        batch_word = self.adapter.create_in_batch([make_word(baseWord='boom')])[0]
+
+        # Changing the caller's objects doesn't change the database
+        word.baseWord = 'kat'
+        batch_word.frequency = 100
+        returned = self.adapter.read('nl', 'huis')
+        self.assertEqual('huis', returned.baseWord)
+        self.assertEqual(1, self.adapter.read('nl', 'boom').frequency)
+
+        # Neither does changing words that were read
+        returned.baseWord = 'kat'
+        next(self.adapter.iter_words('nl')).frequency = 100
+        clear_json_cache()
+        other_adapter = WordJSONFileAdapter(databasefile=self.databasefile)
+        for adapter in [self.adapter, other_adapter]:
+            self.assertEqual(
+                [('boom', 1), ('huis', 1)],
+                sorted(
+                    (word.baseWord, word.frequency)
+                    for word in adapter.iter_words('nl')
+                ),
+            )
+
+    def test_create_same_word_different_language(self):
+        word = make_word(languageCode='nl')
+        self.adapter.create(word)
+
+        other_word = make_word(languageCode='en', baseWord=word.baseWord)
+        self.adapter.create(other_word)
+
+        returned = self.adapter.read('en', word.baseWord)
+        self.assertEqual(other_word.id, returned.id)
+
+    def test_create_in_batch(self):
+        existing_word = self.adapter.create(make_word())
+
+        words = [make_word() for i in range(3)]
+        new_words = words + [
+            make_word(baseWord=words[0].baseWord),
+            make_word(baseWord=existing_word.baseWord),
+        ]
+
+        expected = words
+        returned = self.adapter.create_in_batch(new_words)
+        self.assertEqual(expected, returned)
+
+        for word in words:
+            returned_word = self.adapter.read(word.languageCode, word.baseWord)
+            self.assertEqual(word.id, returned_word.id)
+
+    def test_create_in_batch_all_duplicates(self):
+        word = self.adapter.create(make_word())
+
+        expected = []
+        returned = self.adapter.create_in_batch([word])
+        self.assertEqual(expected, returned)
+
+    def test_read_does_not_exist(self):
+        self.adapter.create(make_word())
+
+        with self.assertRaises(ObjectNotFoundError):
+            self.adapter.read('nl', 'nonexistent')
+
+    def test_create_duplicate_from_other_adapter(self):
+        # Both adapters share the same parsed database
+        adapter = WordJSONFileAdapter(
+            databasefile=os.path.basename(self.adapter.database)[:-len('.json')],
+        )
+        self.adapter.create_in_batch([make_word()])
+
+        word = adapter.create(make_word())
+        with self.assertRaises(ObjectExistsError):
+            self.adapter.create(make_word(baseWord=word.baseWord))
+
+    def test_iter_words(self):
+        words = [make_word(frequency=i) for i in range(3)]
+        words.append(make_word(frequency=None))
+        words.append(make_word(languageCode='en', frequency=10))
+        self.adapter.create_in_batch(words)
+
+        returned = self.adapter.iter_words('nl', filters={'min_frequency': 1})
+        self.assertEqual([2, 1], [word.frequency for word in returned])
+
+        returned = self.adapter.iter_words('nl')
+        self.assertEqual(
+            [2, 1, 0, None],
+            [word.frequency for word in returned],
+        )
+
+    def test_iter_words_unknown_filter(self):
+        with self.assertRaises(ValueError):
+            self.adapter.iter_words('nl', filters={'foo': 'bar'})
+
+    def test_update_frequencies(self):
+        words = self.adapter.create_in_batch(
+            [make_word(frequency=i) for i in range(3)],
+        )
+
+        updated = self.adapter.update_frequencies('nl', {
+            words[0].baseWord: 10,
+            words[1].baseWord: 1,  # Unchanged
+            'nonexistent': 5,
+        })
+        self.assertEqual(1, updated)
+
+        for word, frequency in zip(words, [10, 1, 2]):
+            returned = self.adapter.read(word.languageCode, word.baseWord)
+            self.assertEqual(frequency, returned.frequency)
+            self.assertEqual(word.id, returned.id)
+
+    def test_update_frequencies_other_language(self):
+        word = self.adapter.create(make_word(languageCode='en', frequency=1))
+
+        self.assertEqual(
+            0,
+            self.adapter.update_frequencies('nl', {word.baseWord: 10}),
+        )
+        self.assertEqual(1, self.adapter.read('en', word.baseWord).frequency)
+
+    def test_read_after_reload(self):
+        word = self.adapter.create(make_word())
+
+        # A fresh adapter has to rebuild the index from the file
+        adapter = WordJSONFileAdapter(
+            databasefile=os.path.basename(self.adapter.database)[:-len('.json')],
+        )
+        returned = adapter.read(word.languageCode, word.baseWord)
+        self.assertEqual(word.id, returned.id)
+
+
+class TestWordJSONFileAdapterJournal(TestCase):
+    """
+    Tests for common.adapters.words.WordJSONFileAdapter
+    using the journal StorageMode
+    """
+
+    def setUp(self):
+        self.adapter = WordJSONFileAdapter(
+            databasefile=f'test_words_{random_string()}',
+            storagemode='journal',
+            journalcompactthreshold='5',
+        )
+
+    def tearDown(self):
+        for filename in [self.adapter.database, self.adapter.journal]:
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def _new_adapter(self):
+        return WordJSONFileAdapter(
+            databasefile=os.path.basename(self.adapter.database)[:-len('.json')],
+            storagemode='journal',
+            journalcompactthreshold='5',
+        )
+
+    def test_create_appends_to_journal(self):
+        word = self.adapter.create(make_word())
+        self.assertTrue(os.path.exists(self.adapter.journal))
+        self.assertEqual(0, os.path.getsize(self.adapter.database))
+
+        with open(self.adapter.journal) as journal_file:
+            self.assertEqual(1, len(journal_file.readlines()))
+
+        returned = self._new_adapter().read(word.languageCode, word.baseWord)
+        self.assertEqual(word.id, returned.id)
+
+    def test_create_in_batch_compacts_journal(self):
+        words = [make_word() for i in range(3)]
+        self.adapter.create_in_batch(words)
+        self.assertTrue(os.path.exists(self.adapter.journal))
+
+        # Goes past the threshold of 5 journal entries
+        more_words = [make_word() for i in range(3)]
+        self.adapter.create_in_batch(more_words)
+        self.assertFalse(os.path.exists(self.adapter.journal))
+
+        adapter = self._new_adapter()
+        for word in words + more_words:
+            returned = adapter.read(word.languageCode, word.baseWord)
+            self.assertEqual(word.id, returned.id)
+
+    def test_read_ignores_partially_written_entry(self):
+        word = self.adapter.create(make_word())
+        with open(self.adapter.journal, 'a') as journal_file:
+            journal_file.write('{"table": "words", "da')
+
+        returned = self._new_adapter().read(word.languageCode, word.baseWord)
+        self.assertEqual(word.id, returned.id)
+
+    def test_invalid_storage_mode(self):
+        with self.assertRaises(ValueError):
+            WordJSONFileAdapter(
+                databasefile=f'test_words_{random_string()}',
+                storagemode='foo',
+            )
+
+
+class WordPortTestsMixin:
+    """
+    Tests shared by the database-backed WordPort adapters.
+    Expects `self.adapter` to be set up by the test class.
+    """
+
+    def test_create(self):
+        word = make_word(
+            translations=[Translation(languageCode='en', meanings=['the'])],
+        )
+
+        new_word = self.adapter.create(word)
+        self.assertIsNotNone(new_word.id)
+        self.assertIsNotNone(new_word.type.id)
+
+        returned = self.adapter.read(word.languageCode, word.baseWord)
+        self.assertEqual(new_word.id, returned.id)
+        self.assertEqual(new_word.frequency, returned.frequency)
+        self.assertEqual(new_word.type.model_dump(mode='json'), returned.type)
+        self.assertEqual(['the'], returned.translations[0].meanings)
+        self.assertEqual(new_word.id, returned.translations[0].word)
+
+    def test_create_duplicate(self):
+        word = make_word()
+        self.adapter.create(word)
+
+        with self.assertRaises(ObjectExistsError):
+            self.adapter.create(make_word(baseWord=word.baseWord))
+
+    def test_create_same_word_different_language(self):
+        word = self.adapter.create(make_word(languageCode='nl'))
+        other_word = self.adapter.create(
+            make_word(languageCode='en', baseWord=word.baseWord),
+        )
+
+        returned = self.adapter.read('en', word.baseWord)
+        self.assertEqual(other_word.id, returned.id)
+
+    def test_create_in_batch(self):
+        existing_word = self.adapter.create(make_word())
+
+        words = [make_word() for i in range(3)]
+        new_words = words + [
+            make_word(baseWord=words[0].baseWord),
+            make_word(baseWord=existing_word.baseWord),
+        ]
+
+        expected = words
+        returned = self.adapter.create_in_batch(new_words)
+        self.assertEqual(expected, returned)
+
+        for word in words:
+            returned_word = self.adapter.read(word.languageCode, word.baseWord)
+            self.assertEqual(word.id, returned_word.id)
+
+    def test_create_in_batch_more_than_one_chunk(self):
+        words = [make_word(baseWord=f'woord{i}') for i in range(1000)]
+        self.assertEqual(1000, len(self.adapter.create_in_batch(words)))
+        self.assertEqual([], self.adapter.create_in_batch(words))
+
+    def test_create_or_update(self):
+        word = self.adapter.create_or_update(make_word(frequency=1))
+
+        updated_word = self.adapter.create_or_update(
+            make_word(baseWord=word.baseWord, frequency=5),
+        )
+        self.assertEqual(word.id, updated_word.id)
+        self.assertEqual(
+            5,
+            self.adapter.read(word.languageCode, word.baseWord).frequency,
+        )
+
+    def test_read_does_not_exist(self):
+        with self.assertRaises(ObjectNotFoundError):
+            self.adapter.read('nl', 'nonexistent')
+
+    def test_read_multiple(self):
+        words = [make_word(frequency=i) for i in range(5)]
+        self.adapter.create_in_batch(words)
+
+        returned = self.adapter.read_multiple(number=2, offset=1)
+        self.assertEqual([3, 2], [word.frequency for word in returned])
+
+    def test_iter_words(self):
+        words = [make_word(frequency=i) for i in range(5)]
+        words.append(make_word(frequency=None))
+        words.append(make_word(languageCode='en', frequency=10))
+        self.adapter.create_in_batch(words)
+
+        returned = list(self.adapter.iter_words('nl', batch_size=2))
+        self.assertEqual(
+            [4, 3, 2, 1, 0, None],
+            [word.frequency for word in returned],
+        )
+
+    def test_iter_words_null_frequency_page_boundary(self):
+        with_frequency = self.adapter.create_in_batch(
+            [make_word(frequency=i % 2) for i in range(4)],
+        )
+        without_frequency = self.adapter.create_in_batch(
+            [make_word(frequency=None) for i in range(3)],
+        )
+        expected = [
+            str(word.id)
+            for word in sorted(
+                with_frequency,
+                key=lambda word: (-word.frequency, str(word.id)),
+            )
+        ]
+        expected += sorted(str(word.id) for word in without_frequency)
+
+        # The last page with frequencies is full, partly full and split
+        for batch_size in [2, 3, 4, 5, 7]:
+            returned = [
+                str(word.id)
+                for word in self.adapter.iter_words('nl', batch_size=batch_size)
+            ]
+            self.assertEqual(expected, returned, f'batch_size={batch_size}')
+
+    def test_iter_words_ties_ordered_by_id(self):
+        words = self.adapter.create_in_batch(
+            [make_word(frequency=1) for i in range(5)],
+        )
+
+        expected = sorted(str(word.id) for word in words)
+        returned = [
+            str(word.id)
+            for word in self.adapter.iter_words('nl', batch_size=2)
+        ]
+        self.assertEqual(expected, returned)
+
+    def test_iter_words_filters(self):
+        words = [make_word(frequency=i) for i in range(5)]
+        words.append(make_word(frequency=None))
+        self.adapter.create_in_batch(words)
+
+        returned = self.adapter.iter_words(
+            'nl',
+            filters={'min_frequency': 1, 'max_frequency': 3},
+        )
+        self.assertEqual([3, 2, 1], [word.frequency for word in returned])
+
+        returned = self.adapter.iter_words(
+            'nl',
+            filters={'grammar_type': 'unknown'},
+        )
+        self.assertEqual(6, len(list(returned)))
+
+        returned = self.adapter.iter_words(
+            'nl',
+            filters={'grammar_type': 'noun'},
+        )
+        self.assertEqual([], list(returned))
+
+    def test_iter_words_unknown_filter(self):
+        with self.assertRaises(ValueError):
+            self.adapter.iter_words('nl', filters={'foo': 'bar'})
+
+    def test_update(self):
+        word = self.adapter.create(make_word())
+        word.frequency = 100
+        word.translations = [Translation(languageCode='en', meanings=['foo'])]
+
+        self.adapter.update(word)
+        returned = self.adapter.read(word.languageCode, word.baseWord)
+        self.assertEqual(word.id, returned.id)
+        self.assertEqual(100, returned.frequency)
+        self.assertEqual(['foo'], returned.translations[0].meanings)
+
+    def test_update_does_not_exist(self):
+        with self.assertRaises(ObjectNotFoundError):
+            self.adapter.update(make_word())
+
+    def test_update_after_read(self):
+        word = self.adapter.create(make_word())
+
+        returned = self.adapter.read(word.languageCode, word.baseWord)
+        returned.frequency = 100
+        self.adapter.update(returned)
+        self.assertEqual(
+            100,
+            self.adapter.read(word.languageCode, word.baseWord).frequency,
+        )
+
+        returned = next(self.adapter.iter_words(word.languageCode))
+        returned.frequency = 200
+        self.adapter.create_or_update(returned)
+        self.assertEqual(
+            200,
+            self.adapter.read(word.languageCode, word.baseWord).frequency,
+        )
+
+    def test_update_frequencies(self):
+        words = self.adapter.create_in_batch(
+            [make_word(frequency=i) for i in range(3)],
+        )
+
+        updated = self.adapter.update_frequencies('nl', {
+            words[0].baseWord: 10,
+            words[1].baseWord: 1,  # Unchanged
+            'nonexistent': 5,
+        })
+        self.assertEqual(1, updated)
+
+        for word, frequency in zip(words, [10, 1, 2]):
+            returned = self.adapter.read(word.languageCode, word.baseWord)
+            self.assertEqual(frequency, returned.frequency)
+            self.assertEqual(word.id, returned.id)
+
+    def test_update_frequencies_other_language(self):
+        word = self.adapter.create(make_word(languageCode='en', frequency=1))
+
+        self.assertEqual(
+            0,
+            self.adapter.update_frequencies('nl', {word.baseWord: 10}),
+        )
+        self.assertEqual(1, self.adapter.read('en', word.baseWord).frequency)
+
+    def test_delete(self):
+        word = self.adapter.create(make_word())
+
+        self.assertTrue(self.adapter.delete(word))
+        with self.assertRaises(ObjectNotFoundError):
+            self.adapter.read(word.languageCode, word.baseWord)
+
+    def test_delete_does_not_exist(self):
+        self.assertFalse(self.adapter.delete(make_word()))
+
+    def test_merge_existing(self):
+        conjugation = self.adapter.create(make_word(
+            baseWord='loopt',
+            frequency=3,
+            translations=[Translation(languageCode='en', meanings=['walks'])],
+        ))
+        other_word = self.adapter.create(make_word(baseWord='lopen'))
+
+        word = make_word(baseWord='loop', frequency=2)
+        word.type.data.append(UnknownDataBase('nl')(text='loopt'))
+
+        merged_word = self.adapter.merge_existing(word)
+        self.assertEqual(5, merged_word.frequency)
+        self.assertEqual(['walks'], merged_word.translations[0].meanings)
+
+        with self.assertRaises(ObjectNotFoundError):
+            self.adapter.read(conjugation.languageCode, conjugation.baseWord)
+        self.assertEqual(
+            other_word.id,
+            self.adapter.read(other_word.languageCode, other_word.baseWord).id,
+        )
+        self.assertEqual(
+            merged_word.id,
+            self.adapter.read(word.languageCode, word.baseWord).id,
+        )
+
+    def test_merge_existing_after_read(self):
+        self.adapter.create(make_word(baseWord='loopt', frequency=3))
+        word = make_word(baseWord='loop', frequency=2)
+        word.type.data.append(UnknownDataBase('nl')(text='loopt'))
+        self.adapter.create(word)
+
+        returned = self.adapter.read(word.languageCode, word.baseWord)
+        merged_word = self.adapter.merge_existing(returned)
+        self.assertEqual(5, merged_word.frequency)
+        self.assertEqual(
+            5,
+            self.adapter.read(word.languageCode, word.baseWord).frequency,
+        )
+
+    def test_merge_existing_nothing_to_merge(self):
+        word = self.adapter.merge_existing(make_word())
+        returned = self.adapter.read(word.languageCode, word.baseWord)
+        self.assertEqual(word.id, returned.id)
+
+
+class TestWordSQLiteAdapter(WordPortTestsMixin, TestCase):
+    """
+    Tests for common.adapters.words.WordSQLiteAdapter
+    """
+
+    def setUp(self):
+        self.adapter = WordSQLiteAdapter(
+            databasefile=f'test_words_{random_string()}',
+        )
+
+    def tearDown(self):
+        self.adapter.connection.close()
+        for suffix in ['', '-wal', '-shm']:
+            filename = f'{self.adapter.database}{suffix}'
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def test_connection_uses_wal(self):
+        journal_mode = self.adapter.connection.execute(
+            'PRAGMA journal_mode',
+        ).fetchone()[0]
+        self.assertEqual('wal', journal_mode)
+
+    def test_iter_words_seeks_to_cursor(self):
+        plans = []
+        for query, parameters in [
+            (
+                'SELECT id FROM words WHERE language_code = ? '
+                'AND frequency IS NOT NULL AND frequency <= ? '
+                'AND (frequency < ? OR id > ?) ORDER BY frequency DESC, id LIMIT ?',
+                ['nl', 1, 1, 'a', 10],
+            ),
+            (
+                'SELECT id FROM words WHERE language_code = ? '
+                'AND frequency IS NULL AND id > ? ORDER BY id LIMIT ?',
+                ['nl', 'a', 10],
+            ),
+        ]:
+            plans.append(' '.join(
+                row[-1]
+                for row in self.adapter.connection.execute(
+                    f'EXPLAIN QUERY PLAN {query}',
+                    parameters,
+                )
+            ))
+
+        self.assertIn('frequency<?', plans[0])
+        self.assertIn('id>?', plans[1])
+        self.assertNotIn('TEMP B-TREE', ' '.join(plans))
+
+    def test_delete_removes_data(self):
+        word = self.adapter.create(make_word(
+            translations=[Translation(languageCode='en', meanings=['foo'])],
+        ))
+        self.adapter.delete(word)
+
+        for table in ['grammar_type_data', 'translations']:
+            count = self.adapter.connection.execute(
+                f'SELECT COUNT(*) FROM {table}',
+            ).fetchone()[0]
+            self.assertEqual(0, count)
+
+
+class TestWordDjangoORMAdapter(WordPortTestsMixin, DjangoTestCase):
+    """
+    Tests for common.adapters.words.WordDjangoORMAdapter
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        adapters = AdapterStore(subsection='dev.django')
+        cls.adapter = adapters.get('WordPort')
+        super().setUpClass()
+
+    def test_delete_removes_data(self):
+        word = self.adapter.create(make_word(
+            translations=[Translation(languageCode='en', meanings=['foo'])],
+        ))
+        self.adapter.delete(word)
+
+        self.assertFalse(GrammarTypeData.objects.exists())
+        self.assertFalse(TranslationModel.objects.exists())
+
+    def test_create_in_batch_more_than_one_batch(self):
+        self.adapter.batch_size = 10
+        try:
+            words = [make_word(baseWord=f'woord{i}') for i in range(25)]
+            self.assertEqual(25, len(self.adapter.create_in_batch(words)))
+            self.assertEqual(25, WordModel.objects.count())
+            self.assertEqual(25, GrammarTypeData.objects.count())
+        finally:
+            self.adapter.batch_size = DJANGO_BATCH_SIZE
@@ -0,0 +1,56 @@
+"""
+Copyright (C) J Leadbetter <j@jleadbetter.com>
+Affero GPL v3
+"""
+
+from unittest import TestCase
+
+from common.models.words import (
+    UnknownBase,
+    UnknownDataBase,
+    clear_grammar_models,
+    make_grammar_model,
+)
+
+
+class TestMakeGrammarModel(TestCase):
+    """
+    Tests for common.models.words.make_grammar_model
+    """
+
+    def tearDown(self):
+        clear_grammar_models()
+
+    def test_returns_same_class(self):
+        self.assertIs(UnknownBase('nl'), UnknownBase('nl'))
+        self.assertIs(UnknownDataBase('nl'), UnknownDataBase('nl'))
+
+    def test_different_languages(self):
+        self.assertIsNot(UnknownBase('nl'), UnknownBase('en'))
+        self.assertEqual('UnknownEN', UnknownBase('en').__name__)
+
+    def test_language_without_config(self):
+        self.assertIs(UnknownBase('xx'), UnknownBase('xx'))
+        self.assertEqual('UnknownXX', UnknownBase('xx').__name__)
+
+    def test_model_not_in_config(self):
+        self.assertIsNone(make_grammar_model('nl', 'Foo'))
+        self.assertIsNone(make_grammar_model('nl', 'Foo'))
+
+    def test_instantiated_classes(self):
+        UnknownData = UnknownDataBase('nl')
+        Unknown = UnknownBase(
+            'nl',
+            instantiated_classes={'UnknownData': UnknownData},
+        )
+
+        self.assertIsNot(UnknownBase('nl'), Unknown)
+        self.assertIs(
+            Unknown,
+            UnknownBase('nl', instantiated_classes={'UnknownData': UnknownData}),
+        )
+
+    def test_clear_grammar_models(self):
+        Unknown = UnknownBase('nl')
+        clear_grammar_models()
+        self.assertIsNot(Unknown, UnknownBase('nl'))
@@ -0,0 +1,201 @@
+"""
+Copyright (C) J Leadbetter <j@jleadbetter.com>
+Affero GPL v3
+"""
+
+import io
+import os
+import shutil
+import threading
+from contextlib import redirect_stdout
+from typing import Dict
+from unittest import mock
+
+from django.test import TestCase
+
+from common.adapters.database import DatabaseSQLiteAdapter
+from common.adapters.words import WordSQLiteAdapter
+from common.ports.database import DatabaseError
+from common.stores.adapter import AdapterStore
+from common.utils.singleton import Singleton
+from scripts.initialize_database import DatabaseCreator
+
+from ...utils_for_tests.random_data import random_string
+
+
+FREQUENCIES = {'de': 100, 'huis': 50, 'boom': 50, 'één': 1, 'kat': 1}
+
+
+class TestDatabaseCreator(TestCase):
+    """
+    Tests for scripts.initialize_database.DatabaseCreator
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        Singleton.destroy(AdapterStore)
+        AdapterStore(subsection='dev.django')
+        super().setUpClass()
+
+    def setUp(self):
+        self.directory = os.path.abspath(
+            f'test_initialize_database_{random_string()}',
+        )
+        os.makedirs(self.directory)
+        self.frequencies_file = os.path.join(self.directory, 'words.txt')
+        self.users_file = os.path.join(self.directory, 'users.csv')
+        with open(self.users_file, 'w') as users_file:
+            users_file.write('username,display_name,password\n')
+
+        # Words are written to a SQLite database of their own
+        database_file = f'test_initialize_database_{random_string()}'
+        self.database_port = DatabaseSQLiteAdapter(databasefile=database_file)
+        self.word_port = WordSQLiteAdapter(databasefile=database_file)
+        adapter_store = AdapterStore()
+        self.adapters = dict(adapter_store._adapters)
+        adapter_store._adapters['databaseport'] = self.database_port
+        adapter_store._adapters['wordport'] = self.word_port
+
+    def tearDown(self):
+        AdapterStore()._adapters = self.adapters
+        shutil.rmtree(self.directory)
+        for adapter in [self.database_port, self.word_port]:
+            adapter.connection.close()
+        for suffix in ['', '-wal', '-shm']:
+            filename = f'{self.word_port.database}{suffix}'
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def _write_frequencies(self, frequencies: Dict[str, int]):
+        with open(self.frequencies_file, 'w', encoding='utf-8') as words_file:
+            for word, count in frequencies.items():
+                words_file.write(f'{word}\t{count}\n')
+
+    def _creator(self, **kwargs) -> DatabaseCreator:
+        return DatabaseCreator(
+            word_frequencies_file=self.frequencies_file,
+            users_file=self.users_file,
+            add_default_data=True,
+            chunk_size=2,
+            **kwargs,
+        )
+
+    def _run(self, **kwargs) -> DatabaseCreator:
+        creator = self._creator(**kwargs)
+        with redirect_stdout(io.StringIO()):
+            creator.run()
+        return creator
+
+    def _read_words(self) -> Dict[str, tuple]:
+        return {
+            word.baseWord: (word.id, word.frequency)
+            for word in self.word_port.iter_words('nl')
+        }
+
+    def test_run(self):
+        frequencies = {'de': 100, 'huis': 50, 'boom': 50, "foto's": 3, 'één': 1}
+        self._write_frequencies(frequencies)
+        self._run()
+
+        returned = self._read_words()
+        self.assertEqual(
+            frequencies,
+            {word: frequency for word, (_id, frequency) in returned.items()},
+        )
+
+    def test_import_words_in_chunks(self):
+        self._write_frequencies(FREQUENCIES)
+        creator = self._creator()
+
+        chunks = list(creator._import_words())
+        self.assertEqual(
+            [['de', 'huis'], ['boom', 'één'], ['kat']],
+            [[word.baseWord for word in words] for words, _size in chunks],
+        )
+        # The sizes add up to the size of the file
+        self.assertEqual(
+            os.path.getsize(self.frequencies_file),
+            sum(size for _words, size in chunks),
+        )
+
+    def test_write_words_progress(self):
+        self._write_frequencies(FREQUENCIES)
+        creator = self._creator()
+
+        with redirect_stdout(io.StringIO()) as output:
+            progress = creator._write_words()
+        self.assertEqual(5, progress.words)
+        self.assertEqual(os.path.getsize(self.frequencies_file), progress.bytes)
+        self.assertIn('5 words', output.getvalue())
+        self.assertEqual(5, len(self._read_words()))
+
+    def test_run_incremental(self):
+        self._write_frequencies({'de': 100, 'huis': 50, 'boom': 20})
+        self._run()
+        existing = self._read_words()
+
+        self._write_frequencies({'de': 100, 'huis': 60, 'boom': 20, 'kat': 5})
+        self._run(incremental=True)
+        returned = self._read_words()
+
+        # Existing words keep their ids
+        for word, (word_id, _frequency) in existing.items():
+            self.assertEqual(word_id, returned[word][0])
+        self.assertEqual(100, returned['de'][1])
+        self.assertEqual(60, returned['huis'][1])
+        self.assertEqual(20, returned['boom'][1])
+        self.assertEqual(5, returned['kat'][1])
+
+    def test_sync_words(self):
+        self._write_frequencies({'de': 100, 'huis': 50, 'boom': 20})
+        creator = self._run()
+
+        self._write_frequencies({'de': 100, 'huis': 60, 'boom': 20, 'kat': 5})
+        with redirect_stdout(io.StringIO()):
+            returned = creator._sync_words()
+        self.assertEqual((1, 1, 2), returned)
+
+        # Nothing changes when run again
+        with redirect_stdout(io.StringIO()):
+            returned = creator._sync_words()
+        self.assertEqual((0, 0, 4), returned)
+
+    def test_write_words_error_stops_producer(self):
+        self._write_frequencies(FREQUENCIES)
+        creator = self._creator()
+        creator.chunk_size = 1
+        threads = set(threading.enumerate())
+
+        with mock.patch.object(
+            self.word_port,
+            'create_in_batch',
+            side_effect=DatabaseError('disk full'),
+        ):
+            with self.assertRaises(DatabaseError):
+                with redirect_stdout(io.StringIO()):
+                    creator._write_words()
+
+        # The thread building chunks doesn't wait for the queue forever
+        self.assertEqual(threads, set(threading.enumerate()))
+
+    def test_run_workers_same_output(self):
+        self._write_frequencies(FREQUENCIES)
+        self._run()
+        expected = sorted(
+            (word.baseWord, word.frequency, word.type)
+            for word in self.word_port.iter_words('nl')
+        )
+
+        self._run(workers=2)
+        returned = sorted(
+            (word.baseWord, word.frequency, word.type)
+            for word in self.word_port.iter_words('nl')
+        )
+        # The ids are different, the rest is the same
+        for words in [expected, returned]:
+            for _base_word, _frequency, word_type in words:
+                word_type.pop('id')
+                for data in word_type['data']:
+                    data.pop('id')
+        self.assertEqual(5, len(returned))
+        self.assertEqual(expected, returned)
@@ -0,0 +1,231 @@
+"""
+Copyright (C) J Leadbetter <j@jleadbetter.com>
+Affero GPL v3
+"""
+
+import bz2
+import gzip
+import io
+import itertools
+import json
+import lzma
+import os
+import shutil
+import tarfile
+from unittest import TestCase, mock
+
+from scripts import parse_data
+from scripts.parse_data import Parser
+
+from ...utils_for_tests.random_data import random_string
+
+
+def make_corpus_lines():
+    """
+    Lines of a Corpora Collections word list,
+    with words that need cleaning and words that are counted more than once.
+    """
+
+    words = [''.join(letters) for letters in itertools.product('abcdef', repeat=3)]
+    words += ['Huis.', 'huis', "foto's", '"foto\'s"', '123', 'a', 'Één']
+
+    lines = []
+    for i, word in enumerate(words * 3):
+        lines.append(f'{i}\t{word}\t{i * 7 % 23 + 1}\n')
+    return lines
+
+
+class TestParser(TestCase):
+    """
+    Tests for scripts.parse_data.Parser
+    """
+
+    def setUp(self):
+        self.directory = os.path.abspath(f'test_parse_data_{random_string()}')
+        os.makedirs(self.directory)
+        self.lines = make_corpus_lines()
+        self.input_file = self._path('corpus-words.txt')
+        with open(self.input_file, 'w', encoding='utf-8') as input_file:
+            input_file.writelines(self.lines)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _path(self, filename: str) -> str:
+        return os.path.join(self.directory, filename)
+
+    def _parse(self, input_file: str, output_file: str, **kwargs) -> bytes:
+        Parser(
+            minimum_frequency=2,
+            input_file=input_file,
+            output_file=self._path(output_file),
+            **kwargs,
+        ).run()
+        with open(self._path(output_file), 'rb') as output:
+            return output.read()
+
+    def _compress(self, filename: str) -> str:
+        path = self._path(filename)
+        with open(self.input_file, 'rb') as input_file:
+            data = input_file.read()
+
+        if '.tar' in filename:
+            compression = filename.split('.tar')[1].lstrip('.')
+            with tarfile.open(path, f'w:{compression}') as archive:
+                # The word list isn't the first file in the archive
+                for name, member_data in [
+                    ('corpus/corpus-sentences.txt', b'1\tHet huis.\n'),
+                    ('corpus/corpus-words.txt', data),
+                ]:
+                    info = tarfile.TarInfo(name)
+                    info.size = len(member_data)
+                    archive.addfile(info, io.BytesIO(member_data))
+            return path
+
+        open_file = {'gz': gzip.open, 'bz2': bz2.open, 'xz': lzma.open}[
+            filename.rsplit('.', 1)[1]
+        ]
+        with open_file(path, 'wb') as compressed_file:
+            compressed_file.write(data)
+        return path
+
+    def _count(self, *words: str) -> int:
+        return sum(
+            int(line.split('\t')[2]) for line in self.lines
+            if line.split('\t')[1] in words
+        )
+
+    def _write_input(self, *lines: str) -> str:
+        input_file = self._path('other-words.txt')
+        with open(input_file, 'w', encoding='utf-8') as other_file:
+            other_file.writelines(lines)
+        return input_file
+
+    def test_run(self):
+        output = self._parse(self.input_file, 'output.txt').decode('utf-8')
+        lines = output.splitlines()
+
+        self.assertIn(f'huis\t{self._count("Huis.", "huis")}', lines)
+        self.assertFalse(any(line.startswith(('123', 'a\t')) for line in lines))
+        counts = [int(line.split('\t')[1]) for line in lines]
+        self.assertEqual(sorted(counts, reverse=True), counts)
+
+    def test_top_k(self):
+        expected = self._parse(self.input_file, 'output.txt').splitlines()[:5]
+        returned = self._parse(self.input_file, 'output_5.txt', top_k=5)
+        self.assertEqual(expected, returned.splitlines())
+
+    def test_top_k_ties(self):
+        # Ties are kept in the order the words were first seen,
+        # the same as without top_k.
+        input_file = self._write_input(
+            '1\tboom\t3\n',
+            '2\thuis\t5\n',
+            '3\tkat\t3\n',
+            '4\tboom\t1\n',
+            '5\tdak\t4\n',
+        )
+
+        returned = self._parse(input_file, 'output.txt', top_k=3)
+        self.assertEqual(b'huis\t5\nboom\t4\ndak\t4\n', returned)
+
+    def test_top_k_larger_than_vocabulary(self):
+        expected = self._parse(self.input_file, 'output.txt')
+        returned = self._parse(self.input_file, 'output_all.txt', top_k=10000)
+        self.assertEqual(expected, returned)
+
+    def test_workers_same_output(self):
+        expected = self._parse(self.input_file, 'output.txt')
+        for workers in [2, 4]:
+            returned = self._parse(
+                self.input_file,
+                f'output_{workers}.txt',
+                workers=workers,
+            )
+            self.assertEqual(expected, returned)
+
+    def test_compressed_input_same_output(self):
+        expected = self._parse(self.input_file, 'output.txt')
+        for filename in [
+            'words.txt.gz',
+            'words.txt.bz2',
+            'words.txt.xz',
+            'words.tar',
+            'words.tar.gz',
+            'words.tar.xz',
+        ]:
+            returned = self._parse(
+                self._compress(filename),
+                f'output_{filename}.txt',
+            )
+            self.assertEqual(expected, returned, filename)
+
+    def test_compressed_input_workers_same_output(self):
+        expected = self._parse(self.input_file, 'output.txt')
+        input_file = self._compress('words.txt.gz')
+
+        # Several chunks per worker
+        with mock.patch.object(parse_data, 'LINES_PER_CHUNK', 50):
+            for workers in [2, 4]:
+                returned = self._parse(
+                    input_file,
+                    f'output_{workers}.txt',
+                    workers=workers,
+                )
+                self.assertEqual(expected, returned)
+
+    def test_tar_member_not_found(self):
+        input_file = self._compress('words.tar')
+        with self.assertRaises(FileNotFoundError):
+            self._parse(input_file, 'output.txt', tar_member='-other.txt')
+
+    def test_merge_same_input_twice(self):
+        expected = self._parse(self.input_file, 'output.txt', merge=True)
+        returned = self._parse(self.input_file, 'output.txt', merge=True)
+        self.assertEqual(expected, returned)
+        self.assertFalse(Parser(
+            minimum_frequency=2,
+            input_file=self.input_file,
+            output_file=self._path('output.txt'),
+            merge=True,
+        ).run())
+
+    def test_merge_same_input_compressed(self):
+        # The same word list compressed is the same corpus
+        expected = self._parse(self.input_file, 'output.txt', merge=True)
+        for filename in ['corpus-words.txt.gz', 'corpus.tar.gz']:
+            returned = self._parse(
+                self._compress(filename),
+                'output.txt',
+                merge=True,
+            )
+            self.assertEqual(expected, returned, filename)
+
+    def test_merge_other_input(self):
+        self._parse(self.input_file, 'output.txt', merge=True)
+        other_file = self._write_input('1\thuis\t100\n', '2\tboom\t3\n')
+
+        output = self._parse(other_file, 'output.txt', merge=True)
+        lines = output.decode('utf-8').splitlines()
+        self.assertEqual(f'huis\t{self._count("Huis.", "huis") + 100}', lines[0])
+        self.assertIn('boom\t3', lines)
+
+        with open(self._path('output.txt.manifest.json')) as manifest_file:
+            manifest = json.load(manifest_file)
+        self.assertEqual(
+            ['corpus-words.txt', 'other-words.txt'],
+            [source['file'] for source in manifest['sources']],
+        )
+
+    def test_merge_manifest_of_other_output(self):
+        self._parse(self.input_file, 'output.txt', merge=True)
+        with open(self._path('output.txt'), 'a', encoding='utf-8') as output:
+            output.write('boom\t3\n')
+
+        with self.assertRaises(ValueError):
+            self._parse(self.input_file, 'output.txt', merge=True)
+
+    def test_no_merge_removes_manifest(self):
+        self._parse(self.input_file, 'output.txt', merge=True)
+        self._parse(self.input_file, 'output.txt')
+        self.assertFalse(os.path.exists(self._path('output.txt.manifest.json')))
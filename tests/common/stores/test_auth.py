@@ -3,16 +3,19 @@ Copyright (C) J Leadbetter <j@jleadbetter.com>
 Affero GPL v3
 """
 
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase
 
 from app.models.app import AppSettings
 from common.adapters.auth import AuthInvalidError
+from common.adapters.dev.session import SessionMemoryAdapter
 from common.adapters.users import (
     UserDBDjangoORMAdapter,
     UserUIDjangoORMAdapter,
 )
+from common.models.users import UserDB
 from common.stores.adapter import AdapterStore
-from common.stores.auth import AuthStore
+from common.stores.auth import AuthStore, UserSelectOptions
 from common.stores.settings import SettingsStore
 from common.utils.singleton import Singleton
 
@@ -37,6 +40,15 @@ class TestAuthStore(TestCase):
     def tearDown(self):
         Singleton.destroy(AuthStore)
 
+    def _get_settings(self, auth_store: AuthStore):
+        # The options are always a UserSelectOptions;
+        # compare the users in them instead.
+        settings = dict(auth_store._settings)
+        user_select_options = settings[AuthStore.USER_SELECT_OPTIONS]
+        self.assertIsInstance(user_select_options, UserSelectOptions)
+        settings[AuthStore.USER_SELECT_OPTIONS] = list(user_select_options)
+        return settings
+
     def test_is_singleton(self):
         auth_store1 = AuthStore()
         self.assertFalse(auth_store1.get(AuthStore.IS_CONFIGURED))
@@ -93,7 +105,7 @@ class TestAuthStore(TestCase):
             AuthStore.SHOW_PASSWORD_FIELD: False,
             AuthStore.SHOW_USER_SELECT: False,
         }
-        returned = auth_store._settings
+        returned = self._get_settings(auth_store)
         self.assertEqual(expected, returned)
 
     def test_init_settings_false_false_false(self):
@@ -124,7 +136,7 @@ class TestAuthStore(TestCase):
             AuthStore.SHOW_PASSWORD_FIELD: True,
             AuthStore.SHOW_USER_SELECT: False,
         }
-        returned = auth_store._settings
+        returned = self._get_settings(auth_store)
         self.assertEqual(expected, returned)
 
     def test_init_settings_true_false_false(self):
@@ -155,7 +167,7 @@ class TestAuthStore(TestCase):
             AuthStore.SHOW_PASSWORD_FIELD: True,
             AuthStore.SHOW_USER_SELECT: False,
         }
-        returned = auth_store._settings
+        returned = self._get_settings(auth_store)
         self.assertEqual(expected, returned)
 
     def test_init_settings_true_true_false(self):
@@ -186,7 +198,7 @@ class TestAuthStore(TestCase):
             AuthStore.SHOW_PASSWORD_FIELD: False,
             AuthStore.SHOW_USER_SELECT: False,
         }
-        returned = auth_store._settings
+        returned = self._get_settings(auth_store)
         self.assertEqual(expected, returned)
 
     def test_init_settings_true_true_true(self):
@@ -212,14 +224,19 @@ class TestAuthStore(TestCase):
         expected = {
             AuthStore.LOGGED_IN_USER: None,
             AuthStore.IS_CONFIGURED: True,
-            AuthStore.USER_SELECT_OPTIONS: usersui,
             AuthStore.SHOW_REGISTRATION: True,
             AuthStore.SHOW_PASSWORD_FIELD: False,
             AuthStore.SHOW_USER_SELECT: True,
         }
-        returned = auth_store._settings
+        returned = dict(auth_store._settings)
+        user_select_options = returned.pop(AuthStore.USER_SELECT_OPTIONS)
         self.assertEqual(expected, returned)
 
+        # Users are only loaded when they're asked for
+        self.assertIsInstance(user_select_options, UserSelectOptions)
+        self.assertFalse(user_select_options._pages)
+        self.assertEqual(usersui, list(user_select_options))
+
     def test_init_settings_false_true_false(self):
         """
         mutliuser_mode = False
@@ -248,7 +265,7 @@ class TestAuthStore(TestCase):
             AuthStore.SHOW_PASSWORD_FIELD: False,
             AuthStore.SHOW_USER_SELECT: False,
         }
-        returned = auth_store._settings
+        returned = self._get_settings(auth_store)
         self.assertEqual(expected, returned)
 
     def test_init_settings_false_true_false_no_users(self):
@@ -273,7 +290,7 @@ class TestAuthStore(TestCase):
             AuthStore.SHOW_PASSWORD_FIELD: False,
             AuthStore.SHOW_USER_SELECT: False,
         }
-        returned = auth_store._settings
+        returned = self._get_settings(auth_store)
         self.assertEqual(expected, returned)
 
     def test_init_settings_false_true_true(self):
@@ -304,7 +321,7 @@ class TestAuthStore(TestCase):
             AuthStore.SHOW_PASSWORD_FIELD: False,
             AuthStore.SHOW_USER_SELECT: False,
         }
-        returned = auth_store._settings
+        returned = self._get_settings(auth_store)
         self.assertEqual(expected, returned)
 
     def test_init_settings_false_false_true(self):
@@ -335,7 +352,7 @@ class TestAuthStore(TestCase):
             AuthStore.SHOW_PASSWORD_FIELD: True,
             AuthStore.SHOW_USER_SELECT: True,
         }
-        returned = auth_store._settings
+        returned = self._get_settings(auth_store)
         self.assertEqual(expected, returned)
 
     def test_logged_in_user(self):
@@ -483,3 +500,282 @@ class TestAuthStore(TestCase):
 
         auth_store.logout()
         self.assertIsNone(auth_store.get(AuthStore.LOGGED_IN_USER))
+
+    def test_authenticate(self):
+        auth_store = AuthStore()
+        user = make_user_db()
+        userui = UserUIDjangoORMAdapter().get(UserDBDjangoORMAdapter().create(user))
+
+        self.assertEqual(userui, auth_store.authenticate(user.username, user.password))
+        self.assertIsNone(auth_store.logged_in_user)
+        with self.assertRaises(AuthInvalidError):
+            auth_store.authenticate(user.username, 'wrong password')
+
+    def test_session(self):
+        auth_store = AuthStore()
+        session = auth_store.session()
+
+        self.assertTrue(session.session_id)
+        self.assertIsNone(session.logged_in_user)
+        self.assertEqual(
+            session.session_id,
+            auth_store.session(session.session_id).session_id,
+        )
+
+    def test_session_does_not_exist(self):
+        auth_store = AuthStore()
+
+        session = auth_store.session('foo')
+        self.assertNotEqual('foo', session.session_id)
+        self.assertIsNone(session.logged_in_user)
+
+    def test_session_login(self):
+        auth_store = AuthStore()
+        user1 = make_user_db()
+        user2 = make_user_db()
+        userui1 = UserUIDjangoORMAdapter().get(UserDBDjangoORMAdapter().create(user1))
+        userui2 = UserUIDjangoORMAdapter().get(UserDBDjangoORMAdapter().create(user2))
+
+        session1 = auth_store.session()
+        session2 = auth_store.session()
+        self.assertEqual(userui1, session1.login(user1.username, user1.password))
+        self.assertEqual(userui2, session2.login(user2.username, user2.password))
+
+        # Every session has its own user
+        self.assertEqual(userui1, auth_store.session(session1.session_id).logged_in_user)
+        self.assertEqual(
+            userui2,
+            auth_store.session(session2.session_id).get(AuthStore.LOGGED_IN_USER),
+        )
+        self.assertIsNone(auth_store.logged_in_user)
+
+    def test_session_login_invalid(self):
+        auth_store = AuthStore()
+        session = auth_store.session()
+
+        with self.assertRaises(AuthInvalidError):
+            session.login('foo', 'bar')
+        self.assertIsNone(auth_store.session(session.session_id).logged_in_user)
+
+    def test_session_login_expired(self):
+        auth_store = AuthStore()
+        user = make_user_db()
+        UserDBDjangoORMAdapter().create(user)
+        session = auth_store.session()
+        AdapterStore().get('SessionPort').delete(session.session_id)
+
+        with self.assertRaises(AuthInvalidError):
+            session.login(user.username, user.password)
+
+    def test_session_logout(self):
+        auth_store = AuthStore()
+        user = make_user_db()
+        UserDBDjangoORMAdapter().create(user)
+        session = auth_store.session()
+        session.login(user.username, user.password)
+
+        session.logout()
+        self.assertIsNone(session.logged_in_user)
+        self.assertIsNone(auth_store.session(session.session_id).logged_in_user)
+
+    def test_session_logout_expired(self):
+        auth_store = AuthStore()
+        user = make_user_db()
+        UserDBDjangoORMAdapter().create(user)
+        session = auth_store.session()
+        session.login(user.username, user.password)
+        AdapterStore().get('SessionPort').delete(session.session_id)
+
+        # We shouldn't get any errors
+        session.logout()
+        self.assertIsNone(session.logged_in_user)
+
+    def test_session_passwordless_login(self):
+        """
+        multiuser_mode = False
+        passwordless_login = True
+        """
+
+        userdb = UserDBDjangoORMAdapter().create(make_user_db())
+        AppSettings.objects.create(
+            multiuser_mode=False,
+            passwordless_login=True,
+            show_users_on_login_screen=False,
+        )
+        auth_store = AuthStore()
+
+        expected = UserUIDjangoORMAdapter().get(userdb)
+        returned = auth_store.session().logged_in_user
+        self.assertEqual(expected, returned)
+
+    def test_session_shares_settings(self):
+        AppSettings.objects.create(
+            multiuser_mode=True,
+            passwordless_login=False,
+            show_users_on_login_screen=False,
+        )
+        auth_store = AuthStore()
+        session = auth_store.session()
+
+        for setting in [
+            AuthStore.IS_CONFIGURED,
+            AuthStore.SHOW_REGISTRATION,
+            AuthStore.SHOW_PASSWORD_FIELD,
+            AuthStore.SHOW_USER_SELECT,
+        ]:
+            self.assertEqual(auth_store.get(setting), session.get(setting))
+
+    def test_session_port_from_adapter_store(self):
+        session_adapter = SessionMemoryAdapter()
+        adapter_store = AdapterStore()
+        configured_adapter = adapter_store._adapters['sessionport']
+        adapter_store._adapters['sessionport'] = session_adapter
+        try:
+            auth_store = AuthStore()
+            session = auth_store.session()
+            self.assertEqual(session.session_id, session_adapter.get(session.session_id).id)
+
+            # Sessions survive re-initializing
+            auth_store.initialize(force=True)
+            self.assertEqual(
+                session.session_id,
+                auth_store.session(session.session_id).session_id,
+            )
+        finally:
+            adapter_store._adapters['sessionport'] = configured_adapter
+
+
+class TestUserSelectOptions(TestCase):
+    """
+    Tests for common.stores.auth.UserSelectOptions
+    """
+
+    def setUp(self):
+        self.user_db_adapter = UserDBDjangoORMAdapter()
+        self.user_ui_adapter = UserUIDjangoORMAdapter()
+        self.options = UserSelectOptions(
+            self.user_db_adapter,
+            self.user_ui_adapter,
+            page_size=2,
+        )
+
+    def _create_users(self, *usernames: str):
+        usersdb = self.user_db_adapter.create_in_batch([
+            UserDB(username=username) for username in usernames
+        ])
+        return self.user_ui_adapter.get_all(usersdb)
+
+    def test_get_page(self):
+        usersui = self._create_users('user1', 'user2', 'user3')
+
+        self.assertEqual(usersui[:2], self.options.get_page(0))
+        self.assertEqual(usersui[2:], self.options.get_page(1))
+        self.assertEqual([], self.options.get_page(2))
+
+    def test_get_page_search(self):
+        usersui = self._create_users('anna', 'bert', 'hanna')
+
+        expected = [usersui[0], usersui[2]]
+        returned = self.options.get_page(search=' ANNA ')
+        self.assertEqual(expected, returned)
+
+    def test_iter(self):
+        usersui = self._create_users('user1', 'user2', 'user3', 'user4')
+
+        expected = usersui
+        returned = list(self.options)
+        self.assertEqual(expected, returned)
+
+    def test_iter_no_users(self):
+        self.assertEqual([], list(self.options))
+
+    def test_fixed_users(self):
+        usersui = self._create_users('anna', 'bert', 'hanna')
+        options = UserSelectOptions(
+            self.user_db_adapter,
+            self.user_ui_adapter,
+            page_size=1,
+            users=usersui[1:],
+        )
+
+        self.assertEqual(usersui[1:], list(options))
+        self.assertEqual([usersui[2]], options.get_page(search='ANNA'))
+        self.assertEqual([], options.get_page(1, search='anna'))
+
+    def test_has_users(self):
+        self.assertFalse(self.options.has_users())
+        self._create_users('user1')
+        self.assertTrue(self.options.has_users())
+        self.assertFalse(UserSelectOptions(
+            self.user_db_adapter,
+            self.user_ui_adapter,
+            users=[],
+        ).has_users())
+
+    def test_get_page_in_transaction(self):
+        # Tests run in a transaction, so nothing is cached
+        self._create_users('user1')
+        self.options.get_page()
+        self.assertFalse(self.options._pages)
+
+
+class TestUserSelectOptionsCache(TransactionTestCase):
+    """
+    Tests for the page cache of common.stores.auth.UserSelectOptions.
+    Users are only cached outside of transactions,
+    so these tests don't run in one.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user_db_adapter = UserDBDjangoORMAdapter()
+        self.user_ui_adapter = UserUIDjangoORMAdapter()
+        self.options = UserSelectOptions(
+            self.user_db_adapter,
+            self.user_ui_adapter,
+            page_size=2,
+            max_cached_pages=2,
+        )
+
+    def tearDown(self):
+        cache.clear()
+
+    def _create_users(self, *usernames: str):
+        usersdb = self.user_db_adapter.create_in_batch([
+            UserDB(username=username) for username in usernames
+        ])
+        return self.user_ui_adapter.get_all(usersdb)
+
+    def test_get_page_is_cached(self):
+        usersui = self._create_users('user1', 'user2', 'user3')
+        self.options.get_page(0)
+
+        with self.assertNumQueries(0):
+            returned = self.options.get_page(0)
+        self.assertEqual(usersui[:2], returned)
+
+    def test_get_page_after_user_created(self):
+        usersui = self._create_users('user1')
+        self.assertEqual(usersui, self.options.get_page(0))
+
+        usersui += self._create_users('user2')
+        self.assertEqual(usersui, self.options.get_page(0))
+
+    def test_get_page_after_user_updated(self):
+        userdb = self.user_db_adapter.create(UserDB(username='user1'))
+        self.assertEqual('user1', self.options.get_page(0)[0].displayName)
+
+        userdb.display_name = 'User One'
+        self.user_db_adapter.update(userdb)
+        self.assertEqual('User One', self.options.get_page(0)[0].displayName)
+
+    def test_get_page_only_recent_pages_kept(self):
+        self._create_users('user1', 'user2', 'user3', 'user4', 'user5')
+        self.options.get_page(0)
+        self.options.get_page(1)
+        self.options.get_page(0)
+        self.options.get_page(2)
+
+        expected = [(None, 0), (None, 2)]
+        returned = list(self.options._pages)
+        self.assertEqual(expected, returned)
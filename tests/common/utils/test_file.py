@@ -0,0 +1,106 @@
+"""
+Copyright (C) J Leadbetter <j@jleadbetter.com>
+Affero GPL v3
+"""
+
+import json
+import os
+from unittest import TestCase
+
+from common.models.database import Database
+from common.utils.file import (
+    DatabaseFileMixin,
+    JSONFileMixin,
+    clear_json_cache,
+)
+
+from ...utils_for_tests.random_data import random_string
+from ...utils_for_tests.words import make_word
+
+
+class FooJSONAdapter(DatabaseFileMixin, JSONFileMixin):
+    def __init__(self, **kwargs):
+        self.database = self._get_db_filename(kwargs['databasefile'], 'json')
+        self._configure_json_storage(**kwargs)
+
+
+class TestJSONFileMixinCache(TestCase):
+    """
+    Tests for the parse cache in common.utils.file.JSONFileMixin
+    """
+
+    def setUp(self):
+        clear_json_cache()
+        self.adapter = FooJSONAdapter(
+            databasefile=f'test_file_{random_string()}',
+            storagemode='journal',
+        )
+
+    def tearDown(self):
+        clear_json_cache()
+        for filename in [self.adapter.database, self.adapter.journal]:
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def test_read_unchanged_file_is_cached(self):
+        self.adapter._write_json(Database(words=[make_word()]))
+
+        database1 = self.adapter._read_json()
+        database2 = self.adapter._read_json()
+        self.assertIs(database1, database2)
+
+    def test_read_is_shared_between_adapters(self):
+        self.adapter._write_json(Database(words=[make_word()]))
+        other_adapter = FooJSONAdapter(
+            databasefile=os.path.basename(self.adapter.database)[:-len('.json')],
+        )
+
+        self.assertIs(self.adapter._read_json(), other_adapter._read_json())
+
+    def test_read_after_write(self):
+        database = Database(words=[make_word()])
+        self.adapter._write_json(database)
+
+        self.assertIs(database, self.adapter._read_json())
+
+    def test_read_after_journal_write(self):
+        database = self.adapter._read_json()
+        word = make_word()
+        database.words.append(word)
+        self.adapter._write_changes(database, 'words', [word])
+
+        self.assertIs(database, self.adapter._read_json())
+
+    def test_read_file_changed_on_disk(self):
+        self.adapter._write_json(Database(words=[make_word()]))
+        database1 = self.adapter._read_json()
+
+        word = make_word()
+        with open(self.adapter.database, 'w') as output_file:
+            json.dump(Database(words=[word]).model_dump(), output_file)
+
+        database2 = self.adapter._read_json()
+        self.assertIsNot(database1, database2)
+        self.assertEqual([word], database2.words)
+
+    def test_read_journal_changed_on_disk(self):
+        self.adapter._write_json(Database())
+        database1 = self.adapter._read_json()
+
+        word = make_word()
+        with open(self.adapter.journal, 'a') as journal_file:
+            entry = {'table': 'words', 'data': word.model_dump(mode='json')}
+            journal_file.write(json.dumps(entry) + '\n')
+
+        database2 = self.adapter._read_json()
+        self.assertIsNot(database1, database2)
+        self.assertEqual([word], database2.words)
+
+    def test_clear_json_cache(self):
+        self.adapter._write_json(Database(words=[make_word()]))
+        database1 = self.adapter._read_json()
+
+        clear_json_cache()
+        database2 = self.adapter._read_json()
+        self.assertIsNot(database1, database2)
+        self.assertEqual(database1.words, database2.words)
@@ -0,0 +1,103 @@
+"""
+Copyright (C) J Leadbetter <j@jleadbetter.com>
+Affero GPL v3
+"""
+
+import os
+from unittest import TestCase
+
+from common.utils.frequencies import (
+    FrequencyTable,
+    iter_frequencies,
+    write_frequency_table,
+)
+
+from ...utils_for_tests.random_data import random_string
+
+
+class TestFrequencyTable(TestCase):
+    """
+    Tests for common.utils.frequencies.FrequencyTable
+    """
+
+    def setUp(self):
+        self.path = f'test_frequencies_{random_string()}.bin'
+        self.words = [('de', 100), ('één', 50), ('huis', 50), ("foto's", 3)]
+        write_frequency_table(self.path, self.words)
+        self.table = FrequencyTable(self.path)
+
+    def tearDown(self):
+        self.table.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def test_len(self):
+        self.assertEqual(4, len(self.table))
+
+    def test_iter(self):
+        self.assertEqual(self.words, list(self.table))
+
+    def test_getitem(self):
+        self.assertEqual(('één', 50), self.table[1])
+        self.assertEqual(("foto's", 3), self.table[-1])
+
+    def test_getitem_out_of_range(self):
+        with self.assertRaises(IndexError):
+            self.table[4]
+
+    def test_rank(self):
+        for rank, (word, _count) in enumerate(self.words):
+            self.assertEqual(rank, self.table.rank(word))
+        self.assertIsNone(self.table.rank('nonexistent'))
+
+    def test_get(self):
+        self.assertEqual(50, self.table.get('huis'))
+        self.assertTrue('huis' in self.table)
+        self.assertIsNone(self.table.get('nonexistent'))
+        self.assertEqual(0, self.table.get('nonexistent', 0))
+
+    def test_empty_table(self):
+        write_frequency_table(self.path, [])
+        with FrequencyTable(self.path) as table:
+            self.assertEqual(0, len(table))
+            self.assertIsNone(table.rank('de'))
+
+    def test_not_a_frequency_table(self):
+        with open(self.path, 'w') as table_file:
+            table_file.write('de\t100\n')
+
+        with self.assertRaises(ValueError):
+            FrequencyTable(self.path)
+
+    def test_truncated_table(self):
+        with open(self.path, 'rb') as table_file:
+            data = table_file.read()
+        with open(self.path, 'wb') as table_file:
+            table_file.write(data[:-1])
+
+        with self.assertRaises(ValueError):
+            FrequencyTable(self.path)
+
+
+class TestIterFrequencies(TestCase):
+    """
+    Tests for common.utils.frequencies.iter_frequencies
+    """
+
+    def setUp(self):
+        self.path = f'test_frequencies_{random_string()}'
+        self.words = [('de', 100), ('huis', 50)]
+
+    def tearDown(self):
+        for path in [self.path, f'{self.path}.bin']:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_text(self):
+        with open(self.path, 'w') as wordfile:
+            wordfile.writelines(f'{word}\t{count}\n' for word, count in self.words)
+        self.assertEqual(self.words, list(iter_frequencies(self.path)))
+
+    def test_binary(self):
+        write_frequency_table(f'{self.path}.bin', self.words)
+        self.assertEqual(self.words, list(iter_frequencies(f'{self.path}.bin')))
@@ -0,0 +1,39 @@
+"""
+Copyright (C) J Leadbetter <j@jleadbetter.com>
+Affero GPL v3
+"""
+
+import os
+from unittest import TestCase
+
+from common.utils.languages import LANGUAGES_FILE, LanguageCode, get_languages
+
+from scripts.generate_languages import generate
+
+from ...utils_for_tests.random_data import random_string
+
+
+class TestLanguages(TestCase):
+    """
+    Tests for common.utils.languages
+    """
+
+    def test_get_languages(self):
+        languages = get_languages()
+        self.assertIn(('nl', 'Dutch'), languages)
+        self.assertNotIn('mro', [subtag for subtag, _description in languages])
+
+    def test_language_code(self):
+        self.assertEqual('nl', LanguageCode.nl)
+        self.assertEqual(LanguageCode.en, LanguageCode('en'))
+        self.assertEqual(len(get_languages()), len(LanguageCode))
+
+    def test_languages_file_is_up_to_date(self):
+        output_file = f'test_languages_{random_string()}.tsv'
+        try:
+            generate(output_file)
+            with open(output_file, encoding='utf-8') as generated:
+                with open(LANGUAGES_FILE, encoding='utf-8') as existing:
+                    self.assertEqual(generated.read(), existing.read())
+        finally:
+            os.remove(output_file)
@@ -0,0 +1,36 @@
+"""
+Copyright (C) J Leadbetter <j@jleadbetter.com>
+Affero GPL v3
+"""
+
+from typing import Any, Callable, Iterable
+
+from django.test import TestCase
+
+
+def assert_constant_queries(
+    test_case: TestCase,
+    num_queries: int,
+    func: Callable[[], Any],
+    add_data: Callable[[int], Any],
+    sizes: Iterable[int]=(1, 5, 20),
+):
+    """
+    Assert that a function runs the same number of queries,
+    no matter how much data is in the database.
+    Catches N+1 queries, which only show up with more than one row.
+
+    :test_case: Django TestCase that is running the test.
+    :num_queries: Number of queries func is expected to run.
+    :func: Function that reads from the database.
+    :add_data: Called with a number of rows to add to the database.
+        Data is added on top of what the previous sizes added.
+    :sizes: Total numbers of rows to check func with.
+    """
+
+    total = 0
+    for size in sizes:
+        add_data(size - total)
+        total = size
+        with test_case.assertNumQueries(num_queries):
+            func()
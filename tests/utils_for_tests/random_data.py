@@ -9,7 +9,7 @@ import string
 import uuid
 from typing import Optional
 
-from common.utils.languages import LanguageCode
+from common.utils.languages import get_languages
 
 
 def random_email(username: Optional[str]=None, domain: Optional[str]=None) -> str:
@@ -40,7 +40,7 @@ def random_file_path(
 
 
 def random_language_code():
-    lang = str(random.choice(list(LanguageCode)))
+    lang, _description = random.choice(get_languages())
     return lang
 
 
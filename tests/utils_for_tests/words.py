@@ -0,0 +1,35 @@
+"""
+Copyright (C) J Leadbetter <j@jleadbetter.com>
+Affero GPL v3
+"""
+
+from common.models.words import UnknownBase, UnknownDataBase, Word
+
+from .random_data import random_string
+
+
+def make_word(**kwargs) -> Word:
+    """
+    Create a Word object of the Unknown type.
+    Not written to database.
+
+    :kwargs: arguments that will be passed to Word during creation.
+    """
+
+    language_code = kwargs.get('languageCode', 'nl')
+    base_word = kwargs.get('baseWord', random_string())
+
+    UnknownData = UnknownDataBase(language_code)
+    Unknown = UnknownBase(language_code)
+
+    random_data = {
+        'frequency': 1,
+        'languageCode': language_code,
+        'baseWord': base_word,
+        'translations': [],
+        'type': Unknown(data=[UnknownData(text=base_word)]),
+    }
+    random_data.update(kwargs)
+
+    word = Word(**random_data)
+    return word